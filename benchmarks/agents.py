@@ -0,0 +1,50 @@
+# benchmarks/agents.py
+"""Agents used by the benchmark harness."""
+from typing import Optional
+from src.agents.base import Agent
+from src.llms.mock import MockLLMProvider
+from src.models import TaskSpec, AgentResponse, AgentSpec
+from src.cancellation import current_token
+
+SIMULATED_LATENCY_AGENT_SPEC = AgentSpec(
+    name="SimulatedLatencyAgent",
+    role="Benchmark Executor",
+    description="Sleeps for a fixed latency to stand in for a remote LLM call.",
+)
+
+MOCK_LLM_AGENT_SPEC = AgentSpec(
+    name="MockLLMAgent",
+    role="Benchmark Executor",
+    description="Sends its task to the mock LLM provider, with its simulated latency and failures.",
+)
+
+
+class SimulatedLatencyAgent(Agent):
+    """
+    Sleeps for `latency_s` seconds (overridable per task via
+    `input_data["latency_s"]`) and returns a minimal completed response.
+    The sleep ends early, raising TaskCancelled, if the task is cancelled.
+    """
+    latency_s: float = 0.001
+
+    def run(self, task: TaskSpec) -> AgentResponse:
+        token = current_token()
+        token.wait(task.input_data.get("latency_s", self.latency_s))
+        token.raise_if_cancelled()
+        return AgentResponse(status="completed", output={"task_id": task.id})
+
+
+class MockLLMAgent(Agent):
+    """
+    Sends the task's `input_data["prompt"]` (default: its description) to
+    `MockLLMAgent.llm`, a MockLLMProvider configured from the MOCK_LLM_*
+    settings unless the harness installs another. Provider errors propagate,
+    so the orchestrator's retries and failure policy handle them.
+    """
+    llm: Optional[MockLLMProvider] = None
+
+    def run(self, task: TaskSpec) -> AgentResponse:
+        if MockLLMAgent.llm is None:
+            MockLLMAgent.llm = MockLLMProvider()
+        response = MockLLMAgent.llm.generate(task.input_data.get("prompt", task.description))
+        return AgentResponse(status="completed", output={"task_id": task.id, "response": response})
@@ -0,0 +1,256 @@
+# benchmarks/harness.py
+"""Runs synthetic workflows through the orchestrator and records overhead, planning time, memory and throughput."""
+import datetime
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+import timeit
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore
+
+from src.agents.base import Agent
+from src.agents.factory import AgentFactory
+from src.agents.registry import agent_registry
+from src.artifacts import artifact_manager
+from src.models import TaskSpec, AgentResponse, Artifact, construct_trusted
+from src.orchestrator import Orchestrator
+from src.run_context import RunContext
+from src.session_store import SessionStore
+from src.workflow.planner import WorkflowPlanner
+from src.llms.mock import MockLLMProvider
+from benchmarks.agents import SimulatedLatencyAgent, SIMULATED_LATENCY_AGENT_SPEC, MockLLMAgent, MOCK_LLM_AGENT_SPEC
+from benchmarks.workflows import WORKFLOW_SHAPES
+
+logger = logging.getLogger(__name__)
+
+# Metrics compared between runs, and whether a larger value is better.
+COMPARED_METRICS: Dict[str, bool] = {
+    "planning_time_s": False,
+    "per_task_overhead_us": False,
+    "peak_memory_bytes": False,
+    "throughput_tasks_per_s": True,
+}
+
+
+class _TimedAgent(Agent):
+    """Wraps an agent and accumulates the wall time spent inside `run`."""
+
+    def __init__(self, inner: Agent, timer: Dict[str, float]):
+        super().__init__(inner.name)
+        self._inner = inner
+        self._timer = timer
+
+    def run(self, task: TaskSpec) -> AgentResponse:
+        start = time.perf_counter()
+        try:
+            return self._inner.run(task)
+        finally:
+            self._timer["agent_time_s"] += time.perf_counter() - start
+
+
+class TimingAgentFactory(AgentFactory):
+    """AgentFactory that measures time spent in agents so it can be subtracted from wall time."""
+
+    def __init__(self):
+        self.timer: Dict[str, float] = {"agent_time_s": 0.0}
+
+    def create_agent(self, agent_name: str) -> Agent:
+        return _TimedAgent(super().create_agent(agent_name), self.timer)
+
+
+def register_benchmark_agents():
+    """Makes the benchmark-only agents resolvable through the AgentFactory."""
+    if agent_registry.get_agent_spec(SIMULATED_LATENCY_AGENT_SPEC.name) is None:
+        agent_registry.register_agent_spec(SIMULATED_LATENCY_AGENT_SPEC)
+    if agent_registry.get_agent_class(SimulatedLatencyAgent.__name__) is None:
+        agent_registry.register_agent_class(SimulatedLatencyAgent)
+    if agent_registry.get_agent_spec(MOCK_LLM_AGENT_SPEC.name) is None:
+        agent_registry.register_agent_spec(MOCK_LLM_AGENT_SPEC)
+    if agent_registry.get_agent_class(MockLLMAgent.__name__) is None:
+        agent_registry.register_agent_class(MockLLMAgent)
+
+
+def _max_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return max_rss if platform.system() == "Darwin" else max_rss * 1024
+
+
+def run_benchmark(shape: str, size: int, agent_name: str = "DummyAgent", track_memory: bool = True) -> Dict[str, Any]:
+    """
+    Generates one synthetic workflow and runs it end to end.
+    Planning is timed separately through WorkflowPlanner; per-task overhead is
+    the orchestrator's wall time minus the time spent inside agents, per task.
+    Errors (e.g. recursion limits on very deep graphs) are recorded, not raised.
+    Each run gets its own RunContext, with its session store and artifacts in
+    a temporary directory that is removed afterwards, so benchmarks neither
+    write into the project's database nor depend on what is already in it.
+    """
+    result: Dict[str, Any] = {"shape": shape, "size": size, "agent": agent_name}
+    if shape not in WORKFLOW_SHAPES:
+        raise ValueError(f"Unknown workflow shape: {shape}")
+
+    register_benchmark_agents()
+    original_artifact_dir = artifact_manager.artifact_dir
+    if track_memory:
+        tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_") as work_dir:
+            artifact_manager.artifact_dir = os.path.join(work_dir, "artifacts")
+
+            start = time.perf_counter()
+            tasks = WORKFLOW_SHAPES[shape](size, agent_name)
+            result["generation_time_s"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            WorkflowPlanner().generate_plan(tasks)
+            result["planning_time_s"] = time.perf_counter() - start
+
+            store = SessionStore(db_path=os.path.join(work_dir, "sessions.db"))
+            try:
+                run = RunContext(store=store)
+                run.start_session()
+                agent_factory = TimingAgentFactory()
+                start = time.perf_counter()
+                Orchestrator(agent_factory, run_context=run).run_workflow(tasks)
+                execution_time = time.perf_counter() - start
+            finally:
+                store.close()
+
+            agent_time = agent_factory.timer["agent_time_s"]
+            result["status"] = run.state_machine.get_state().value
+            result["execution_time_s"] = execution_time
+            result["agent_time_s"] = agent_time
+            result["per_task_overhead_us"] = (execution_time - agent_time) / size * 1e6 if size else 0.0
+            result["throughput_tasks_per_s"] = size / execution_time if execution_time > 0 else 0.0
+    except Exception as e:
+        logger.error(f"Benchmark {shape}/{size}/{agent_name} failed: {e!r}")
+        result["status"] = "ERROR"
+        result["error"] = repr(e)
+    finally:
+        artifact_manager.artifact_dir = original_artifact_dir
+        if track_memory:
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        result["max_rss_bytes"] = _max_rss_bytes()
+    return result
+
+
+def run_mock_llm_benchmark(shape: str, size: int, track_memory: bool = False, **llm_options: Any) -> Dict[str, Any]:
+    """
+    Runs a workflow of MockLLMAgent tasks against a MockLLMProvider built with
+    `llm_options` (e.g. latency="lognormal", latency_s=0.05, error_rate=0.1),
+    and adds the provider's request counts to the result under "llm". Pair
+    failure rates with a retrying FAILURE_POLICY (or task retries) to measure
+    resilience rather than the first failure.
+    """
+    previous = MockLLMAgent.llm
+    MockLLMAgent.llm = MockLLMProvider(**llm_options)
+    try:
+        result = run_benchmark(shape, size, MOCK_LLM_AGENT_SPEC.name, track_memory=track_memory)
+        result["llm"] = MockLLMAgent.llm.stats()
+    finally:
+        MockLLMAgent.llm = previous
+    return result
+
+
+def run_construction_benchmark(iterations: int = 20000) -> List[Dict[str, Any]]:
+    """
+    Times building the per-task models with pydantic validation and with
+    `construct_trusted`, as the orchestrator does when it dispatches a task
+    and when it replays a memoized response. Returns microseconds per model
+    for each and the saving.
+    """
+    task_fields = {
+        "id": "t1", "name": "t1", "description": "Synthetic task 1", "agent_name": "DummyAgent",
+        "input_data": {"index": 1}, "dependencies": ["t0"],
+    }
+    artifacts = [Artifact(name="task_t1_log.txt", type="text/plain", data="log")]
+    response_fields = {"status": "completed", "output": {"message": "done", "index": 1}, "artifacts": artifacts}
+    cases = [
+        ("TaskSpec", lambda: TaskSpec(**task_fields), lambda: construct_trusted(TaskSpec, **task_fields)),
+        ("AgentResponse", lambda: AgentResponse(**response_fields), lambda: construct_trusted(AgentResponse, **response_fields)),
+    ]
+    results = []
+    for model, validated, trusted in cases:
+        validated_us = timeit.timeit(validated, number=iterations) / iterations * 1e6
+        trusted_us = timeit.timeit(trusted, number=iterations) / iterations * 1e6
+        results.append({
+            "model": model,
+            "validated_us": validated_us,
+            "trusted_us": trusted_us,
+            "saved_us": validated_us - trusted_us,
+        })
+    return results
+
+
+def run_suite(shapes: List[str], sizes: List[int], agents: List[str], track_memory: bool = True) -> Dict[str, Any]:
+    """Runs every (shape, size, agent) combination and returns a JSON-serializable report."""
+    results = []
+    for agent_name in agents:
+        for shape in shapes:
+            for size in sizes:
+                logger.info(f"Benchmarking {shape} x {size} with {agent_name}")
+                results.append(run_benchmark(shape, size, agent_name, track_memory=track_memory))
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "track_memory": track_memory,
+        },
+        "results": results,
+    }
+
+
+def save_results(report: Dict[str, Any], path: str):
+    """Writes a benchmark report as JSON, creating parent directories as needed."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Loads a benchmark report previously written by `save_results`."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2) -> List[str]:
+    """
+    Compares two reports and returns a human-readable line for every metric
+    that got worse by more than `threshold` (a fraction, 0.2 == 20%).
+    Only (shape, size, agent) combinations present in both reports are compared.
+    """
+    def key(entry: Dict[str, Any]):
+        return (entry["shape"], entry["size"], entry["agent"])
+
+    baseline_by_key = {key(entry): entry for entry in baseline.get("results", [])}
+    regressions: List[str] = []
+    for entry in current.get("results", []):
+        old = baseline_by_key.get(key(entry))
+        if old is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old_value, new_value = old.get(metric), entry.get(metric)
+            if not old_value or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value
+            if higher_is_better:
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f"{entry['shape']}/{entry['size']}/{entry['agent']}: {metric} regressed by "
+                    f"{change:.0%} ({old_value:.6g} -> {new_value:.6g})"
+                )
+    return regressions
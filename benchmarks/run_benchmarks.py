@@ -0,0 +1,87 @@
+# benchmarks/run_benchmarks.py
+"""
+Command-line entry point for the orchestration benchmark suite.
+
+Usage (from the project root):
+    python -m benchmarks.run_benchmarks --sizes 10,100,1000 --output bench.json
+    python -m benchmarks.run_benchmarks --baseline old.json --output new.json
+    python -m benchmarks.run_benchmarks --construction
+"""
+import argparse
+import datetime
+import logging
+import os
+import sys
+from typing import List
+from benchmarks.harness import run_suite, save_results, load_results, compare_results, run_construction_benchmark
+from benchmarks.workflows import WORKFLOW_SHAPES
+
+DEFAULT_SIZES = "10,100,1000"
+DEFAULT_AGENTS = "DummyAgent,SimulatedLatencyAgent"
+
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark orchestration overhead and scaling")
+    parser.add_argument("--shapes", default=",".join(WORKFLOW_SHAPES), help="Comma-separated workflow shapes")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated task counts, e.g. 10,1000,1000000")
+    parser.add_argument("--agents", default=DEFAULT_AGENTS, help="Comma-separated agent names")
+    parser.add_argument("--output", default=None, help="Where to write the JSON report")
+    parser.add_argument("--baseline", default=None, help="Previous JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Regression threshold as a fraction (default 0.2)")
+    parser.add_argument("--no-memory", action="store_true", help="Disable tracemalloc (faster, no peak memory)")
+    parser.add_argument("--construction", action="store_true",
+                        help="Only compare validated and trusted construction of the per-task models")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+
+    if args.construction:
+        results = run_construction_benchmark()
+        for entry in results:
+            print(
+                f"{entry['model']:>14} validated={entry['validated_us']:.2f}us "
+                f"trusted={entry['trusted_us']:.2f}us saved={entry['saved_us']:.2f}us"
+            )
+        print(f"Saved per task: {sum(entry['saved_us'] for entry in results):.2f}us")
+        return 0
+
+    report = run_suite(
+        shapes=_csv(args.shapes),
+        sizes=[int(size) for size in _csv(args.sizes)],
+        agents=_csv(args.agents),
+        track_memory=not args.no_memory,
+    )
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"bench-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    save_results(report, output)
+
+    for entry in report["results"]:
+        if entry["status"] == "ERROR":
+            print(f"{entry['shape']:>10} {entry['size']:>8} {entry['agent']:<22} ERROR {entry['error']}")
+            continue
+        print(
+            f"{entry['shape']:>10} {entry['size']:>8} {entry['agent']:<22} "
+            f"plan={entry['planning_time_s']:.4f}s "
+            f"overhead={entry['per_task_overhead_us']:.1f}us/task "
+            f"throughput={entry['throughput_tasks_per_s']:.1f}/s "
+            f"peak_mem={entry.get('peak_memory_bytes') or 0} B"
+        )
+    print(f"Report written to {output}")
+
+    if args.baseline:
+        regressions = compare_results(load_results(args.baseline), report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
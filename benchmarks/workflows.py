@@ -0,0 +1,60 @@
+# benchmarks/workflows.py
+"""Generates synthetic workflows (chains, fan-outs, diamonds, random DAGs) for benchmarking."""
+import random
+from typing import Callable, Dict, List
+from src.models import TaskSpec
+
+
+def _task(index: int, agent_name: str, dependencies: List[str]) -> TaskSpec:
+    task_id = f"t{index}"
+    return TaskSpec(
+        id=task_id,
+        name=task_id,
+        description=f"Synthetic task {index}",
+        agent_name=agent_name,
+        input_data={"index": index},
+        dependencies=dependencies,
+    )
+
+
+def chain(size: int, agent_name: str = "DummyAgent") -> List[TaskSpec]:
+    """A linear chain: every task depends on the previous one."""
+    return [_task(i, agent_name, [f"t{i - 1}"] if i > 0 else []) for i in range(size)]
+
+
+def fan_out(size: int, agent_name: str = "DummyAgent") -> List[TaskSpec]:
+    """One root task with every other task depending directly on it."""
+    return [_task(i, agent_name, ["t0"] if i > 0 else []) for i in range(size)]
+
+
+def diamond(size: int, agent_name: str = "DummyAgent") -> List[TaskSpec]:
+    """A root, a wide middle layer depending on the root, and a sink depending on the whole layer."""
+    if size < 3:
+        return chain(size, agent_name)
+    middle = [f"t{i}" for i in range(1, size - 1)]
+    tasks = [_task(0, agent_name, [])]
+    tasks.extend(_task(i, agent_name, ["t0"]) for i in range(1, size - 1))
+    tasks.append(_task(size - 1, agent_name, middle))
+    return tasks
+
+
+def random_dag(size: int, agent_name: str = "DummyAgent", max_dependencies: int = 3, seed: int = 0) -> List[TaskSpec]:
+    """
+    A random DAG. Each task depends on up to `max_dependencies` earlier tasks,
+    so the generated graph is acyclic by construction. Seeded for reproducibility.
+    """
+    rng = random.Random(seed)
+    tasks: List[TaskSpec] = []
+    for i in range(size):
+        count = min(i, rng.randint(0, max_dependencies))
+        dependencies = [f"t{d}" for d in sorted(rng.sample(range(i), count))] if count else []
+        tasks.append(_task(i, agent_name, dependencies))
+    return tasks
+
+
+WORKFLOW_SHAPES: Dict[str, Callable[..., List[TaskSpec]]] = {
+    "chain": chain,
+    "fan_out": fan_out,
+    "diamond": diamond,
+    "random_dag": random_dag,
+}
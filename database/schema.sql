@@ -26,3 +26,41 @@ CREATE TABLE IF NOT EXISTS agent_specs (
     description TEXT NOT NULL,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
+
+-- Table for Session Log Entries (append-only)
+CREATE TABLE IF NOT EXISTS session_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id UUID NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    entry TEXT NOT NULL,
+    FOREIGN KEY (session_id) REFERENCES sessions(id) ON DELETE CASCADE
+);
+
+-- Table for Task Checkpoints (latest outcome of each task, used to resume a session)
+CREATE TABLE IF NOT EXISTS task_checkpoints (
+    session_id UUID NOT NULL,
+    task_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    output_hash TEXT,
+    artifacts TEXT NOT NULL DEFAULT '[]', -- JSON list of {name, type, data_path}
+    new_tasks TEXT NOT NULL DEFAULT '[]', -- JSON list of the TaskSpecs the task injected
+    updated_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (session_id, task_id),
+    FOREIGN KEY (session_id) REFERENCES sessions(id) ON DELETE CASCADE
+);
+
+-- Table for Memoized Task Results, keyed by task fingerprint (see src/task_cache.py)
+CREATE TABLE IF NOT EXISTS task_results (
+    fingerprint TEXT PRIMARY KEY,
+    session_id UUID NOT NULL, -- Session whose artifact store holds the result's artifacts
+    status TEXT NOT NULL,
+    output TEXT NOT NULL, -- JSON
+    artifacts TEXT NOT NULL DEFAULT '[]', -- JSON list of {name, type}
+    created_at TIMESTAMP NOT NULL
+);
+
+-- Indexes for querying past runs
+CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions(status);
+CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON sessions(start_time);
+CREATE INDEX IF NOT EXISTS idx_artifacts_session_id ON artifacts(session_id);
+CREATE INDEX IF NOT EXISTS idx_session_logs_session_id ON session_logs(session_id);
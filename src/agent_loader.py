@@ -5,7 +5,7 @@ import yaml
 import json
 from typing import List
 from src.models import AgentSpec
-from src.file_io import read_file
+from src.file_io import open_stream
 from src.paths import get_root_dir
 import logging
 
@@ -25,25 +25,27 @@ def load_agent_specs(spec_dir: str = "agents/specs") -> List[AgentSpec]:
 
     for filename in os.listdir(full_spec_dir):
         filepath = os.path.join(full_spec_dir, filename)
-        content = read_file(filepath)
-        if content is None:
-            logger.warning(f"Could not read agent spec file: {filepath}")
+        if not filename.endswith((".yaml", ".yml", ".json")):
+            logger.debug(f"Skipping unknown file type: {filename}")
+            continue
+
+        try:
+            with open_stream(filepath) as stream:
+                if filename.endswith(".json"):
+                    data = json.load(stream)
+                else:
+                    data = yaml.safe_load(stream)
+        except OSError as e:
+            logger.warning(f"Could not read agent spec file: {filepath}: {e}")
+            continue
+        except (yaml.YAMLError, json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Error parsing agent spec file {filepath}: {e}")
             continue
 
         try:
-            if filename.endswith((".yaml", ".yml")):
-                data = yaml.safe_load(content)
-            elif filename.endswith(".json"):
-                data = json.loads(content)
-            else:
-                logger.debug(f"Skipping unknown file type: {filename}")
-                continue
-            
             agent_spec = AgentSpec(**data)
             agent_specs.append(agent_spec)
             logger.info(f"Loaded agent spec: {agent_spec.name}")
-        except (yaml.YAMLError, json.JSONDecodeError) as e:
-            logger.error(f"Error parsing agent spec file {filepath}: {e}")
         except Exception as e:
             logger.error(f"Unexpected error loading agent spec {filepath}: {e}")
             
@@ -2,6 +2,7 @@
 """A simple dummy agent for testing purposes."""
 from src.agents.base import Agent
 from src.models import TaskSpec, AgentResponse, Artifact
+from src.cancellation import current_token
 import logging
 import random
 
@@ -16,6 +17,8 @@ class DummyAgent(Agent):
         logger.info(f"{self.name} received task: {task.name} (ID: {task.id})")
         logger.info(f"Input data: {task.input_data}")
 
+        current_token().raise_if_cancelled()
+
         # Simulate some work
         if "fail_task" in task.input_data and task.input_data["fail_task"]:
             logger.error(f"{self.name} simulating failure for task {task.name}")
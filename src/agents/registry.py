@@ -15,6 +15,7 @@ class AgentRegistry:
     def __init__(self):
         self._agents: Dict[str, Type[Agent]] = {}
         self._agent_specs: Dict[str, AgentSpec] = {}
+        self.version = 0 # Bumped on every registration, so copies of the registry can tell they are stale
         self._load_initial_agent_specs()
         self._register_concrete_agents() # New call
 
@@ -30,6 +31,12 @@ class AgentRegistry:
         self.register_agent_class(DummyAgent)
         # Add other concrete agent classes here as they are developed
 
+    def register_agent_spec(self, spec: AgentSpec):
+        """Registers an agent specification that was not loaded from disk."""
+        self._agent_specs[spec.name] = spec
+        self.version += 1
+        logger.info(f"Registered agent spec for: {spec.name}")
+
     def register_agent_class(self, agent_class: Type[Agent]):
         """Registers an agent class with its name."""
         # Use the class name as the key for the agent class
@@ -37,6 +44,7 @@ class AgentRegistry:
         if class_name not in self._agent_specs and class_name != "DummyAgent": # Allow DummyAgent without spec for now for testing purposes. Real agents will need specs.
              logger.warning(f"Attempted to register agent class {class_name} without a corresponding AgentSpec.")
         self._agents[class_name] = agent_class
+        self.version += 1
         logger.info(f"Registered agent class: {class_name}")
 
     def get_agent_class(self, name: str) -> Optional[Type[Agent]]:
@@ -0,0 +1,114 @@
+# src/artifact_bus.py
+"""In-memory, byte-bounded LRU of artifacts for handing task outputs directly to dependent tasks."""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from src.models import Artifact
+from src.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(data: Any) -> int:
+    """Cheap estimate of an artifact payload's size in bytes."""
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if isinstance(data, memoryview):
+        return data.nbytes
+    if isinstance(data, str):
+        return len(data)
+    nbytes = getattr(data, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(data)
+
+
+class ArtifactBus:
+    """
+    Keeps recently produced artifacts in memory, per session, so dependents
+    receive them without a write-then-read round trip through disk. Each
+    session is bounded by `max_bytes`; the least recently used artifacts are
+    evicted first. The names each task produced are always remembered, so an
+    evicted artifact can still be located in the artifact store.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.ARTIFACT_BUS_MAX_BYTES
+        self._lock = threading.Lock()
+        # session_id -> OrderedDict[(task_id, name)] -> (artifact, size)
+        self._entries: Dict[str, "OrderedDict[Tuple[str, str], Tuple[Artifact, int]]"] = {}
+        self._sizes: Dict[str, int] = {}
+        self._produced: Dict[str, Dict[str, List[str]]] = {} # session_id -> task_id -> artifact names
+
+    def publish(self, session_id: str, task_id: str, artifacts: List[Artifact]):
+        """Makes a task's artifacts available to its dependents."""
+        with self._lock:
+            entries = self._entries.setdefault(session_id, OrderedDict())
+            produced = self._produced.setdefault(session_id, {}).setdefault(task_id, [])
+            for artifact in artifacts:
+                if artifact.name not in produced:
+                    produced.append(artifact.name)
+                key = (task_id, artifact.name)
+                if key in entries:
+                    self._sizes[session_id] -= entries.pop(key)[1]
+                size = estimate_size(artifact.data)
+                if size > self.max_bytes:
+                    logger.debug(f"Artifact {artifact.name} ({size} bytes) exceeds the bus budget; not cached.")
+                    continue
+                entries[key] = (artifact, size)
+                self._sizes[session_id] = self._sizes.get(session_id, 0) + size
+            self._evict(session_id)
+
+    def register_produced(self, session_id: str, task_id: str, names: List[str]):
+        """
+        Records the names of artifacts a task produced without caching their
+        payloads, e.g. for tasks completed in an earlier run of a resumed
+        session. Dependents then read them back from the artifact store.
+        """
+        with self._lock:
+            produced = self._produced.setdefault(session_id, {}).setdefault(task_id, [])
+            for name in names:
+                if name not in produced:
+                    produced.append(name)
+
+    def _evict(self, session_id: str):
+        entries = self._entries[session_id]
+        while self._sizes.get(session_id, 0) > self.max_bytes and entries:
+            (task_id, name), (_, size) = entries.popitem(last=False)
+            self._sizes[session_id] -= size
+            logger.debug(f"Evicted artifact {name} of task {task_id} from the artifact bus.")
+
+    def get(self, session_id: str, task_id: str, name: str) -> Optional[Artifact]:
+        """Returns a cached artifact and marks it recently used, or None if it is not in memory."""
+        with self._lock:
+            entries = self._entries.get(session_id)
+            if not entries or (task_id, name) not in entries:
+                return None
+            entries.move_to_end((task_id, name))
+            return entries[(task_id, name)][0]
+
+    def produced_by(self, session_id: str, task_id: str) -> List[str]:
+        """Returns the names of the artifacts a task produced, cached or not."""
+        with self._lock:
+            return list(self._produced.get(session_id, {}).get(task_id, []))
+
+    def session_artifacts(self, session_id: str) -> Dict[str, Artifact]:
+        """Returns the artifacts currently cached for a session, keyed by name (latest wins)."""
+        with self._lock:
+            return {name: artifact for (_, name), (artifact, _) in self._entries.get(session_id, {}).items()}
+
+    def size(self, session_id: str) -> int:
+        """Returns the estimated bytes cached for a session."""
+        with self._lock:
+            return self._sizes.get(session_id, 0)
+
+    def clear_session(self, session_id: str):
+        """Drops everything cached for a session."""
+        with self._lock:
+            self._entries.pop(session_id, None)
+            self._sizes.pop(session_id, None)
+            self._produced.pop(session_id, None)
+
+artifact_bus = ArtifactBus()
@@ -0,0 +1,173 @@
+# src/artifact_writer.py
+"""Background artifact writer: bounded queue, atomic temp-file + rename writes, and grouped fsyncs."""
+import atexit
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+from src.config import settings
+from src.file_io import create_temp_file, fsync_dir
+import logging
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ArtifactWriter:
+    """
+    Writes (path, bytes) jobs on worker threads so the caller never waits on
+    disk. Each worker drains up to `batch_size` queued jobs at a time, writes
+    them to temporary files, fsyncs the whole group, renames each into place
+    and then fsyncs every touched directory once. The queue is bounded, so a
+    producer that outruns the disk blocks instead of buffering without limit.
+    """
+
+    def __init__(self, num_threads: Optional[int] = None, queue_size: Optional[int] = None,
+                 batch_size: Optional[int] = None, fsync: Optional[bool] = None):
+        self.num_threads = num_threads or settings.ARTIFACT_WRITER_THREADS
+        self.batch_size = batch_size or settings.ARTIFACT_WRITER_BATCH_SIZE
+        self.fsync = settings.ARTIFACT_FSYNC if fsync is None else fsync
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size or settings.ARTIFACT_WRITER_QUEUE_SIZE)
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._outstanding: Dict[str, int] = {} # group -> jobs submitted and not yet finished
+        self._group_done = threading.Condition()
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.num_threads):
+                thread = threading.Thread(target=self._worker, name=f"artifact-writer-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            atexit.register(self.close)
+
+    def submit(self, path: str, data: bytes, group: Optional[str] = None) -> Future:
+        """
+        Queues `data` to be written atomically to `path`. Blocks while the queue
+        is full. The returned future resolves to `path` once the file is in place.
+        `group` (e.g. a session id) lets `flush` wait for related writes only.
+        """
+        if self._closed:
+            raise RuntimeError("ArtifactWriter is closed.")
+        self._ensure_started()
+        future: Future = Future()
+        if group is not None:
+            with self._group_done:
+                self._outstanding[group] = self._outstanding.get(group, 0) + 1
+        self._queue.put((path, data, future, group))
+        return future
+
+    def flush(self, group: Optional[str] = None):
+        """
+        Barrier: blocks until every job queued so far has been written (or has
+        failed), or, given a `group`, until none of that group's jobs are left.
+        Either way the jobs' futures have resolved and their done-callbacks have run.
+        """
+        if group is not None:
+            with self._group_done:
+                self._group_done.wait_for(lambda: group not in self._outstanding)
+        elif self._threads:
+            self._queue.join()
+
+    def close(self):
+        """Flushes outstanding writes and stops the worker threads."""
+        if self._closed:
+            return
+        self._closed = True
+        if not self._threads:
+            return
+        self.flush()
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                self._queue.task_done()
+                return
+            batch = [job]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stop = True
+                    break
+                batch.append(job)
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # Fail what is left of the batch rather than the thread, which every later write depends on
+                logger.error(f"Error writing a batch of {len(batch)} artifact(s): {e}", exc_info=e)
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                self._finish_groups(batch)
+                for _ in batch:
+                    self._queue.task_done()
+                if stop:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _finish_groups(self, batch: List[Tuple[str, bytes, Future, Optional[str]]]):
+        with self._group_done:
+            for *_, group in batch:
+                if group is None:
+                    continue
+                self._outstanding[group] -= 1
+                if not self._outstanding[group]:
+                    del self._outstanding[group]
+            self._group_done.notify_all()
+
+    def _write_batch(self, batch: List[Tuple[str, bytes, Future, Optional[str]]]):
+        staged: List[Tuple[str, str, Future]] = []
+        for path, data, future, _ in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            tmp_path = None
+            try:
+                directory = os.path.dirname(os.path.abspath(path))
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = create_temp_file(directory)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                staged.append((path, tmp_path, future))
+            except Exception as e:
+                logger.error(f"Error writing artifact {path}: {e}")
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                future.set_exception(e)
+
+        directories = set()
+        for path, tmp_path, future in staged:
+            try:
+                os.replace(tmp_path, path)
+                directories.add(os.path.dirname(os.path.abspath(path)))
+            except Exception as e:
+                logger.error(f"Error moving artifact into place at {path}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                future.set_exception(e)
+        if self.fsync:
+            for directory in directories:
+                fsync_dir(directory)
+        for path, _, future in staged:
+            if not future.done():
+                future.set_result(path)
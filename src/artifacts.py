@@ -1,34 +1,189 @@
 # src/artifacts.py
 """Manages the storage, retrieval, and versioning of artifacts."""
+import json
 import os
-from typing import Any, Dict, Optional
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
 from src.models import Artifact
-from src.file_io import write_file, read_file
+from src.file_io import write_file, read_file, map_file, atomic_write_file, open_stream
 from src.paths import get_root_dir
+from src.config import settings
+from src.content_store import ContentAddressedStore
+from src.serializers import deserialize, serialize
+from src.artifact_bus import artifact_bus
+from src.artifact_writer import ArtifactWriter
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".manifest.jsonl"
 
 class ArtifactManager:
-    def __init__(self, artifact_dir: str = "artifacts"):
+    def __init__(self, artifact_dir: str = "artifacts", backend: Optional[str] = None):
         self.artifact_dir = os.path.join(get_root_dir(), artifact_dir)
         os.makedirs(self.artifact_dir, exist_ok=True)
+        self.backend = (backend or settings.ARTIFACT_BACKEND).lower()
+        if self.backend not in ("filesystem", "cas"):
+            raise ValueError(f"Unknown artifact backend: {self.backend}. Must be 'filesystem' or 'cas'")
+        self._cas: Optional[ContentAddressedStore] = None
+        self._manifests: Dict[str, Dict[str, Tuple[str, Optional[str]]]] = {} # session_id -> {name: (type, serializer)} (filesystem backend)
+        self._writer: Optional[ArtifactWriter] = None
+        self._manifest_lock = threading.Lock()
+
+    @property
+    def cas(self) -> ContentAddressedStore:
+        """The content-addressed store, opened on first use under `<artifact_dir>/cas`."""
+        if self._cas is None:
+            self._cas = ContentAddressedStore(os.path.join(self.artifact_dir, "cas"))
+        return self._cas
+
+    @property
+    def writer(self) -> ArtifactWriter:
+        """The background writer used by `store_artifact_async`, started on first use."""
+        if self._writer is None:
+            self._writer = ArtifactWriter()
+        return self._writer
+
+    def store_artifact(self, artifact: Artifact, session_id: str) -> str:
+        """
+        Serializes an artifact according to its type (see src/serializers.py),
+        stores it atomically, and returns the path it was written to.
+        """
+        data, serializer = serialize(artifact.type, artifact.data)
+        if self.backend == "cas":
+            digest = self.cas.put(data)
+            self.cas.link(session_id, artifact.name, digest, artifact.type, serializer)
+            return self.cas.blob_path(digest)
 
-    def store_artifact(self, artifact: Artifact, session_id: str):
-        """Stores an artifact to disk."""
         artifact_path = os.path.join(self.artifact_dir, session_id, artifact.name)
         os.makedirs(os.path.dirname(artifact_path), exist_ok=True)
-        # Placeholder for proper serialization based on artifact.type
-        write_file(artifact_path, str(artifact.data))
+        atomic_write_file(artifact_path, data, fsync=settings.ARTIFACT_FSYNC)
+        self._record_type(session_id, artifact.name, artifact.type, serializer)
+        return artifact_path
+
+    def store_artifact_async(self, artifact: Artifact, session_id: str) -> Future:
+        """
+        Serializes an artifact on the calling thread and queues the write on the
+        background `ArtifactWriter`, which groups fsyncs across queued writes.
+        Blocks only while the writer's queue is full. The returned future
+        resolves to the artifact's path once it is durably in place.
+        """
+        data, serializer = serialize(artifact.type, artifact.data)
+        if self.backend == "cas":
+            digest, future = self.cas.put_async(data, self.writer, group=session_id)
+            self.cas.link(session_id, artifact.name, digest, artifact.type, serializer)
+        else:
+            artifact_path = os.path.join(self.artifact_dir, session_id, artifact.name)
+            self._record_type(session_id, artifact.name, artifact.type, serializer)
+            future = self.writer.submit(artifact_path, data, group=session_id)
+        return future
+
+    def wait_for_writes(self, session_id: Optional[str] = None):
+        """
+        Blocks until background writes (for one session, or all) have finished
+        and their done-callbacks have run. Other sessions' writes are not waited for.
+        """
+        if self._writer is not None:
+            self._writer.flush(session_id)
+
+    def flush(self):
+        """Blocks until every queued background write has reached disk."""
+        self.wait_for_writes()
 
     def retrieve_artifact(self, name: str, session_id: str) -> Optional[Artifact]:
-        """Retrieves an artifact from disk."""
-        artifact_path = os.path.join(self.artifact_dir, session_id, name)
-        if os.path.exists(artifact_path):
-            # Placeholder for proper deserialization
-            return Artifact(name=name, type="text", data=read_file(artifact_path))
-        return None
+        """
+        Retrieves an artifact and deserializes it according to its stored type.
+        Blobs of at least ARTIFACT_MMAP_THRESHOLD bytes are memory-mapped rather
+        than read, so bytes artifacts come back as a memoryview and `.npy`
+        arrays share the mapped pages.
+        """
+        if self.backend == "cas":
+            entry = self.cas.lookup(session_id, name)
+            if entry is None:
+                return None
+            path, type_, serializer = self.cas.blob_path(entry["digest"]), entry["type"], entry["serializer"]
+        else:
+            path = os.path.join(self.artifact_dir, session_id, name)
+            with self._manifest_lock:
+                type_, serializer = self._manifest(session_id).get(name, ("text", None))
+        if not os.path.exists(path):
+            return None
+
+        if os.path.getsize(path) >= settings.ARTIFACT_MMAP_THRESHOLD:
+            buffer = map_file(path)
+        else:
+            buffer = read_file(path, mode='rb')
+        if buffer is None:
+            return None
+        return Artifact(name=name, type=type_, data=deserialize(type_, buffer, serializer))
+
+    def _manifest(self, session_id: str) -> Dict[str, Tuple[str, Optional[str]]]:
+        """
+        Returns the filesystem backend's name -> (type, serializer) manifest for a session,
+        loading it once. Callers hold `_manifest_lock`.
+        """
+        manifest = self._manifests.get(session_id)
+        if manifest is None:
+            manifest = {}
+            manifest_path = os.path.join(self.artifact_dir, session_id, MANIFEST_FILENAME)
+            if os.path.exists(manifest_path):
+                with open_stream(manifest_path) as stream:
+                    for line in stream:
+                        try:
+                            entry = json.loads(line)
+                            manifest[entry["name"]] = (entry["type"], entry.get("serializer"))
+                        except (json.JSONDecodeError, KeyError) as e:
+                            logger.warning(f"Skipping malformed manifest entry in {manifest_path}: {e}")
+            self._manifests[session_id] = manifest
+        return manifest
+
+    def _record_type(self, session_id: str, name: str, type_: str, serializer: Optional[str] = None):
+        """
+        Appends a manifest entry; later entries for the same name win. `serializer`
+        is recorded only when the artifact is not read with its type's serializer.
+        """
+        with self._manifest_lock:
+            manifest = self._manifest(session_id)
+            if manifest.get(name) == (type_, serializer):
+                return
+            manifest[name] = (type_, serializer)
+            entry = {"name": name, "type": type_}
+            if serializer is not None:
+                entry["serializer"] = serializer
+            manifest_path = os.path.join(self.artifact_dir, session_id, MANIFEST_FILENAME)
+            os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+            write_file(manifest_path, json.dumps(entry) + "\n", mode='a')
+
+    def release_session(self, session_id: str):
+        """Releases a session's artifact references so `collect_garbage` can reclaim unshared blobs."""
+        if self.backend == "cas":
+            self.cas.release_session(session_id)
+
+    def collect_garbage(self) -> List[str]:
+        """Deletes content-addressed blobs no session references any more."""
+        if self.backend == "cas":
+            return self.cas.collect_garbage()
+        return []
+
+    def get_task_artifacts(self, session_id: str, task_id: str) -> Dict[str, Artifact]:
+        """
+        Returns the artifacts a task produced, keyed by name. They are served
+        from the in-memory artifact bus when possible; evicted ones are read
+        back from the store once pending background writes have finished.
+        """
+        artifacts: Dict[str, Artifact] = {}
+        for name in artifact_bus.produced_by(session_id, task_id):
+            artifact = artifact_bus.get(session_id, task_id, name)
+            if artifact is None:
+                self.wait_for_writes(session_id)
+                artifact = self.retrieve_artifact(name, session_id)
+            if artifact is not None:
+                artifacts[name] = artifact
+        return artifacts
 
     def get_contextual_artifacts(self, session_id: str) -> Dict[str, Artifact]:
-        """Provides prior artifacts for contextualization."""
-        # Placeholder for advanced contextualization logic
-        return {}
+        """Provides prior artifacts for contextualization (those still held in memory)."""
+        return artifact_bus.session_artifacts(session_id)
 
 artifact_manager = ArtifactManager()
@@ -0,0 +1,114 @@
+# src/cancellation.py
+"""Cooperative cancellation tokens that agents and LLM providers check while they work."""
+import contextlib
+import threading
+import time
+from typing import Iterator, Optional
+
+
+class TaskCancelled(Exception):
+    """Raised by `CancellationToken.raise_if_cancelled` once a token is cancelled or past its deadline."""
+
+
+class CancellationToken:
+    """
+    Signals that in-flight work should stop. A token is cancelled explicitly
+    via `cancel`, implicitly once its monotonic `deadline` passes, or when its
+    parent is cancelled. Long-running code should call `raise_if_cancelled`
+    between steps, or sleep with `wait` so it wakes up early on cancellation.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, parent: Optional["CancellationToken"] = None):
+        self.deadline = deadline
+        self.parent = parent
+        self._event = threading.Event()
+        self._reason: Optional[str] = None
+
+    @classmethod
+    def with_timeout(cls, timeout: Optional[float], parent: Optional["CancellationToken"] = None) -> "CancellationToken":
+        """Creates a token that expires `timeout` seconds from now (never, if None)."""
+        return cls(deadline=None if timeout is None else time.monotonic() + timeout, parent=parent)
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cancels the token. The first reason given is kept."""
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline exceeded")
+            return True
+        if self.parent is not None and self.parent.cancelled:
+            self.cancel(self.parent.reason or "cancelled")
+            return True
+        return False
+
+    @property
+    def reason(self) -> Optional[str]:
+        return self._reason
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the nearest deadline in the token chain, or None if there is none."""
+        deadlines = []
+        token: Optional[CancellationToken] = self
+        while token is not None:
+            if token.deadline is not None:
+                deadlines.append(token.deadline)
+            token = token.parent
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def raise_if_cancelled(self):
+        """Raises TaskCancelled if the token has been cancelled."""
+        if self.cancelled:
+            raise TaskCancelled(self.reason or "cancelled")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Sleeps for up to `timeout` seconds, waking early on cancellation.
+        Returns True if the token is cancelled.
+        """
+        remaining = self.remaining()
+        if remaining is not None and (timeout is None or remaining < timeout):
+            timeout = remaining
+        if self.parent is None:
+            self._event.wait(timeout)
+        else:
+            # Poll so a parent's cancellation is noticed too.
+            end = None if timeout is None else time.monotonic() + timeout
+            while not self.cancelled:
+                step = 0.05 if end is None else min(0.05, end - time.monotonic())
+                if step <= 0:
+                    break
+                self._event.wait(step)
+        return self.cancelled
+
+
+class _NeverCancelled(CancellationToken):
+    def cancel(self, reason: str = "cancelled"):
+        pass
+
+
+_NEVER = _NeverCancelled()
+_local = threading.local()
+
+
+def current_token() -> CancellationToken:
+    """Returns the token of the task running on this thread, or a token that is never cancelled."""
+    return getattr(_local, "token", None) or _NEVER
+
+
+@contextlib.contextmanager
+def use_token(token: CancellationToken) -> Iterator[CancellationToken]:
+    """Installs `token` as this thread's current token for the duration of the block."""
+    previous = getattr(_local, "token", None)
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
@@ -2,11 +2,21 @@
 """Defines and parses command-line interface arguments and subcommands."""
 import argparse
 import os
+import sys
+import threading
+from src.config import settings
 from src.paths import get_root_dir
 from src.logger import setup_logging
 from src.workflow_loader import workflow_loader
 from src.orchestrator import Orchestrator
 from src.agents.factory import AgentFactory
+from src.session_store import get_session_store
+from src.artifacts import artifact_manager
+from src.session_manager import session_manager
+from src.server import serve
+from src.distributed.factory import create_broker
+from src.distributed.worker import Worker
+from src.workflow.state import FailurePolicy, WorkflowState, workflow_state_machine
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +28,25 @@ def main_cli():
     # Run command
     run_parser = subparsers.add_parser("run", help="Run a workflow")
     run_parser.add_argument("workflow_file", type=str, help="Path to workflow definition file (e.g., workflows/my_workflow.yaml)")
+    run_parser.add_argument("--incremental", action="store_true", help="Reuse memoized results of tasks whose inputs, agent spec, prompts and upstream results are unchanged")
+    run_parser.add_argument("--failure-policy", type=str, default=None, choices=[p.value for p in FailurePolicy], help="What to do when a task fails (default: settings.FAILURE_POLICY)")
+    run_parser.add_argument("--max-parallel", type=int, default=None, help="Maximum number of tasks to run concurrently (default: settings.MAX_PARALLEL_TASKS)")
+    run_parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS", help="Cancel the workflow if it runs longer than this (default: settings.WORKFLOW_TIMEOUT_S)")
+    run_parser.add_argument("--broker", type=str, default=None, choices=["inprocess", "sqlite", "redis"], help="Publish tasks to this task broker for distributed workers instead of running them in-process")
+    run_parser.add_argument("--workers", type=int, default=0, help="Local worker threads to start on the broker (at least 1 for the inprocess broker)")
+    run_parser.add_argument("--resume", type=str, default=None, metavar="SESSION_ID", help="Resume an interrupted session, re-running only tasks that did not complete")
+
+    # Serve command
+    serve_parser = subparsers.add_parser("serve", help="Run a worker daemon that accepts workflow jobs over a local HTTP API")
+    serve_parser.add_argument("--host", type=str, default=None, help="Interface to listen on (default: settings.SERVE_HOST)")
+    serve_parser.add_argument("--port", type=int, default=None, help="Port to listen on (default: settings.SERVE_PORT)")
+    serve_parser.add_argument("--socket", type=str, default=None, metavar="PATH", help="Listen on a Unix socket instead of TCP")
+    serve_parser.add_argument("--concurrency", type=int, default=None, help="Workflows to run at once (default: settings.MAX_CONCURRENT_RUNS)")
+
+    # Worker command
+    worker_parser = subparsers.add_parser("worker", help="Run tasks published to a task broker by 'run --broker'")
+    worker_parser.add_argument("--broker", type=str, default=None, choices=["sqlite", "redis"], help="Task broker backend (default: settings.BROKER_BACKEND)")
+    worker_parser.add_argument("--max-tasks", type=int, default=None, help="Exit after running this many tasks")
 
     # Init command
     init_parser = subparsers.add_parser("init", help="Initialize a new project")
@@ -25,15 +54,56 @@ def main_cli():
     # Status command
     status_parser = subparsers.add_parser("status", help="Show current system status")
 
+    # Sessions command
+    sessions_parser = subparsers.add_parser("sessions", help="List past workflow sessions")
+    sessions_parser.add_argument("--status", type=str, default=None, help="Only show sessions with this status (e.g., FAILED)")
+    sessions_parser.add_argument("--since", type=str, default=None, help="Only show sessions started at or after this ISO timestamp")
+    sessions_parser.add_argument("--limit", type=int, default=20, help="Maximum number of sessions to show")
+
+    # Garbage-collect command
+    gc_parser = subparsers.add_parser("gc", help="Delete content-addressed artifacts no session references")
+    gc_parser.add_argument("--release", type=str, nargs="*", default=[], metavar="SESSION_ID", help="Release these sessions' artifacts before collecting")
+
     args = parser.parse_args()
+    if args.command == "run" and args.broker == "inprocess" and args.workers < 1:
+        run_parser.error("--broker inprocess needs --workers 1 or more; nothing else consumes its tasks")
 
     if args.command == "run":
         logger.info(f"Attempting to run workflow from: {args.workflow_file}")
         try:
-            tasks = workflow_loader.load_workflow_from_file(args.workflow_file)
+            tasks = workflow_loader.load_workflow_graph_from_file(args.workflow_file)
+            if args.resume:
+                session_manager.resume_session(args.resume)
+            elif session_manager.get_current_session() is None:
+                session_manager.start_session()
             agent_factory = AgentFactory()
-            orchestrator = Orchestrator(agent_factory)
-            orchestrator.run_workflow(tasks)
+            broker = create_broker(args.broker) if args.broker else None
+            stop_workers = threading.Event()
+            workers = [threading.Thread(target=Worker(broker, agent_factory).run, args=(stop_workers,), daemon=True)
+                       for _ in range(args.workers if broker else 0)]
+            for worker in workers:
+                worker.start()
+            orchestrator = Orchestrator(
+                agent_factory,
+                use_cache=True if args.incremental else None,
+                failure_policy=args.failure_policy,
+                max_parallel=args.max_parallel,
+                deadline_s=args.timeout,
+                broker=broker,
+            )
+            try:
+                outcomes = orchestrator.run_workflow(tasks)
+            finally:
+                stop_workers.set()
+                for worker in workers:
+                    worker.join(timeout=settings.CANCEL_GRACE_S)
+                if broker is not None:
+                    broker.close()
+            for outcome in outcomes.values():
+                if outcome.status in ("failed", "skipped", "cancelled"):
+                    print(f"{outcome.task_id}  {outcome.status:<9} {outcome.error or ''}")
+            if workflow_state_machine.get_state() == WorkflowState.CANCELLED:
+                sys.exit(130) # Conventional exit code for SIGINT
         except FileNotFoundError as e:
             logger.error(f"Error: {e}")
             sys.exit(1)
@@ -43,12 +113,34 @@ def main_cli():
         except Exception as e:
             logger.error(f"An unexpected error occurred during workflow execution: {e}", exc_info=True)
             sys.exit(1)
+    elif args.command == "serve":
+        serve(host=args.host, port=args.port, socket_path=args.socket, concurrency=args.concurrency)
+    elif args.command == "worker":
+        try:
+            broker = create_broker(args.broker)
+        except ImportError as e:
+            logger.error(f"Task broker unavailable: {e}")
+            sys.exit(1)
+        try:
+            Worker(broker).run(max_tasks=args.max_tasks)
+        except KeyboardInterrupt:
+            logger.info("Worker interrupted.")
+        finally:
+            broker.close()
     elif args.command == "init":
         print("Initializing new project...")
         # Placeholder: Call project initialization logic
     elif args.command == "status":
         print("Showing system status...")
         # Placeholder: Call status display logic
+    elif args.command == "sessions":
+        for row in get_session_store().list_sessions(status=args.status, since=args.since, limit=args.limit):
+            print(f"{row['id']}  {row['status']:<10} {row['start_time']}  {row['end_time'] or '-'}")
+    elif args.command == "gc":
+        for session_id in args.release:
+            artifact_manager.release_session(session_id)
+        removed = artifact_manager.collect_garbage()
+        print(f"Removed {len(removed)} unreferenced artifact blob(s).")
     else:
         parser.print_help()
 
@@ -11,6 +11,51 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     PROMPTS_DIR: str = "prompts"
     ARTIFACTS_DIR: str = "artifacts"
+    ARTIFACT_BACKEND: str = "filesystem" # "filesystem" or "cas" (content-addressed, deduplicating)
+    ARTIFACT_MMAP_THRESHOLD: int = 1024 * 1024 # Artifacts at least this large are memory-mapped on retrieval
+    ARTIFACT_BUS_MAX_BYTES: int = 256 * 1024 * 1024 # In-memory artifact handoff budget per session
+    ARTIFACT_WRITER_THREADS: int = 1
+    ARTIFACT_WRITER_QUEUE_SIZE: int = 1024 # Pending background writes before producers block
+    ARTIFACT_WRITER_BATCH_SIZE: int = 64 # Writes grouped under one round of fsyncs
+    ARTIFACT_FSYNC: bool = True # fsync artifact data and directory entries before reporting a write done
+
+    # Session persistence (SQLite, relative to the project root)
+    SESSION_PERSISTENCE_ENABLED: bool = True
+    SESSION_DB_PATH: str = "database/sessions.db"
+    SESSION_LOG_FLUSH_BATCH: int = 100
+    SESSION_LOG_FLUSH_INTERVAL_S: float = 5.0
+    SESSION_LOG_BUFFER_SIZE: int = 1000 # In-memory log entries kept per session
+    FAILURE_POLICY: str = "fail_fast" # "fail_fast", "continue_independent" or "retry_n"
+    TASK_MAX_RETRIES: int = 2 # Retries per task under the "retry_n" failure policy
+    MAX_PARALLEL_TASKS: int = 1 # Tasks whose dependencies are met that may run concurrently
+    MAP_CHUNK_SIZE: int = 100 # Items of a map task expanded into tasks at a time
+    TASK_TIMEOUT_S: Optional[float] = None # Default per-task timeout; TaskSpec.timeout overrides it
+    WORKFLOW_TIMEOUT_S: Optional[float] = None # Deadline for a whole workflow run
+    MAX_CONCURRENT_RUNS: int = 4 # Workflows SystemRuntime executes at once
+    CANCEL_GRACE_S: float = 5.0 # How long Ctrl-C waits for in-flight tasks before cancelling them
+    TASK_CACHE_ENABLED: bool = False # Reuse memoized results of tasks whose fingerprint is unchanged
+    SERVE_HOST: str = "127.0.0.1" # Interface the `serve` job API listens on
+    SERVE_PORT: int = 8765
+    SERVE_MAX_FINISHED_JOBS: int = 1000 # Finished jobs kept for status queries before the oldest are forgotten
+    SERVE_MAX_REQUEST_BYTES: int = 10 * 1024 * 1024
+    SERVE_WORKFLOWS_DIR: str = "workflows" # Relative to the root dir; `workflow` paths submitted to the job API must lie inside it
+    BROKER_BACKEND: str = "sqlite" # "inprocess", "sqlite" or "redis" (requires `redis`)
+    BROKER_DB_PATH: str = "database/broker.db" # Relative to the root dir; shared by the orchestrator and its workers
+    BROKER_REDIS_URL: str = "redis://localhost:6379/0"
+    BROKER_LEASE_S: float = 30.0 # A task whose worker stops heartbeating is re-delivered after this long
+    BROKER_HEARTBEAT_S: float = 10.0
+    BROKER_MAX_DELIVERIES: int = 3 # Deliveries before a task is given up as lost
+    BROKER_POLL_INTERVAL_S: float = 0.05
+    PROCESS_POOL_WORKERS: Optional[int] = None # Processes for agents with `executor: process` (default: CPU count)
+    PROCESS_POOL_SHM_THRESHOLD: int = 1024 * 1024 # Payloads of this many bytes or more go through shared memory
+    PROMPT_TOKEN_BUDGET: Optional[int] = None # Default limit on an assembled prompt's estimated tokens
+    PROMPT_CACHE_MIN_TOKENS: int = 1024 # Prefixes at least this long are marked for provider-side prompt caching
+    PROMPT_PREFIX_CACHE_SIZE: int = 256 # Rendered prompt prefixes kept for reuse across tasks
+    SEMANTIC_CACHE_ENABLED: bool = False # Answer near-duplicate LLM prompts from the semantic cache (requires `numpy`)
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9 # Cosine similarity at or above which a cached response is reused
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10000 # Least recently used responses are evicted beyond this
+    SEMANTIC_CACHE_DIM: int = 1024 # Buckets of the default hashing embedder
+    SEMANTIC_CACHE_PATH: Optional[str] = "database/semantic_cache.npz" # Relative to the root dir; None keeps it in memory
 
     # LLM Settings
     GEMINI_API_KEY: Optional[str] = None
@@ -24,6 +69,17 @@ class Settings(BaseSettings):
     MISTRAL_API_KEY: Optional[str] = None
     MISTRAL_ENDPOINT: str = "https://api.mistral.ai/v1"
 
+    # Mock provider ("mock"): a local stand-in for measuring throughput, retries and timeouts without network
+    MOCK_LLM_LATENCY: str = "fixed" # Latency distribution: "fixed", "lognormal" or "pareto" (heavy-tailed)
+    MOCK_LLM_LATENCY_S: float = 0.0 # Fixed latency, lognormal median or pareto minimum, in seconds
+    MOCK_LLM_LATENCY_SIGMA: float = 0.5 # Spread of the lognormal distribution
+    MOCK_LLM_PARETO_ALPHA: float = 1.5 # Tail index of the pareto distribution; lower is heavier
+    MOCK_LLM_TOKENS_PER_S: Optional[float] = None # Generation speed after the latency; None returns the whole response at once
+    MOCK_LLM_ERROR_RATE: float = 0.0 # Fraction of requests that fail with LLMProviderError
+    MOCK_LLM_RATE_LIMIT_RATE: float = 0.0 # Fraction of requests rejected with RateLimitError (HTTP 429)
+    MOCK_LLM_SEED: int = 0 # Seeds latencies and failures, which are reproducible per prompt
+    MOCK_LLM_RECORDINGS: Optional[str] = None # JSON or JSON-lines file of recorded responses to replay
+
     # Active LLM Providers (comma-separated list of names like "gemini", "ollama")
     ACTIVE_LLM_PROVIDERS: str = "gemini" 
 
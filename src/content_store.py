@@ -0,0 +1,178 @@
+# src/content_store.py
+"""Content-addressed, deduplicating blob store with per-session manifests and reference-counted GC."""
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+from src.file_io import create_temp_file
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS manifests (
+    session_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL REFERENCES blobs(digest),
+    type TEXT NOT NULL,
+    serializer TEXT, -- Set when the blob is not read with its type's serializer (see src/serializers.py)
+    PRIMARY KEY (session_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_blobs_refcount ON blobs(refcount);
+"""
+
+
+class ContentAddressedStore:
+    """
+    Stores blobs under `<root>/objects/<aa>/<bb>/<sha256>`. Identical content is
+    written once; each (session, name) manifest entry holds one reference to a
+    blob, and `collect_garbage` deletes blobs that are no longer referenced.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(manifests)")}
+            if "serializer" not in columns: # Index created before serializers were recorded
+                self._conn.execute("ALTER TABLE manifests ADD COLUMN serializer TEXT")
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """Returns the SHA-256 hex digest used as a blob key."""
+        return hashlib.sha256(data).hexdigest()
+
+    def blob_path(self, digest: str) -> str:
+        """Returns the sharded path of a blob."""
+        return os.path.join(self.objects_dir, digest[:2], digest[2:4], digest)
+
+    def put(self, data: bytes) -> str:
+        """Writes a blob if its content is not already stored and returns its digest."""
+        digest = self.digest(data)
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            shard_dir = os.path.dirname(path)
+            os.makedirs(shard_dir, exist_ok=True)
+            fd, tmp_path = create_temp_file(shard_dir)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        else:
+            logger.debug(f"Blob {digest} already stored; skipping write.")
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO blobs (digest, size, refcount) VALUES (?, ?, 0)", (digest, len(data)))
+        return digest
+
+    def put_async(self, data: bytes, writer, group: Optional[str] = None) -> Tuple[str, Future]:
+        """
+        Like `put`, but hands the blob write to an `ArtifactWriter` (in `group`). The blob is
+        indexed immediately. Returns its digest and a future that resolves to
+        its path once the content is on disk (at once if it was already stored).
+        """
+        digest = self.digest(data)
+        path = self.blob_path(digest)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO blobs (digest, size, refcount) VALUES (?, ?, 0)", (digest, len(data)))
+        if os.path.exists(path):
+            logger.debug(f"Blob {digest} already stored; skipping write.")
+            future: Future = Future()
+            future.set_result(path)
+            return digest, future
+        return digest, writer.submit(path, data, group)
+
+    def read(self, digest: str) -> Optional[bytes]:
+        """Reads a blob's content, or returns None if it does not exist."""
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def link(self, session_id: str, name: str, digest: str, type_: str, serializer: Optional[str] = None):
+        """
+        Points a session's manifest entry at a blob, taking a reference to it
+        and releasing the reference held by any previous entry of the same name.
+        `serializer` is recorded when the blob is not read with its type's serializer.
+        """
+        with self._lock, self._conn:
+            previous = self._conn.execute(
+                "SELECT digest FROM manifests WHERE session_id = ? AND name = ?", (session_id, name)
+            ).fetchone()
+            if previous is not None and previous["digest"] == digest:
+                self._conn.execute(
+                    "UPDATE manifests SET type = ?, serializer = ? WHERE session_id = ? AND name = ?",
+                    (type_, serializer, session_id, name),
+                )
+                return
+            if previous is not None:
+                self._conn.execute("UPDATE blobs SET refcount = refcount - 1 WHERE digest = ?", (previous["digest"],))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO manifests (session_id, name, digest, type, serializer) VALUES (?, ?, ?, ?, ?)",
+                (session_id, name, digest, type_, serializer),
+            )
+            self._conn.execute("UPDATE blobs SET refcount = refcount + 1 WHERE digest = ?", (digest,))
+
+    def lookup(self, session_id: str, name: str) -> Optional[Dict[str, Optional[str]]]:
+        """Returns the manifest entry ({'digest', 'type', 'serializer'}) for a session artifact, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, type, serializer FROM manifests WHERE session_id = ? AND name = ?", (session_id, name)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def manifest(self, session_id: str) -> Dict[str, Dict[str, str]]:
+        """Returns the whole manifest of a session, keyed by artifact name."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, digest, type FROM manifests WHERE session_id = ?", (session_id,)
+            ).fetchall()
+        return {row["name"]: {"digest": row["digest"], "type": row["type"]} for row in rows}
+
+    def release_session(self, session_id: str):
+        """Drops a session's manifest and releases its blob references."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE blobs SET refcount = refcount - "
+                "(SELECT COUNT(*) FROM manifests m WHERE m.session_id = ? AND m.digest = blobs.digest) "
+                "WHERE digest IN (SELECT digest FROM manifests WHERE session_id = ?)",
+                (session_id, session_id),
+            )
+            self._conn.execute("DELETE FROM manifests WHERE session_id = ?", (session_id,))
+
+    def collect_garbage(self) -> List[str]:
+        """Deletes blobs with no remaining references and returns their digests."""
+        with self._lock, self._conn:
+            digests = [row["digest"] for row in self._conn.execute("SELECT digest FROM blobs WHERE refcount <= 0")]
+            self._conn.executemany("DELETE FROM blobs WHERE digest = ?", [(d,) for d in digests])
+        for digest in digests:
+            try:
+                os.remove(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+        if digests:
+            logger.info(f"Garbage collected {len(digests)} unreferenced blob(s).")
+        return digests
+
+    def close(self):
+        """Closes the index connection."""
+        with self._lock:
+            self._conn.close()
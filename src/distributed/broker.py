@@ -0,0 +1,138 @@
+# src/distributed/broker.py
+"""Task broker interface for distributed execution, and an in-process implementation."""
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional
+from src.config import settings
+from src.models import TaskDelivery
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TaskBroker(ABC):
+    """
+    A work queue between the orchestrator and its workers.
+
+    The orchestrator `publish`es encoded tasks and collects encoded responses
+    with `take_results`. Workers `lease` a task, `heartbeat` while running it
+    and `complete` it with a result. A task whose lease expires (its worker
+    died or stalled) is re-delivered to the next worker that asks; after
+    `max_deliveries` deliveries it is given up and its result is None.
+    """
+
+    def __init__(self, max_deliveries: Optional[int] = None):
+        self.max_deliveries = max_deliveries or settings.BROKER_MAX_DELIVERIES
+
+    @abstractmethod
+    def publish(self, task_id: str, payload: bytes) -> str:
+        """Queues a task and returns its message id."""
+        pass
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_s: float) -> Optional[TaskDelivery]:
+        """Claims the oldest queued (or lease-expired) task for `lease_s` seconds, or returns None."""
+        pass
+
+    @abstractmethod
+    def heartbeat(self, message_id: str, worker_id: str, lease_s: float) -> bool:
+        """Extends a lease. Returns False if the worker no longer holds it (expired and re-delivered, or cancelled)."""
+        pass
+
+    @abstractmethod
+    def complete(self, message_id: str, worker_id: str, result: bytes) -> bool:
+        """Posts a task's result. Returns False, discarding it, if the worker no longer holds the lease."""
+        pass
+
+    @abstractmethod
+    def cancel(self, message_id: str):
+        """Withdraws a task; a worker running it loses its lease."""
+        pass
+
+    @abstractmethod
+    def take_results(self, message_ids: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        """
+        Removes and returns the results available for the given messages. A
+        value of None means the task was given up after `max_deliveries`.
+        """
+        pass
+
+    def close(self):
+        """Releases the broker's connections."""
+        pass
+
+
+class InProcessBroker(TaskBroker):
+    """A broker for workers running as threads of the orchestrator's process."""
+
+    def __init__(self, max_deliveries: Optional[int] = None):
+        super().__init__(max_deliveries)
+        self._lock = threading.Lock()
+        self._messages: Dict[str, Dict[str, Any]] = {}
+        self._ready: Deque[str] = deque()
+        self._leased: Dict[str, float] = {} # message_id -> lease expiry
+        self._results: Dict[str, Optional[bytes]] = {}
+
+    def publish(self, task_id: str, payload: bytes) -> str:
+        message_id = str(uuid.uuid4())
+        with self._lock:
+            self._messages[message_id] = {"task_id": task_id, "payload": payload, "worker_id": None, "deliveries": 0}
+            self._ready.append(message_id)
+        return message_id
+
+    def lease(self, worker_id: str, lease_s: float) -> Optional[TaskDelivery]:
+        now = time.time()
+        with self._lock:
+            for message_id, expires in list(self._leased.items()):
+                if expires <= now:
+                    del self._leased[message_id]
+                    if self._messages[message_id]["deliveries"] >= self.max_deliveries:
+                        logger.error(f"Giving up on message {message_id} after {self.max_deliveries} deliveries.")
+                        del self._messages[message_id]
+                        self._results[message_id] = None
+                    else:
+                        self._ready.appendleft(message_id) # Re-deliver ahead of newer tasks
+            while self._ready:
+                message_id = self._ready.popleft()
+                message = self._messages.get(message_id)
+                if message is None:
+                    continue # Cancelled while queued
+                message["worker_id"] = worker_id
+                message["deliveries"] += 1
+                self._leased[message_id] = now + lease_s
+                return TaskDelivery(message_id=message_id, task_id=message["task_id"],
+                                    payload=message["payload"], attempt=message["deliveries"])
+        return None
+
+    def _holds(self, message_id: str, worker_id: str) -> bool:
+        message = self._messages.get(message_id)
+        return message is not None and message_id in self._leased and message["worker_id"] == worker_id
+
+    def heartbeat(self, message_id: str, worker_id: str, lease_s: float) -> bool:
+        with self._lock:
+            if not self._holds(message_id, worker_id):
+                return False
+            self._leased[message_id] = time.time() + lease_s
+            return True
+
+    def complete(self, message_id: str, worker_id: str, result: bytes) -> bool:
+        with self._lock:
+            if not self._holds(message_id, worker_id):
+                return False
+            del self._leased[message_id]
+            del self._messages[message_id]
+            self._results[message_id] = result
+            return True
+
+    def cancel(self, message_id: str):
+        with self._lock:
+            self._messages.pop(message_id, None)
+            self._leased.pop(message_id, None)
+            self._results.pop(message_id, None)
+
+    def take_results(self, message_ids: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        with self._lock:
+            return {message_id: self._results.pop(message_id) for message_id in message_ids if message_id in self._results}
@@ -0,0 +1,23 @@
+# src/distributed/factory.py
+"""Creates the task broker selected by configuration."""
+from typing import Optional
+from src.config import settings
+from src.distributed.broker import InProcessBroker, TaskBroker
+from src.distributed.redis_broker import RedisBroker
+from src.distributed.sqlite_broker import SQLiteBroker
+
+
+def create_broker(backend: Optional[str] = None) -> TaskBroker:
+    """
+    Creates a broker for `backend` (default: settings.BROKER_BACKEND):
+    "inprocess", "sqlite" (settings.BROKER_DB_PATH) or "redis" (settings.BROKER_REDIS_URL).
+    Raises ValueError for an unknown backend, and ImportError for "redis" without the `redis` package.
+    """
+    backend = (backend or settings.BROKER_BACKEND).lower()
+    if backend == "inprocess":
+        return InProcessBroker()
+    if backend == "sqlite":
+        return SQLiteBroker()
+    if backend == "redis":
+        return RedisBroker()
+    raise ValueError(f"Unknown broker backend: {backend}. Must be 'inprocess', 'sqlite' or 'redis'.")
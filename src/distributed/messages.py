@@ -0,0 +1,55 @@
+# src/distributed/messages.py
+"""Wire encoding of tasks and agent responses exchanged through a task broker."""
+import base64
+import json
+from typing import Any, Dict
+from src.models import AgentResponse, Artifact, TaskSpec
+from src.serializers import deserialize, serialize
+
+_ARTIFACT_KEY = "__artifact__"
+
+
+def _encode_artifact(artifact: Artifact) -> Dict[str, Any]:
+    # Artifact payloads go through the same serializers as the artifact store, so bytes and arrays survive the trip
+    data, serializer = serialize(artifact.type, artifact.data)
+    encoded = {"name": artifact.name, "type": artifact.type, "data": base64.b64encode(data).decode("ascii")}
+    if serializer is not None:
+        encoded["serializer"] = serializer
+    return encoded
+
+
+def _decode_artifact(encoded: Dict[str, Any]) -> Artifact:
+    data = deserialize(encoded["type"], base64.b64decode(encoded["data"]), encoded.get("serializer"))
+    return Artifact(name=encoded["name"], type=encoded["type"], data=data)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Artifact):
+        return {_ARTIFACT_KEY: _encode_artifact(value)}
+    return str(value)
+
+
+def _object_hook(value: Dict[str, Any]) -> Any:
+    if _ARTIFACT_KEY in value and len(value) == 1:
+        return _decode_artifact(value[_ARTIFACT_KEY])
+    return value
+
+
+def encode_task(task: TaskSpec) -> bytes:
+    """Encodes a task, including any artifacts in its `input_data` (e.g. upstream artifacts)."""
+    body = {**task.model_dump(exclude={"input_data"}), "input_data": task.input_data}
+    return json.dumps(body, default=_default).encode("utf-8")
+
+
+def decode_task(payload: bytes) -> TaskSpec:
+    return TaskSpec(**json.loads(payload, object_hook=_object_hook))
+
+
+def encode_response(response: AgentResponse) -> bytes:
+    body = {"status": response.status, "output": response.output, "artifacts": response.artifacts,
+            "new_tasks": [{**task.model_dump(exclude={"input_data"}), "input_data": task.input_data} for task in response.new_tasks]}
+    return json.dumps(body, default=_default).encode("utf-8")
+
+
+def decode_response(payload: bytes) -> AgentResponse:
+    return AgentResponse(**json.loads(payload, object_hook=_object_hook))
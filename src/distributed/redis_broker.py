@@ -0,0 +1,133 @@
+# src/distributed/redis_broker.py
+"""Task broker backed by Redis, for workers spread across hosts."""
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+from src.config import settings
+from src.distributed.broker import TaskBroker
+from src.models import TaskDelivery
+import logging
+
+try:
+    import redis
+except ImportError:  # Optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_DONE = b"R" # Result prefix of a completed task
+_DEAD = b"D" # Result marker of a task given up after max_deliveries
+
+
+class RedisBroker(TaskBroker):
+    """
+    Keeps the queue in Redis under `prefix`:
+        <prefix>:queue         list of queued message ids
+        <prefix>:leases        sorted set of leased message ids, scored by lease expiry
+        <prefix>:msg:<id>      hash with task_id, payload, worker_id and deliveries
+        <prefix>:results       hash of message id -> result
+    Expired leases are moved back to the queue by whichever worker next asks
+    for a task; `ZREM` decides the single winner when several do at once.
+    Requires the `redis` package, or a compatible `client` (e.g. fakeredis).
+    """
+
+    def __init__(self, url: Optional[str] = None, client: Any = None, prefix: str = "broker",
+                 max_deliveries: Optional[int] = None):
+        super().__init__(max_deliveries)
+        if client is None:
+            if redis is None:
+                raise ImportError("The redis broker requires the 'redis' package (pip install redis).")
+            client = redis.Redis.from_url(url or settings.BROKER_REDIS_URL)
+        self._redis = client
+        self._queue = f"{prefix}:queue"
+        self._leases = f"{prefix}:leases"
+        self._results = f"{prefix}:results"
+        self._prefix = prefix
+
+    def _message_key(self, message_id: str) -> str:
+        return f"{self._prefix}:msg:{message_id}"
+
+    def publish(self, task_id: str, payload: bytes) -> str:
+        message_id = str(uuid.uuid4())
+        pipe = self._redis.pipeline()
+        pipe.hset(self._message_key(message_id), mapping={"task_id": task_id, "payload": payload, "deliveries": 0})
+        pipe.rpush(self._queue, message_id)
+        pipe.execute()
+        return message_id
+
+    def _requeue_expired(self, now: float):
+        for raw_id in self._redis.zrangebyscore(self._leases, "-inf", now):
+            if not self._redis.zrem(self._leases, raw_id):
+                continue # Another worker requeued it first
+            message_id = raw_id.decode() if isinstance(raw_id, bytes) else raw_id
+            deliveries = int(self._redis.hget(self._message_key(message_id), "deliveries") or 0)
+            if deliveries >= self.max_deliveries:
+                logger.error(f"Giving up on message {message_id} after {self.max_deliveries} deliveries.")
+                pipe = self._redis.pipeline()
+                pipe.hset(self._results, message_id, _DEAD)
+                pipe.delete(self._message_key(message_id))
+                pipe.execute()
+            else:
+                self._redis.lpush(self._queue, message_id) # Re-deliver ahead of newer tasks
+
+    def lease(self, worker_id: str, lease_s: float) -> Optional[TaskDelivery]:
+        now = time.time()
+        self._requeue_expired(now)
+        while True:
+            raw_id = self._redis.lpop(self._queue)
+            if raw_id is None:
+                return None
+            message_id = raw_id.decode() if isinstance(raw_id, bytes) else raw_id
+            key = self._message_key(message_id)
+            pipe = self._redis.pipeline()
+            pipe.zadd(self._leases, {message_id: now + lease_s})
+            pipe.hset(key, "worker_id", worker_id)
+            pipe.hincrby(key, "deliveries", 1)
+            pipe.hmget(key, "task_id", "payload")
+            _, _, deliveries, (task_id, payload) = pipe.execute()
+            if task_id is None:
+                self._redis.zrem(self._leases, message_id) # Cancelled while queued
+                self._redis.delete(key)
+                continue
+            return TaskDelivery(message_id=message_id, task_id=task_id.decode(), payload=payload, attempt=deliveries)
+
+    def _holds(self, message_id: str, worker_id: str) -> bool:
+        holder = self._redis.hget(self._message_key(message_id), "worker_id")
+        return holder is not None and holder.decode() == worker_id and self._redis.zscore(self._leases, message_id) is not None
+
+    def heartbeat(self, message_id: str, worker_id: str, lease_s: float) -> bool:
+        if not self._holds(message_id, worker_id):
+            return False
+        return self._redis.zadd(self._leases, {message_id: time.time() + lease_s}, xx=True, ch=True) == 1
+
+    def complete(self, message_id: str, worker_id: str, result: bytes) -> bool:
+        if not self._holds(message_id, worker_id) or not self._redis.zrem(self._leases, message_id):
+            return False
+        pipe = self._redis.pipeline()
+        pipe.hset(self._results, message_id, _DONE + result)
+        pipe.delete(self._message_key(message_id))
+        pipe.execute()
+        return True
+
+    def cancel(self, message_id: str):
+        pipe = self._redis.pipeline()
+        pipe.lrem(self._queue, 0, message_id)
+        pipe.zrem(self._leases, message_id)
+        pipe.delete(self._message_key(message_id))
+        pipe.hdel(self._results, message_id)
+        pipe.execute()
+
+    def take_results(self, message_ids: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        ids: List[str] = list(message_ids)
+        if not ids:
+            return {}
+        results: Dict[str, Optional[bytes]] = {}
+        for message_id, value in zip(ids, self._redis.hmget(self._results, ids)):
+            if value is not None:
+                results[message_id] = value[1:] if value[:1] == _DONE else None
+        if results:
+            self._redis.hdel(self._results, *results)
+        return results
+
+    def close(self):
+        self._redis.close()
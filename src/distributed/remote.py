@@ -0,0 +1,86 @@
+# src/distributed/remote.py
+"""Dispatches tasks through a task broker and resolves their futures as workers post results."""
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+from src.cancellation import CancellationToken
+from src.config import settings
+from src.distributed.broker import TaskBroker
+from src.distributed.messages import decode_response, encode_task
+from src.models import TaskSpec
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TaskLost(Exception):
+    """Raised for a task the broker gave up on after its worker(s) stopped heartbeating too many times."""
+
+
+class RemoteExecutor:
+    """
+    The orchestrator-side counterpart of `Worker`. `submit` publishes a task
+    and returns a future; a poller thread collects results from the broker
+    and withdraws tasks whose cancellation token fires (timeouts, deadline,
+    Ctrl-C), so their workers stop at the next heartbeat.
+    """
+
+    def __init__(self, broker: TaskBroker, poll_interval_s: Optional[float] = None):
+        self.broker = broker
+        self.poll_interval_s = poll_interval_s or settings.BROKER_POLL_INTERVAL_S
+        self._pending: Dict[str, Tuple[Future, CancellationToken]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+
+    def submit(self, task: TaskSpec, token: Optional[CancellationToken] = None) -> Future:
+        """Publishes a task. Artifacts in its `input_data` travel with it."""
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        message_id = self.broker.publish(task.id, encode_task(task))
+        with self._lock:
+            self._pending[message_id] = (future, token or CancellationToken())
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="broker-poller", daemon=True)
+                self._poller.start()
+        return future
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval_s):
+            with self._lock:
+                pending = dict(self._pending)
+            if not pending:
+                continue
+            for message_id, (_, token) in pending.items():
+                if token.cancelled:
+                    self.broker.cancel(message_id)
+                    with self._lock:
+                        self._pending.pop(message_id, None)
+            try:
+                results = self.broker.take_results(pending)
+            except Exception as e:
+                logger.error(f"Failed to poll the task broker: {e}")
+                continue
+            for message_id, payload in results.items():
+                with self._lock:
+                    entry = self._pending.pop(message_id, None)
+                if entry is None:
+                    continue
+                future, _ = entry
+                if payload is None:
+                    future.set_exception(TaskLost(f"Task was lost after {self.broker.max_deliveries} deliveries"))
+                    continue
+                try:
+                    future.set_result(decode_response(payload))
+                except Exception as e:
+                    future.set_exception(e)
+
+    def shutdown(self):
+        """Stops polling and withdraws tasks that are still outstanding."""
+        self._stop.set()
+        if self._poller is not None:
+            self._poller.join()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for message_id in pending:
+            self.broker.cancel(message_id)
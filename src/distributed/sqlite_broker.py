@@ -0,0 +1,133 @@
+# src/distributed/sqlite_broker.py
+"""Task broker backed by a SQLite database that worker processes on the same host share."""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+from src.config import settings
+from src.distributed.broker import TaskBroker
+from src.models import TaskDelivery
+from src.paths import get_root_dir
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS broker_messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    task_id TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued', -- queued, leased, done, dead
+    worker_id TEXT,
+    lease_expires REAL,
+    deliveries INTEGER NOT NULL DEFAULT 0,
+    result BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_broker_messages_status ON broker_messages (status, seq);
+"""
+
+
+class SQLiteBroker(TaskBroker):
+    """
+    Keeps the queue in a SQLite database in WAL mode. Every process opens its
+    own broker on the same file; a lease is claimed inside a `BEGIN IMMEDIATE`
+    transaction, so two workers never get the same delivery. Lease times are
+    wall-clock, since they are compared across processes.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_deliveries: Optional[int] = None):
+        super().__init__(max_deliveries)
+        self.db_path = db_path or os.path.join(get_root_dir(), settings.BROKER_DB_PATH)
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly where a claim must be atomic.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def publish(self, task_id: str, payload: bytes) -> str:
+        message_id = str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute("INSERT INTO broker_messages (id, task_id, payload) VALUES (?, ?, ?)", (message_id, task_id, payload))
+        return message_id
+
+    def lease(self, worker_id: str, lease_s: float) -> Optional[TaskDelivery]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                dead = self._conn.execute(
+                    "UPDATE broker_messages SET status = 'dead', payload = x'' "
+                    "WHERE status = 'leased' AND lease_expires <= ? AND deliveries >= ?",
+                    (now, self.max_deliveries),
+                ).rowcount
+                if dead:
+                    logger.error(f"Gave up on {dead} task(s) after {self.max_deliveries} deliveries.")
+                row = self._conn.execute(
+                    "SELECT seq, id, task_id, payload, deliveries FROM broker_messages "
+                    "WHERE status = 'queued' OR (status = 'leased' AND lease_expires <= ?) ORDER BY seq LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE broker_messages SET status = 'leased', worker_id = ?, lease_expires = ?, deliveries = deliveries + 1 WHERE seq = ?",
+                        (worker_id, now + lease_s, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return TaskDelivery(message_id=row[1], task_id=row[2], payload=bytes(row[3]), attempt=row[4] + 1)
+
+    def heartbeat(self, message_id: str, worker_id: str, lease_s: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE broker_messages SET lease_expires = ? WHERE id = ? AND status = 'leased' AND worker_id = ?",
+                (time.time() + lease_s, message_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, message_id: str, worker_id: str, result: bytes) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE broker_messages SET status = 'done', result = ?, payload = x'' "
+                "WHERE id = ? AND status = 'leased' AND worker_id = ?",
+                (result, message_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def cancel(self, message_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM broker_messages WHERE id = ?", (message_id,))
+
+    def take_results(self, message_ids: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        ids: List[str] = list(message_ids)
+        results: Dict[str, Optional[bytes]] = {}
+        with self._lock:
+            for start in range(0, len(ids), 500): # Stay under SQLite's bound-parameter limit
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id, status, result FROM broker_messages WHERE status IN ('done', 'dead') AND id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for message_id, status, result in rows:
+                    results[message_id] = bytes(result) if status == "done" else None
+            if results:
+                finished = list(results)
+                for start in range(0, len(finished), 500):
+                    chunk = finished[start:start + 500]
+                    self._conn.execute(f"DELETE FROM broker_messages WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        return results
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,91 @@
+# src/distributed/worker.py
+"""Worker that pulls tasks from a task broker and runs them on local agents."""
+import os
+import socket
+import threading
+import uuid
+from typing import Optional
+from src.agents.factory import AgentFactory
+from src.cancellation import CancellationToken, TaskCancelled, use_token
+from src.config import settings
+from src.distributed.broker import TaskBroker
+from src.distributed.messages import decode_task, encode_response
+from src.models import AgentResponse, TaskDelivery
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Leases tasks from a broker, runs each through `AgentFactory` and posts the
+    `AgentResponse` back. While a task runs, a heartbeat thread renews its
+    lease every `heartbeat_s`; if the lease is lost (the orchestrator withdrew
+    the task, or the lease expired and it was re-delivered elsewhere) the
+    task's cancellation token fires and its result is discarded.
+    """
+
+    def __init__(self, broker: TaskBroker, agent_factory: Optional[AgentFactory] = None, worker_id: Optional[str] = None,
+                 lease_s: Optional[float] = None, heartbeat_s: Optional[float] = None, poll_interval_s: Optional[float] = None):
+        self.broker = broker
+        self.agent_factory = agent_factory or AgentFactory()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lease_s = lease_s or settings.BROKER_LEASE_S
+        self.heartbeat_s = heartbeat_s or settings.BROKER_HEARTBEAT_S
+        self.poll_interval_s = poll_interval_s or settings.BROKER_POLL_INTERVAL_S
+
+    def run(self, stop: Optional[threading.Event] = None, max_tasks: Optional[int] = None) -> int:
+        """Processes tasks until `stop` is set or `max_tasks` have run. Returns the number processed."""
+        stop = stop or threading.Event()
+        processed = 0
+        logger.info(f"Worker {self.worker_id} started.")
+        while not stop.is_set() and (max_tasks is None or processed < max_tasks):
+            if self.run_once():
+                processed += 1
+            else:
+                stop.wait(self.poll_interval_s)
+        logger.info(f"Worker {self.worker_id} stopped after {processed} task(s).")
+        return processed
+
+    def run_once(self) -> bool:
+        """Runs one task if one is available. Returns False if the queue was empty."""
+        delivery = self.broker.lease(self.worker_id, self.lease_s)
+        if delivery is None:
+            return False
+        self._process(delivery)
+        return True
+
+    def _process(self, delivery: TaskDelivery):
+        token = CancellationToken()
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(self.heartbeat_s):
+                if not self.broker.heartbeat(delivery.message_id, self.worker_id, self.lease_s):
+                    logger.warning(f"Worker {self.worker_id} lost the lease on task {delivery.task_id}; cancelling it.")
+                    token.cancel("lease lost")
+                    return
+
+        beat = threading.Thread(target=heartbeat, name=f"heartbeat-{delivery.task_id}", daemon=True)
+        beat.start()
+        try:
+            response = self._execute(delivery, token)
+        finally:
+            done.set()
+            beat.join()
+        if token.cancelled:
+            return
+        if not self.broker.complete(delivery.message_id, self.worker_id, encode_response(response)):
+            logger.warning(f"Worker {self.worker_id} finished task {delivery.task_id} after losing its lease; result discarded.")
+
+    def _execute(self, delivery: TaskDelivery, token: CancellationToken) -> AgentResponse:
+        try:
+            task = decode_task(delivery.payload)
+            logger.info(f"Worker {self.worker_id} running task {task.name} (ID: {task.id}), attempt {delivery.attempt}.")
+            with use_token(token):
+                return self.agent_factory.create_agent(task.agent_name).run(task)
+        except TaskCancelled as e:
+            return AgentResponse(status="failed", output={"error_message": f"Task cancelled: {e}"})
+        except Exception as e:
+            logger.error(f"Task {delivery.task_id} failed on worker {self.worker_id}: {e}", exc_info=True)
+            return AgentResponse(status="failed", output={"error_message": str(e)})
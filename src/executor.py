@@ -0,0 +1,81 @@
+# src/executor.py
+"""Runs task callables on daemon worker threads, each under its own cancellation token."""
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+from src.cancellation import CancellationToken, use_token
+import logging
+
+logger = logging.getLogger(__name__)
+
+IDLE_WORKER_TIMEOUT_S = 30.0
+
+_STOP = object()
+
+
+class TaskExecutor:
+    """
+    A thread pool for task execution that never lets a stuck task hold a slot.
+    Idle workers are reused; when none is idle a new daemon worker is started,
+    so a task abandoned after its timeout keeps only its own thread busy and
+    cannot block process exit. The orchestrator bounds concurrency itself.
+    """
+
+    def __init__(self, thread_name_prefix: str = "task"):
+        self.thread_name_prefix = thread_name_prefix
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = 0
+        self._workers = 0
+        self._shutdown = False
+
+    def submit(self, fn: Callable[..., Any], *args: Any, token: Optional[CancellationToken] = None) -> Future:
+        """
+        Runs `fn(*args)` on a worker thread with `token` installed as the
+        thread's current token (see `src.cancellation.current_token`).
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("TaskExecutor is shut down.")
+            if self._idle == 0:
+                self._workers += 1
+                threading.Thread(target=self._worker, name=f"{self.thread_name_prefix}-{self._workers}", daemon=True).start()
+            else:
+                self._idle -= 1
+        self._jobs.put((future, fn, args, token or CancellationToken()))
+        return future
+
+    def shutdown(self):
+        """Stops idle workers. Busy workers exit once their current task returns."""
+        with self._lock:
+            self._shutdown = True
+            idle, self._idle = self._idle, 0
+        for _ in range(idle):
+            self._jobs.put(_STOP)
+
+    def _worker(self):
+        while True:
+            try:
+                job = self._jobs.get(timeout=IDLE_WORKER_TIMEOUT_S)
+            except queue.Empty:
+                with self._lock:
+                    if self._idle == 0:
+                        continue # A job was promised to this worker; keep waiting for it
+                    self._idle -= 1
+                    self._workers -= 1
+                return
+            if job is _STOP:
+                return
+            future, fn, args, token = job
+            if future.set_running_or_notify_cancel():
+                with use_token(token):
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as e:
+                        future.set_exception(e)
+            with self._lock:
+                if self._shutdown:
+                    return
+                self._idle += 1
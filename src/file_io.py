@@ -1,9 +1,25 @@
 # src/file_io.py
 """Utility functions for file input/output operations."""
+import errno
 import logging
+import mmap
+import os
+import shutil
+import tempfile
+from typing import IO, Iterable, Iterator, Tuple
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+def _read_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# Mode `open()` gives new files. Read once at import: setting the umask to read it is not thread-safe.
+DEFAULT_FILE_MODE = 0o666 & ~_read_umask()
+
 def read_file(path: str, mode: str = 'r', encoding: str = 'utf-8') -> str | bytes | None:
     """
     Reads content from a file.
@@ -47,3 +63,170 @@ def write_file(path: str, content: str | bytes, mode: str = 'w', encoding: str =
     except IOError as e:
         logger.error(f"Error writing to file {path}: {e}")
         return False
+
+def map_file(path: str) -> memoryview | None:
+    """
+    Maps a file read-only into memory and returns a memoryview over it.
+    Pages are loaded lazily by the OS, so large files are not copied into the
+    Python heap. The mapping is released once the view is garbage collected.
+    Returns None on error.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b"")
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except FileNotFoundError:
+        logger.error(f"File not found: {path}")
+        return None
+    except (IOError, ValueError) as e:
+        logger.error(f"Error mapping file {path}: {e}")
+        return None
+
+def create_temp_file(directory: str) -> Tuple[int, str]:
+    """
+    Creates a temporary file in `directory` to be renamed over a target, and
+    returns its descriptor and path. Unlike a bare `tempfile.mkstemp` (0600),
+    the file gets the mode `open()` would give it, so the renamed file is as
+    readable as one written in place. Raises OSError on failure.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        os.chmod(tmp_path, DEFAULT_FILE_MODE)
+    except OSError:
+        os.close(fd)
+        os.remove(tmp_path)
+        raise
+    return fd, tmp_path
+
+def fsync_dir(path: str):
+    """Flushes a directory entry (e.g. after a rename) to disk. No-op where unsupported."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write_file(path: str, content: str | bytes, encoding: str = 'utf-8', fsync: bool = True) -> bool:
+    """
+    Writes content to a temporary file in the target directory and renames it
+    over `path`, so readers never observe a partially written file.
+    With `fsync`, the data and the directory entry are flushed to disk first.
+    Returns True on success, False on error.
+    """
+    data = content.encode(encoding) if isinstance(content, str) else content
+    try:
+        write_chunks(path, [data], fsync=fsync)
+        return True
+    except OSError as e:
+        logger.error(f"Error writing to file {path}: {e}")
+        return False
+
+# Streaming helpers. Unlike read_file/write_file, these raise OSError
+# (FileNotFoundError, PermissionError, ...) instead of returning None/False.
+
+def open_stream(path: str, mode: str = 'r', encoding: str = 'utf-8') -> IO:
+    """
+    Opens a file for incremental reading or writing, e.g. to hand to
+    `yaml.safe_load` or `json.load` without materializing the content first.
+    Use as a context manager. Raises OSError on failure.
+    """
+    if 'b' in mode:
+        return open(path, mode)
+    return open(path, mode, encoding=encoding)
+
+def iter_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Yields a file's content in chunks of at most `chunk_size` bytes, so peak
+    memory is bounded by the chunk size rather than the file size.
+    Raises OSError on failure.
+    """
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def write_chunks(path: str, chunks: Iterable[bytes], fsync: bool = True) -> int:
+    """
+    Atomically writes an iterable of byte chunks to `path` (temporary file and
+    rename) and returns the number of bytes written. With `fsync`, the data
+    and the directory entry are flushed first. Raises OSError on failure;
+    the target is left untouched in that case.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = create_temp_file(directory)
+    written = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if fsync:
+        fsync_dir(directory)
+    return written
+
+def _kernel_copy(src_fd: int, dst_fd: int, size: int) -> int:
+    """Copies `size` bytes between descriptors in the kernel. Returns the bytes copied (0 if unsupported)."""
+    copied = 0
+    for copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        if copy is None:
+            continue
+        try:
+            while copied < size:
+                if copy is os.sendfile:
+                    n = copy(dst_fd, src_fd, copied, size - copied)
+                else:
+                    n = copy(src_fd, dst_fd, size - copied)
+                if n == 0:
+                    break
+                copied += n
+            return copied
+        except OSError as e:
+            if copied or e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSOCK):
+                raise
+    return copied
+
+def copy_file(src: str, dst: str, fsync: bool = False) -> int:
+    """
+    Atomically copies `src` to `dst` and returns the number of bytes copied.
+    Uses `copy_file_range`/`sendfile` where available so data does not pass
+    through Python buffers, falling back to a chunked copy. Raises OSError on failure.
+    """
+    directory = os.path.dirname(os.path.abspath(dst))
+    with open(src, 'rb') as fsrc:
+        size = os.fstat(fsrc.fileno()).st_size
+        fd, tmp_path = create_temp_file(directory)
+        try:
+            with os.fdopen(fd, 'wb') as fdst:
+                copied = _kernel_copy(fsrc.fileno(), fdst.fileno(), size)
+                if copied < size:
+                    fsrc.seek(copied)
+                    fdst.seek(copied)
+                    shutil.copyfileobj(fsrc, fdst, DEFAULT_CHUNK_SIZE)
+                    copied = fdst.tell()
+                if fsync:
+                    fdst.flush()
+                    os.fsync(fdst.fileno())
+            os.replace(tmp_path, dst)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    if fsync:
+        fsync_dir(directory)
+    return copied
@@ -1,12 +1,17 @@
 # src/llms/client.py
 """Initializes and manages LLM client instances."""
+import atexit
+import os
 from typing import Dict, Type, Optional
 from src.config import settings
+from src.paths import get_root_dir
 from src.llms.provider import LLMProvider
 from src.llms.gemini import GeminiLLMProvider
 from src.llms.ollama import OllamaLLMProvider
 from src.llms.kimi import KimiLLMProvider
 from src.llms.mistral import MistralLLMProvider
+from src.llms.mock import MockLLMProvider, load_recordings
+from src.llms.semantic_cache import CachingLLMProvider, SemanticCache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,7 +19,10 @@ logger = logging.getLogger(__name__)
 class LLMClient:
     def __init__(self):
         self.providers: Dict[str, LLMProvider] = {}
+        self.semantic_cache: Optional[SemanticCache] = None
         self._initialize_providers()
+        if settings.SEMANTIC_CACHE_ENABLED:
+            self._enable_semantic_cache()
 
     def _initialize_providers(self):
         """Initializes various LLM providers based on configuration."""
@@ -56,6 +64,28 @@ class LLMClient:
             else:
                 logger.warning("Mistral API key not found. Mistral provider not initialized.")
 
+        if "mock" in active_providers:
+            recordings = None
+            if settings.MOCK_LLM_RECORDINGS:
+                try:
+                    recordings = load_recordings(os.path.join(get_root_dir(), settings.MOCK_LLM_RECORDINGS))
+                except ValueError as e:
+                    logger.warning(f"Mock LLM provider will not replay recordings: {e}")
+            self.providers["mock"] = MockLLMProvider(recordings=recordings)
+            logger.info("Mock LLM provider initialized.")
+
+    def _enable_semantic_cache(self):
+        """Wraps the initialized providers so near-duplicate prompts are answered from the semantic cache."""
+        path = os.path.join(get_root_dir(), settings.SEMANTIC_CACHE_PATH) if settings.SEMANTIC_CACHE_PATH else None
+        try:
+            self.semantic_cache = SemanticCache(path=path)
+        except ImportError as e:
+            logger.warning(f"Semantic cache not enabled: {e}")
+            return
+        for name, provider in self.providers.items():
+            self.providers[name] = CachingLLMProvider(name, provider, self.semantic_cache)
+        atexit.register(self.semantic_cache.save)
+        logger.info(f"Semantic cache enabled for {len(self.providers)} LLM provider(s).")
 
     def get_provider(self, name: str) -> Optional[LLMProvider]:
         """Returns an initialized LLM provider by name."""
@@ -1,6 +1,7 @@
 # src/llms/gemini.py
 """LLM wrapper for Gemini models."""
 from src.llms.provider import LLMProvider
+from src.cancellation import current_token
 from typing import Optional
 import logging
 
@@ -17,5 +18,6 @@ class GeminiLLMProvider(LLMProvider):
         """Generates a response using the Gemini LLM."""
         if not self.api_key:
             return f"Error: Gemini API key missing. Cannot generate response for: {prompt}"
+        current_token().raise_if_cancelled() # Don't start a request for a cancelled task
         # Placeholder for actual API call using self.api_key and self.endpoint
         return f"Gemini response from {self.endpoint} for: {prompt}" # Placeholder
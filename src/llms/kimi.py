@@ -1,6 +1,7 @@
 # src/llms/kimi.py
 """LLM wrapper for Kimi models."""
 from src.llms.provider import LLMProvider
+from src.cancellation import current_token
 from typing import Optional
 import logging
 
@@ -17,5 +18,6 @@ class KimiLLMProvider(LLMProvider):
         """Generates a response using the Kimi LLM."""
         if not self.api_key:
             return f"Error: Kimi API key missing. Cannot generate response for: {prompt}"
+        current_token().raise_if_cancelled() # Don't start a request for a cancelled task
         # Placeholder for actual API call using self.api_key and self.endpoint
         return f"Kimi response from {self.endpoint} for: {prompt}" # Placeholder
@@ -1,6 +1,7 @@
 # src/llms/mistral.py
 """LLM wrapper for Mistral models."""
 from src.llms.provider import LLMProvider
+from src.cancellation import current_token
 from typing import Optional
 import logging
 
@@ -17,5 +18,6 @@ class MistralLLMProvider(LLMProvider):
         """Generates a response using the Mistral LLM."""
         if not self.api_key:
             return f"Error: Mistral API key missing. Cannot generate response for: {prompt}"
+        current_token().raise_if_cancelled() # Don't start a request for a cancelled task
         # Placeholder for actual API call using self.api_key and self.endpoint
         return f"Mistral response from {self.endpoint} for: {prompt}" # Placeholder
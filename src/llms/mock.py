@@ -0,0 +1,153 @@
+# src/llms/mock.py
+"""Local mock LLM provider with simulated latency, token streaming, errors, rate limits and recorded-response replay."""
+import json
+import math
+import random
+import re
+import threading
+from typing import Dict, Iterator, List, Optional
+from src.config import settings
+from src.cancellation import current_token
+from src.file_io import read_file
+from src.llms.provider import LLMProvider, LLMProviderError, RateLimitError
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "lognormal", "pareto")
+# A streamed token: a short word (or piece of a longer one) or a punctuation mark, with the whitespace before it
+_TOKEN = re.compile(r"\s*(?:\w{1,5}|[^\w\s])|\s+$")
+
+
+def load_recordings(path: str) -> Dict[str, str]:
+    """
+    Reads recorded responses: a JSON object mapping prompts to responses, or a
+    JSON list or JSON-lines file of {"prompt": ..., "response": ...} records.
+    Raises ValueError if the file is missing or not in one of these forms.
+    """
+    content = read_file(path)
+    if content is None:
+        raise ValueError(f"Could not read mock LLM recordings from {path}")
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        try:
+            data = [json.loads(line) for line in content.splitlines() if line.strip()]
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid mock LLM recordings in {path}: {e}") from e
+    if isinstance(data, dict) and data.keys() == {"prompt", "response"}:
+        data = [data] # A JSON-lines file with a single record
+    if isinstance(data, dict):
+        return {str(prompt): str(response) for prompt, response in data.items()}
+    try:
+        return {record["prompt"]: record["response"] for record in data}
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid mock LLM recordings in {path}: expected prompt/response records") from e
+
+
+class MockLLMProvider(LLMProvider):
+    """
+    Stands in for a remote LLM so throughput, retries and timeouts can be
+    measured offline. Each request waits for a latency drawn from the
+    configured distribution (the time to the first token), then for its tokens
+    at `tokens_per_s`; `stream` yields the tokens as they are "generated".
+    A fraction of requests fail with RateLimitError (straight away, like a 429)
+    or LLMProviderError (after the latency). Responses are replayed from
+    `recordings` when the prompt was recorded, otherwise they echo the prompt.
+
+    Draws are seeded by the seed, the prompt and how often that prompt has been
+    sent, so a run is reproducible whatever the thread interleaving, and a
+    retried request gets a fresh draw. Waits end early, raising TaskCancelled,
+    when the calling task is cancelled. Unset arguments come from the MOCK_LLM_*
+    settings.
+    """
+
+    def __init__(self, latency: Optional[str] = None, latency_s: Optional[float] = None,
+                 latency_sigma: Optional[float] = None, pareto_alpha: Optional[float] = None,
+                 tokens_per_s: Optional[float] = None, error_rate: Optional[float] = None,
+                 rate_limit_rate: Optional[float] = None, seed: Optional[int] = None,
+                 recordings: Optional[Dict[str, str]] = None):
+        self.latency = latency or settings.MOCK_LLM_LATENCY
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{self.latency}'; expected one of {', '.join(LATENCY_DISTRIBUTIONS)}.")
+        self.latency_s = latency_s if latency_s is not None else settings.MOCK_LLM_LATENCY_S
+        self.latency_sigma = latency_sigma if latency_sigma is not None else settings.MOCK_LLM_LATENCY_SIGMA
+        self.pareto_alpha = pareto_alpha if pareto_alpha is not None else settings.MOCK_LLM_PARETO_ALPHA
+        self.tokens_per_s = tokens_per_s if tokens_per_s is not None else settings.MOCK_LLM_TOKENS_PER_S
+        self.error_rate = error_rate if error_rate is not None else settings.MOCK_LLM_ERROR_RATE
+        self.rate_limit_rate = rate_limit_rate if rate_limit_rate is not None else settings.MOCK_LLM_RATE_LIMIT_RATE
+        self.seed = seed if seed is not None else settings.MOCK_LLM_SEED
+        self.recordings = recordings or {}
+        self._sent: Dict[str, int] = {} # Requests per prompt so far
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "completed": 0, "errors": 0, "rate_limited": 0, "replayed": 0}
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draws a time to first token, in seconds."""
+        if self.latency == "lognormal" and self.latency_s > 0:
+            return rng.lognormvariate(math.log(self.latency_s), self.latency_sigma)
+        if self.latency == "pareto":
+            return self.latency_s * rng.paretovariate(self.pareto_alpha)
+        return self.latency_s
+
+    def _start(self, prompt: str) -> float:
+        """Counts a request and returns its latency, or raises the failure drawn for it."""
+        with self._lock:
+            sent = self._sent.get(prompt, 0)
+            self._sent[prompt] = sent + 1
+            self._stats["requests"] += 1
+        rng = random.Random(f"{self.seed}:{sent}:{prompt}")
+        failure, latency = rng.random(), self.sample_latency(rng)
+        token = current_token()
+        token.raise_if_cancelled()
+        if failure < self.rate_limit_rate:
+            self._count("rate_limited")
+            raise RateLimitError("Mock LLM rate limit exceeded (429).", retry_after=latency)
+        if failure < self.rate_limit_rate + self.error_rate:
+            token.wait(latency)
+            token.raise_if_cancelled()
+            self._count("errors")
+            raise LLMProviderError("Mock LLM request failed (500).")
+        return latency
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _response(self, prompt: str) -> str:
+        recorded = self.recordings.get(prompt)
+        if recorded is not None:
+            self._count("replayed")
+            return recorded
+        return f"Mock response to: {prompt}"
+
+    def _tokens(self, text: str) -> List[str]:
+        return _TOKEN.findall(text) or [text]
+
+    def generate(self, prompt: str) -> str:
+        """Returns the response once its latency and generation time have passed."""
+        latency = self._start(prompt)
+        response = self._response(prompt)
+        if self.tokens_per_s:
+            latency += len(self._tokens(response)) / self.tokens_per_s
+        token = current_token()
+        token.wait(latency)
+        token.raise_if_cancelled()
+        self._count("completed")
+        return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yields the response token by token, the first after the latency and the rest at `tokens_per_s`."""
+        wait = self._start(prompt)
+        token = current_token()
+        for piece in self._tokens(self._response(prompt)):
+            token.wait(wait)
+            token.raise_if_cancelled()
+            yield piece
+            wait = 1 / self.tokens_per_s if self.tokens_per_s else 0.0
+        self._count("completed")
+
+    def stats(self) -> Dict[str, int]:
+        """Requests sent and how they ended (completed, errors, rate_limited) and how many were replayed."""
+        with self._lock:
+            return dict(self._stats)
@@ -1,6 +1,7 @@
 # src/llms/ollama.py
 """LLM wrapper for Ollama models."""
 from src.llms.provider import LLMProvider
+from src.cancellation import current_token
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,5 +12,6 @@ class OllamaLLMProvider(LLMProvider):
 
     def generate(self, prompt: str) -> str:
         """Generates a response using the Ollama LLM."""
+        current_token().raise_if_cancelled() # Don't start a request for a cancelled task
         # Placeholder for actual API call using self.host
         return f"Ollama response from {self.host} for: {prompt}" # Placeholder
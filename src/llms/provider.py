@@ -1,9 +1,41 @@
 # src/llms/provider.py
 """Defines the abstract interface for Large Language Model providers."""
 from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+from src.models import AssembledPrompt
+
+
+class LLMProviderError(Exception):
+    """Raised by a provider when a request fails (e.g. a server error)."""
+
+
+class RateLimitError(LLMProviderError):
+    """Raised by a provider when a request is rejected for rate limiting (HTTP 429)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after # Seconds the provider asked to wait, if it said
+
 
 class LLMProvider(ABC):
     @abstractmethod
     def generate(self, prompt: str) -> str:
         """Generates a response from the LLM based on the given prompt."""
         pass
+
+    def generate_prompt(self, prompt: AssembledPrompt) -> str:
+        """
+        Generates a response to an assembled prompt. Providers with prompt
+        caching override this to mark `prompt.prefix` as a cached prefix when
+        `prompt.cacheable` is set; by default the text is sent as a whole.
+        """
+        return self.generate(prompt.text)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Generates a response as a stream of text chunks. Providers with a
+        streaming API override this; by default the whole response is one chunk.
+        Feed the chunks to `src.response_parser.StreamingJSONParser` to use the
+        fields of a JSON response as they complete.
+        """
+        yield self.generate(prompt)
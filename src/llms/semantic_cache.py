@@ -0,0 +1,354 @@
+# src/llms/semantic_cache.py
+"""Semantic cache of LLM responses: prompts are embedded locally and near-duplicates are answered from a nearest-neighbour index."""
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from src.config import settings
+from src.llms.provider import LLMProvider
+from src.models import AssembledPrompt
+from src.paths import ensure_dir
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# Function words carry little of a prompt's meaning but make paraphrases look different
+_STOP_WORDS = frozenset(
+    "a an the this that these those is are was were be been am do does did of to in on at for with by from as "
+    "and or but if then so it its i me my we our you your he she they them their please kindly can could would "
+    "will shall should may might just".split()
+)
+_UNUSED = 2 ** 63 - 1 # Last-used stamp of a free slot
+
+
+class Embedder(ABC):
+    """Turns texts into unit-length vectors whose dot product measures their similarity."""
+    dim: int
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        """Returns a float32 array with one unit-length row per text."""
+        pass
+
+
+class HashingEmbedder(Embedder):
+    """
+    Local, dependency-free embedder: the words (other than function words) and
+    word pairs of a text are hashed into `dim` signed buckets (the hashing
+    trick). Paraphrases that share most of their content words land close
+    together; no model or network is needed.
+    """
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim or settings.SEMANTIC_CACHE_DIM
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        rows: List[int] = []
+        hashes: List[int] = []
+        for row, text in enumerate(texts):
+            words = [word for word in _WORD.findall(text.lower()) if word not in _STOP_WORDS]
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                rows.append(row)
+                hashes.append(zlib.crc32(feature.encode("utf-8")))
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        hashed = np.asarray(hashes, dtype=np.int64)
+        signs = np.where(hashed & 0x80000000, 1.0, -1.0).astype(np.float32) # High bit: sign; low bits: bucket
+        np.add.at(vectors, (np.asarray(rows, dtype=np.int64), hashed % self.dim), signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    """
+    Approximate nearest-neighbour index over unit vectors in a fixed number of
+    slots. Random-hyperplane LSH tables narrow a query down to the entries that
+    share a bucket with it in some table, and those are ranked exactly. Below
+    `exact_below` entries every entry is ranked, which is cheaper than hashing.
+    Each slot carries an integer label, and a search can be limited to one label.
+    """
+
+    def __init__(self, dim: int, capacity: int, tables: int = 8, bits: int = 8, exact_below: int = 1024, seed: int = 0):
+        self.dim = dim
+        self.tables = tables
+        self.exact_below = exact_below
+        self._planes = np.random.default_rng(seed).standard_normal((tables * bits, dim)).astype(np.float32)
+        self._bit_values = 1 << np.arange(bits, dtype=np.int64)
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._keys = np.zeros((capacity, tables), dtype=np.int64) # Bucket of each slot in each table
+        self._used = np.zeros(capacity, dtype=bool)
+        self._labels = np.zeros(capacity, dtype=np.int64)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(tables)]
+
+    def __len__(self) -> int:
+        return int(self._used.sum())
+
+    def _bucket_keys(self, vector: "np.ndarray") -> "np.ndarray":
+        bits = (self._planes @ vector > 0).reshape(self.tables, -1)
+        return bits @ self._bit_values
+
+    def add(self, slot: int, vector: "np.ndarray", label: int = 0):
+        """Stores a vector, with its label, in a free slot."""
+        keys = self._bucket_keys(vector)
+        self._vectors[slot] = vector
+        self._keys[slot] = keys
+        self._labels[slot] = label
+        self._used[slot] = True
+        for table, key in enumerate(keys.tolist()):
+            self._buckets[table].setdefault(key, []).append(slot)
+
+    def vectors(self, slots: List[int]) -> "np.ndarray":
+        return self._vectors[slots]
+
+    def remove(self, slot: int):
+        """Frees a slot."""
+        if not self._used[slot]:
+            return
+        self._used[slot] = False
+        for table, key in enumerate(self._keys[slot].tolist()):
+            bucket = self._buckets[table][key]
+            bucket.remove(slot)
+            if not bucket:
+                del self._buckets[table][key]
+
+    def search(self, vector: "np.ndarray", k: int = 1, label: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        The (slot, similarity) of up to `k` of the nearest stored vectors, most
+        similar first. With a `label`, only slots with that label are ranked.
+        """
+        if len(self) < self.exact_below:
+            candidates = np.flatnonzero(self._used)
+        else:
+            found = set()
+            for table, key in enumerate(self._bucket_keys(vector).tolist()):
+                found.update(self._buckets[table].get(key, ()))
+            candidates = np.fromiter(found, dtype=np.int64, count=len(found))
+        if label is not None:
+            candidates = candidates[self._labels[candidates] == label]
+        if not len(candidates):
+            return []
+        scores = self._vectors[candidates] @ vector
+        top = np.argsort(-scores)[:k]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+
+class _Entry(NamedTuple):
+    namespace: str # Cached responses are only reused for the same provider
+    prompt: str
+    response: str
+
+
+class SemanticCache:
+    """
+    Responses keyed by prompt, reused for prompts whose embeddings have at least
+    `threshold` cosine similarity with a cached one (an identical prompt is
+    found without embedding it). Holds up to `max_entries`, evicting the least
+    recently used, and persists to `path` (an .npz file) with `save()`.
+    `stats()` and `report()` give the hit rate.
+    Requires numpy.
+    """
+
+    def __init__(self, embedder: Optional[Embedder] = None, threshold: Optional[float] = None,
+                 max_entries: Optional[int] = None, path: Optional[str] = None):
+        if np is None:
+            raise ImportError("The semantic cache requires the 'numpy' package (pip install numpy).")
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold if threshold is not None else settings.SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.path = path
+        self._index = VectorIndex(self.embedder.dim, self.max_entries)
+        self._entries: List[Optional[_Entry]] = [None] * self.max_entries
+        self._exact: Dict[Tuple[str, str], int] = {}
+        self._labels: Dict[str, int] = {} # Namespace -> its label in the index
+        self._sizes: Dict[str, int] = {} # Namespace -> entries cached under it
+        self._next_label = 0
+        self._last_used = np.full(self.max_entries, _UNUSED, dtype=np.int64) # Free slots sort last
+        self._clock = 0
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "exact_hits": 0, "similar_hits": 0, "stores": 0, "evictions": 0}
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def _touch(self, slot: int):
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    @staticmethod
+    def scope(namespace: str, prefix: str) -> str:
+        """
+        The namespace of prompts that share an exact prefix (e.g. an assembled
+        prompt's static prefix), so that only their suffixes are compared: a
+        long shared prefix would otherwise make every suffix look similar.
+        """
+        if not prefix:
+            return namespace
+        return f"{namespace}#{hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:32]}"
+
+    def lookup(self, namespace: str, prompt: str) -> Optional[str]:
+        """Returns the cached response for the prompt or a near-duplicate of it, or None."""
+        with self._lock:
+            self._stats["lookups"] += 1
+            slot = self._exact.get((namespace, prompt))
+            if slot is not None:
+                self._stats["exact_hits"] += 1
+                self._touch(slot)
+                return self._entries[slot].response
+            if namespace not in self._labels:
+                return None
+        vector = self.embedder.embed([prompt])[0]
+        with self._lock:
+            label = self._labels.get(namespace)
+            if label is None: # Its last entry was evicted meanwhile
+                return None
+            # Ranked only among the namespace's entries, so other providers' and prefixes' entries cannot crowd them out
+            for slot, score in self._index.search(vector, k=1, label=label):
+                if score >= self.threshold:
+                    self._stats["similar_hits"] += 1
+                    self._touch(slot)
+                    logger.debug(f"Semantic cache hit ({score:.3f}) for prompt: {prompt[:80]!r}")
+                    return self._entries[slot].response
+        return None
+
+    def store(self, namespace: str, prompt: str, response: str, vector: Optional["np.ndarray"] = None):
+        """Caches a response, evicting the least recently used entry if the cache is full."""
+        if vector is None:
+            vector = self.embedder.embed([prompt])[0]
+        with self._lock:
+            slot = self._exact.get((namespace, prompt))
+            if slot is not None:
+                self._remove(slot)
+            elif not self._free:
+                self._remove(int(np.argmin(self._last_used)))
+                self._stats["evictions"] += 1
+            slot = self._free.pop()
+            self._entries[slot] = _Entry(namespace, prompt, response)
+            self._exact[(namespace, prompt)] = slot
+            if namespace not in self._labels:
+                self._labels[namespace] = self._next_label
+                self._next_label += 1
+            self._sizes[namespace] = self._sizes.get(namespace, 0) + 1
+            self._index.add(slot, vector, label=self._labels[namespace])
+            self._touch(slot)
+            self._stats["stores"] += 1
+
+    def _remove(self, slot: int):
+        entry = self._entries[slot]
+        self._entries[slot] = None
+        del self._exact[(entry.namespace, entry.prompt)]
+        self._sizes[entry.namespace] -= 1
+        if not self._sizes[entry.namespace]:
+            del self._sizes[entry.namespace], self._labels[entry.namespace]
+        self._index.remove(slot)
+        self._last_used[slot] = _UNUSED
+        self._free.append(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup, hit and eviction counts since the cache was created (or loaded), with the hit rate."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["hits"] = stats["exact_hits"] + stats["similar_hits"]
+        stats["misses"] = stats["lookups"] - stats["hits"]
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        stats["entries"] = len(self)
+        return stats
+
+    def report(self) -> str:
+        """One-line summary of `stats()`."""
+        s = self.stats()
+        return (f"Semantic cache: {s['lookups']} lookups, {s['hits']} hits ({s['hit_rate']:.1%}; "
+                f"{s['exact_hits']} exact, {s['similar_hits']} similar), {s['misses']} misses, "
+                f"{s['entries']} entries, {s['evictions']} evictions")
+
+    def save(self, path: Optional[str] = None):
+        """Writes the entries (with their vectors, in least to most recently used order) and stats to an .npz file."""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            slots = sorted(self._exact.values(), key=lambda slot: self._last_used[slot])
+            meta = {
+                "embedder": type(self.embedder).__name__,
+                "dim": self.embedder.dim,
+                "entries": [self._entries[slot]._asdict() for slot in slots],
+                "stats": self._stats,
+            }
+            vectors = self._index.vectors(slots)
+        ensure_dir(os.path.dirname(os.path.abspath(path)))
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, vectors=vectors, meta=np.array(json.dumps(meta)))
+        os.replace(temp_path, path)
+
+    def load(self, path: str):
+        """Adds the entries saved at `path`; vectors from a different embedder are recomputed."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                vectors = data["vectors"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load the semantic cache from {path}: {e}")
+            return
+        entries = [_Entry(**entry) for entry in meta["entries"]][-self.max_entries:]
+        vectors = vectors[-len(entries):] if entries else vectors[:0]
+        if meta["embedder"] != type(self.embedder).__name__ or meta["dim"] != self.embedder.dim:
+            vectors = self.embedder.embed([entry.prompt for entry in entries]) if entries else vectors
+        for entry, vector in zip(entries, vectors):
+            self.store(entry.namespace, entry.prompt, entry.response, vector=vector)
+        with self._lock:
+            self._stats = {key: meta["stats"].get(key, 0) for key in self._stats}
+        logger.info(f"Loaded {len(entries)} semantic cache entries from {path}.")
+
+
+class CachingLLMProvider(LLMProvider):
+    """
+    Wraps a provider so that prompts are answered from a SemanticCache when
+    possible. Assembled prompts are matched on their suffix among prompts with
+    the same prefix.
+    """
+
+    def __init__(self, name: str, provider: LLMProvider, cache: SemanticCache):
+        self.name = name
+        self.provider = provider
+        self.cache = cache
+
+    def generate(self, prompt: str) -> str:
+        cached = self.cache.lookup(self.name, prompt)
+        if cached is not None:
+            return cached
+        response = self.provider.generate(prompt)
+        self.cache.store(self.name, prompt, response)
+        return response
+
+    def generate_prompt(self, prompt: AssembledPrompt) -> str:
+        # The prefix must match exactly; only the per-task suffix may be a near-duplicate
+        namespace = SemanticCache.scope(self.name, prompt.prefix)
+        cached = self.cache.lookup(namespace, prompt.suffix)
+        if cached is not None:
+            return cached
+        response = self.provider.generate_prompt(prompt) # Keeps the provider's own prefix caching
+        self.cache.store(namespace, prompt.suffix, response)
+        return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        cached = self.cache.lookup(self.name, prompt)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        for chunk in self.provider.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.store(self.name, prompt, "".join(chunks)) # Only a stream read to the end is cached
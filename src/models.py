@@ -1,12 +1,34 @@
 # src/models.py
 """Pydantic models and dataclasses for core system entities."""
-from pydantic import BaseModel
-from typing import Any, Dict, List, Optional
+from collections import deque
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic_core import PydanticUndefined
+from typing import Any, Callable, Deque, Dict, List, Literal, Optional, Tuple, Type, TypeVar
+
+M = TypeVar("M", bound=BaseModel)
 
 class AgentSpec(BaseModel):
     name: str
     role: str
     description: str
+    executor: str = "thread" # "thread", or "process" to run CPU-bound agents in the process pool
+
+class ReduceSpec(BaseModel):
+    """Task that combines the outputs of a map task's items (see src/workflow/mapping.py)."""
+    agent_name: str
+    description: str = ""
+    input_data: Dict[str, Any] = {}
+    timeout: Optional[float] = None
+    retries: int = 0
+
+class MapSpec(BaseModel):
+    """Runs a task once per item of a collection. Exactly one of `file`, `glob` or `artifact` names the collection."""
+    file: Optional[str] = None # Relative to the root dir: a JSON/YAML list, JSON lines (.jsonl), or one item per line
+    glob: Optional[str] = None # Relative to the root dir; each matching path is an item
+    artifact: Optional[str] = None # "<dependency id>/<artifact name>" holding a list, or text with one item per line
+    item_key: str = "item" # input_data key each item is passed under
+    chunk_size: Optional[int] = None # Items expanded at a time (default: settings.MAP_CHUNK_SIZE)
+    reduce: Optional[ReduceSpec] = None
 
 class TaskSpec(BaseModel):
     id: str
@@ -15,19 +37,87 @@ class TaskSpec(BaseModel):
     agent_name: str
     input_data: Dict[str, Any] = {}
     dependencies: List[str] = []
+    timeout: Optional[float] = None # Seconds before the task is cancelled (default: settings.TASK_TIMEOUT_S)
+    retries: int = 0 # Extra attempts after a failure or timeout
+    map: Optional[MapSpec] = None # Makes this a template run once per item of a collection
+    when: Dict[str, str] = {} # Dependency id -> condition on its output; the task is skipped unless all hold
 
 class Artifact(BaseModel):
     name: str
     type: str
     data: Any
 
+class ArtifactRef(BaseModel):
+    """Metadata for a stored artifact; the payload itself lives in the artifact store."""
+    name: str
+    type: str
+    data_path: Optional[str] = None
+
+class TaskCheckpoint(BaseModel):
+    """Durable record of a task's outcome within a session, used to resume interrupted runs."""
+    task_id: str
+    status: str
+    output_hash: Optional[str] = None
+    artifacts: List[ArtifactRef] = []
+    new_tasks: List[TaskSpec] = [] # Tasks the task injected, restored into the graph when the session is resumed
+
+class TaskOutcome(BaseModel):
+    """Final outcome of a task in a workflow run."""
+    task_id: str
+    status: str # "completed", "cached", "resumed", "failed", "skipped", "cancelled", or another agent-reported status
+    attempts: int = 0
+    error: Optional[str] = None
+
+class TaskDelivery(BaseModel):
+    """A task message leased to a distributed worker (see src/distributed/broker.py)."""
+    message_id: str
+    task_id: str
+    payload: bytes
+    attempt: int # 1 on first delivery, incremented on each re-delivery
+
+class Job(BaseModel):
+    """A workflow submitted to the `serve` daemon, with its progress and, once finished, its outcomes."""
+    id: str
+    status: str # "queued", "running", "completed", "failed" or "cancelled"
+    submitted_at: str
+    session_id: Optional[str] = None
+    finished_at: Optional[str] = None
+    outcomes: Dict[str, TaskOutcome] = {}
+    error: Optional[str] = None
+
+class JobOptions(BaseModel):
+    """Options of a workflow submitted to the `serve` daemon; unknown options are rejected."""
+    model_config = ConfigDict(extra="forbid")
+
+    failure_policy: Optional[Literal["fail_fast", "continue_independent", "retry_n"]] = None # A FailurePolicy value
+    max_parallel: Optional[int] = Field(default=None, ge=1)
+    timeout: Optional[float] = Field(default=None, gt=0) # Deadline for the whole run, in seconds
+    incremental: Optional[bool] = None # Reuse cached results of unchanged tasks
+    resume: Optional[str] = None # Id of an interrupted session to resume
+
 class Session(BaseModel):
     id: str
     start_time: str
     end_time: Optional[str] = None
     status: str
-    logs: List[str] = []
-    artifacts: List[Artifact] = []
+    logs: Deque[str] = deque() # Most recent entries only (SessionManager bounds it); full history is in the session store
+    artifacts: List[ArtifactRef] = []
+
+class AssembledPrompt(BaseModel):
+    """A rendered prompt: a static prefix shared by many tasks, then a task-specific suffix (see src/prompt_assembly.py)."""
+    prefix: str
+    suffix: str
+    prefix_tokens: int # Local estimates
+    suffix_tokens: int
+    cacheable: bool = False # The prefix is long enough for provider-side prompt caching
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+    @property
+    def tokens(self) -> int:
+        return self.prefix_tokens + self.suffix_tokens
 
 class ExecutionContext(BaseModel):
     session_id: str
@@ -39,3 +129,42 @@ class AgentResponse(BaseModel):
     status: str
     output: Dict[str, Any] = {}
     artifacts: List[Artifact] = []
+    new_tasks: List[TaskSpec] = [] # Tasks to splice into the running workflow, between this task and its dependents
+
+_TRUSTED_TEMPLATES: Dict[type, Tuple[Dict[str, Any], Tuple[Tuple[str, Callable[[], Any]], ...]]] = {}
+
+def _trusted_template(model: type) -> Tuple[Dict[str, Any], Tuple[Tuple[str, Callable[[], Any]], ...]]:
+    """A model's fields in definition order with their defaults, and the factories of its mutable defaults."""
+    template: Dict[str, Any] = {}
+    factories = []
+    for name, field in model.model_fields.items():
+        template[name] = None if field.default is PydanticUndefined else field.default
+        if field.default_factory is not None:
+            factories.append((name, field.default_factory))
+        elif isinstance(field.default, (dict, list, set)):
+            factories.append((name, field.default.copy)) # Mutable defaults are copied, as validation does
+    _TRUSTED_TEMPLATES[model] = template, tuple(factories)
+    return _TRUSTED_TEMPLATES[model]
+
+def construct_trusted(model: Type[M], **values: Any) -> M:
+    """
+    Builds a model from values that have already been validated (read back from
+    our own stores, or taken from other models) without validating them again.
+    Use it on internal hot paths only; data from outside the system is validated
+    once, where it enters. Omitted fields get their defaults and nested models
+    must be passed as instances. It pays off for models with container fields
+    (TaskSpec, AgentResponse); flat models such as TaskOutcome validate faster
+    than any Python-level constructor, `model_construct` included.
+    """
+    template, factories = _TRUSTED_TEMPLATES.get(model) or _trusted_template(model)
+    fields = template.copy()
+    fields.update(values)
+    for name, factory in factories:
+        if name not in values:
+            fields[name] = factory()
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", fields)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(values))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
@@ -1,89 +1,151 @@
 # src/orchestrator.py
 """Manages the main workflow orchestration loop, fetching and dispatching tasks."""
 import logging
-from typing import List
-from src.task_manager import task_queue
+from collections import Counter
+from typing import Dict, List, Optional, Union
 from src.agents.factory import AgentFactory
-from src.workflow.state import workflow_state_machine, WorkflowState
-from src.models import TaskSpec, AgentResponse
-from src.session_manager import session_manager
-from src.task_dependencies import topological_sort, detect_cycles # Import dependency management
+from src.workflow.state import WorkflowState, FailurePolicy
+from src.models import TaskSpec, TaskOutcome
+from src.run_context import RunContext
+from src.artifact_bus import artifact_bus
+from src.task_cache import task_result_cache
+from src.distributed.broker import TaskBroker
+from src.config import settings
+from src.scheduler import COMPLETED_STATUS, SKIPPED_STATUS, TaskScheduler
+from src.workflow.compact_graph import CompactGraph, TaskCounters
+from src.workflow.conditions import validate_conditions
 
 logger = logging.getLogger(__name__)
 
 class Orchestrator:
-    def __init__(self, agent_factory: AgentFactory):
+    def __init__(self, agent_factory: AgentFactory, use_cache: Optional[bool] = None,
+                 failure_policy: Optional[Union[FailurePolicy, str]] = None, max_parallel: Optional[int] = None,
+                 deadline_s: Optional[float] = None, run_context: Optional[RunContext] = None,
+                 broker: Optional[TaskBroker] = None):
         self.agent_factory = agent_factory
-        
-    def run_workflow(self, initial_tasks: List[TaskSpec]):
+        self.broker = broker
+        self.run_context = run_context or RunContext.default()
+        self.session_manager = self.run_context.session_manager
+        self.task_queue = self.run_context.task_queue
+        self.state_machine = self.run_context.state_machine
+        self.use_cache = settings.TASK_CACHE_ENABLED if use_cache is None else use_cache
+        self.failure_policy = FailurePolicy(failure_policy or settings.FAILURE_POLICY)
+        self.max_parallel = max(1, max_parallel or settings.MAX_PARALLEL_TASKS)
+        self.deadline_s = deadline_s if deadline_s is not None else settings.WORKFLOW_TIMEOUT_S
+
+    def run_workflow(self, initial_tasks: Union[List[TaskSpec], CompactGraph]) -> Dict[str, TaskOutcome]:
         """
-        Executes the main workflow orchestration loop.
-        Processes tasks based on dependencies.
+        Executes the main workflow orchestration loop on the orchestrator's run
+        context (its session, task queue and state machine). The tasks are held
+        as a CompactGraph (pass one directly for very large workflows), and each
+        TaskSpec is only built when the task is dispatched.
+        Tasks are dispatched as soon as their dependencies have completed, up to
+        `max_parallel` at a time. Each task's outcome is checkpointed; when the
+        current session was resumed (see `SessionManager.resume_session`), tasks
+        checkpointed as completed are skipped and their artifacts are read back
+        from the artifact store by dependents. With `use_cache`, tasks whose
+        fingerprint is unchanged since a previous run reuse its memoized result
+        (see src/task_cache.py) instead of being dispatched to their agent.
+        Map tasks (`TaskSpec.map`) run their template once per item of their
+        collection, expanding items a chunk at a time (see src/workflow/mapping.py),
+        then their optional reduce task; their dependents wait for all of it.
+        A task with conditions (`TaskSpec.when`) is skipped, with its descendants,
+        unless each condition holds on its dependency's output. A task's response
+        may carry `new_tasks`, which are spliced in between it and its dependents.
+
+        On failure, `failure_policy` decides what happens next: `fail_fast` stops
+        dispatching, `continue_independent` skips only the failed task's
+        descendants, and `retry_n` retries it first. A task is also retried up to
+        its own `retries` times. Tasks that overrun their `timeout` are cancelled
+        and count as failed; when the workflow deadline (`deadline_s`) passes,
+        in-flight tasks are cancelled and the workflow fails. Ctrl-C stops
+        dispatching, drains in-flight tasks for CANCEL_GRACE_S seconds, cancels
+        the rest and ends the workflow as CANCELLED. Returns the outcome of every
+        task, keyed by task id.
         """
-        session = session_manager.get_current_session()
+        session = self.session_manager.get_current_session()
         if not session:
             logger.error("No active session found. Cannot run workflow.")
-            return
+            return {}
 
-        workflow_state_machine.transition_to(WorkflowState.RUNNING)
+        self.state_machine.transition_to(WorkflowState.RUNNING)
+        self.session_manager.save_session()
         logger.info(f"Workflow orchestration started for session {session.id}.")
+        outcomes: Dict[str, TaskOutcome] = {}
 
         try:
             # 1. Validate and sort tasks based on dependencies
-            if detect_cycles(initial_tasks):
-                raise ValueError("Circular dependency detected in the initial task list.")
-            sorted_tasks = topological_sort(initial_tasks)
-
-            # 2. Populate task queue with sorted tasks
-            for task in sorted_tasks:
-                task_queue.add_task(task)
+            graph = initial_tasks if isinstance(initial_tasks, CompactGraph) else CompactGraph(initial_tasks)
+            try:
+                order = graph.topological_order()
+            except ValueError:
+                raise ValueError("Circular dependency detected in the initial task list.") from None
+            for task in graph.with_conditions():
+                validate_conditions(task)
+            fingerprints = task_result_cache.fingerprints([graph[graph.task_id(i)] for i in order]) if self.use_cache else {}
 
-            # 3. Main orchestration loop
-            while True:
-                task = task_queue.get_next_task()
-                if not task:
-                    logger.info("No more tasks in queue. Workflow complete.")
-                    break
+            # 2. Skip tasks completed in an earlier run of this session, and branches it did not take.
+            # Conditions were evaluated when that run completed their dependencies, so they are not re-checked.
+            # Tasks injected in that run are spliced in again first, so their dependents wait for them.
+            checkpoints = self.session_manager.get_checkpoints()
+            waiting = TaskCounters(graph)
+            scheduler = TaskScheduler(self, session.id, graph, waiting, fingerprints, outcomes)
+            restored = scheduler.restore_injected(checkpoints) if checkpoints else 0
+            if restored:
+                logger.info(f"Resuming session {session.id}: restored {restored} task(s) injected in a previous run.")
+                order = graph.live_order()
+            for i in (order if checkpoints else ()):
+                task_id = graph.task_id(i)
+                checkpoint = checkpoints.get(task_id)
+                if checkpoint is not None and checkpoint.status == COMPLETED_STATUS:
+                    artifact_bus.register_produced(session.id, task_id, [ref.name for ref in checkpoint.artifacts])
+                    outcomes[task_id] = TaskOutcome(task_id=task_id, status="resumed")
+                elif (checkpoint is not None and checkpoint.status == SKIPPED_STATUS) or any(
+                        outcomes.get(dep_id) is not None and outcomes[dep_id].status == SKIPPED_STATUS for dep_id in graph.dependency_ids(task_id)):
+                    outcomes[task_id] = TaskOutcome(task_id=task_id, status=SKIPPED_STATUS, error="Branch not taken in a previous run")
+            if outcomes:
+                logger.info(f"Resuming session {session.id}: skipping {len(outcomes)} task(s) completed in a previous run.")
+                self.session_manager.add_log_entry(f"Resumed; skipped {len(outcomes)} completed task(s).")
 
-                logger.info(f"Dispatching task: {task.name} (ID: {task.id}) to agent: {task.agent_name}")
-                session_manager.add_log_entry(f"Dispatching task: {task.name} to agent: {task.agent_name}")
+            # 3. Queue tasks whose dependencies are all met; the rest wait for them
+            for i in order:
+                task_id = graph.task_id(i)
+                if task_id in outcomes:
+                    continue
+                waiting[task_id] = sum(1 for dep_id in graph.dependency_ids(task_id) if dep_id not in outcomes)
+                if waiting[task_id] == 0:
+                    scheduler.queue(task_id)
 
-                try:
-                    agent = self.agent_factory.create_agent(task.agent_name)
-                    response: AgentResponse = agent.run(task)
-                    
-                    task_queue.update_task_status(task.id, response.status)
-                    session_manager.add_log_entry(f"Task {task.name} (ID: {task.id}) completed with status: {response.status}")
-                    
-                    # Process agent response (artifacts, output etc.)
-                    if response.artifacts:
-                        for artifact in response.artifacts:
-                            session_manager.add_artifact(artifact)
-                            logger.info(f"Agent {task.agent_name} produced artifact: {artifact.name}")
+            # 4. Main orchestration loop
+            stop_reason = scheduler.run()
 
-                    if response.status == "failed":
-                        logger.error(f"Task {task.name} reported failure: {response.output.get('error_message', 'No error message provided')}")
-                        workflow_state_machine.transition_to(WorkflowState.FAILED)
-                        break # Stop workflow on agent-reported failure
-
-                except Exception as e:
-                    task_queue.update_task_status(task.id, "failed")
-                    session_manager.add_log_entry(f"Task {task.name} (ID: {task.id}) failed due to exception: {e}")
-                    logger.error(f"Task {task.name} (ID: {task.id}) failed unexpectedly: {e}", exc_info=True)
-                    workflow_state_machine.transition_to(WorkflowState.FAILED)
-                    break
+            for task_id in graph: # Includes tasks injected while running
+                if task_id not in outcomes:
+                    outcomes[task_id] = TaskOutcome(task_id=task_id, status=SKIPPED_STATUS, error="Workflow stopped before the task was dispatched")
+            if stop_reason == "interrupted":
+                self.state_machine.transition_to(WorkflowState.CANCELLED)
+            elif stop_reason is not None or any(outcome.status == "failed" for outcome in outcomes.values()):
+                self.state_machine.transition_to(WorkflowState.FAILED)
+            else:
+                logger.info("No more tasks in queue. Workflow complete.")
         except ValueError as ve: # Catch dependency errors
             logger.error(f"Workflow failed due to dependency issue: {ve}")
-            workflow_state_machine.transition_to(WorkflowState.FAILED)
+            self.state_machine.transition_to(WorkflowState.FAILED)
         except Exception as e: # Catch any other unexpected errors during setup
             logger.error(f"An unexpected error occurred during workflow setup: {e}", exc_info=True)
-            workflow_state_machine.transition_to(WorkflowState.FAILED)
+            self.state_machine.transition_to(WorkflowState.FAILED)
         finally:
+            artifact_bus.clear_session(session.id)
+            if outcomes:
+                summary = ", ".join(f"{count} {status}" for status, count in sorted(Counter(o.status for o in outcomes.values()).items()))
+                logger.info(f"Task outcomes: {summary}.")
+                self.session_manager.add_log_entry(f"Task outcomes: {summary}")
             # Final state transition if loop completed without breaking
-            if workflow_state_machine.get_state() == WorkflowState.RUNNING:
-                workflow_state_machine.transition_to(WorkflowState.COMPLETED)
-                session_manager.end_session(status=WorkflowState.COMPLETED)
+            if self.state_machine.get_state() == WorkflowState.RUNNING:
+                self.state_machine.transition_to(WorkflowState.COMPLETED)
+                self.session_manager.end_session(status=WorkflowState.COMPLETED)
             else:
-                session_manager.end_session(status=workflow_state_machine.get_state())
-                
-            logger.info(f"Workflow orchestration finished for session {session.id} with final status: {workflow_state_machine.get_state().value}.")
+                self.session_manager.end_session(status=self.state_machine.get_state())
+
+            logger.info(f"Workflow orchestration finished for session {session.id} with final status: {self.state_machine.get_state().value}.")
+        return outcomes
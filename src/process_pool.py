@@ -0,0 +1,232 @@
+# src/process_pool.py
+"""Runs CPU-bound agents in a warm process pool, passing large payloads through shared memory."""
+import importlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from src.config import settings
+from src.models import AgentResponse, AgentSpec, Artifact, TaskSpec
+from src.agents.registry import agent_registry
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+PROCESS_EXECUTOR = "process" # AgentSpec.executor value that selects the process pool
+
+
+class _SharedBlock(NamedTuple):
+    """Stands in for a large payload moved into a shared memory segment."""
+    name: str
+    size: int
+    dtype: Optional[str] = None # Set for numpy arrays, None for raw bytes
+    shape: Tuple[int, ...] = ()
+
+
+def _is_large(value: Any, threshold: int) -> bool:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return memoryview(value).nbytes >= threshold
+    return np is not None and isinstance(value, np.ndarray) and value.dtype != object and value.nbytes >= threshold
+
+
+def _export(value: Any, threshold: int, blocks: List[shared_memory.SharedMemory]) -> Any:
+    """Recursively moves large payloads in `value` into new shared memory segments, appended to `blocks`."""
+    if _is_large(value, threshold):
+        if np is not None and isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value)
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+            blocks.append(segment)
+            return _SharedBlock(segment.name, array.nbytes, array.dtype.str, array.shape)
+        view = memoryview(value).cast("B")
+        segment = shared_memory.SharedMemory(create=True, size=max(view.nbytes, 1))
+        segment.buf[:view.nbytes] = view
+        blocks.append(segment)
+        return _SharedBlock(segment.name, view.nbytes)
+    if isinstance(value, Artifact):
+        return value.model_copy(update={"data": _export(value.data, threshold, blocks)})
+    if isinstance(value, dict):
+        return {key: _export(item, threshold, blocks) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_export(item, threshold, blocks) for item in value)
+    return value
+
+
+def _import(value: Any, attached: List[shared_memory.SharedMemory], copy: bool) -> Any:
+    """
+    Replaces shared blocks in `value` with their payloads: zero-copy views
+    (memoryview / ndarray over the segment, kept open via `attached`), or
+    private copies when `copy` is set.
+    """
+    if isinstance(value, _SharedBlock):
+        segment = shared_memory.SharedMemory(name=value.name)
+        attached.append(segment)
+        if value.dtype is not None:
+            array = np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=segment.buf)
+            return array.copy() if copy else array
+        view = segment.buf[:value.size]
+        if copy:
+            data = bytes(view)
+            view.release()
+            return data
+        return view
+    if isinstance(value, Artifact):
+        return value.model_copy(update={"data": _import(value.data, attached, copy)})
+    if isinstance(value, dict):
+        return {key: _import(item, attached, copy) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_import(item, attached, copy) for item in value)
+    return value
+
+
+def _release(segments: List[shared_memory.SharedMemory], unlink: bool):
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            pass # A view is still referenced; the mapping goes away with it
+        if unlink:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _init_worker(specs: List[Dict[str, Any]], agent_classes: List[Tuple[str, str]]):
+    """Pool initializer: mirrors the parent's agent registry so tasks start without loading anything."""
+    for spec in specs:
+        agent_registry.register_agent_spec(AgentSpec(**spec))
+    for module_name, class_name in agent_classes:
+        try:
+            agent_registry.register_agent_class(getattr(importlib.import_module(module_name), class_name))
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"Process worker {os.getpid()} could not load agent class {module_name}.{class_name}: {e}")
+
+
+def _run_in_worker(task: TaskSpec, threshold: int) -> AgentResponse:
+    """Runs a task in a pool process. Large payloads arrive as views over shared memory and leave through it."""
+    from src.agents.factory import AgentFactory
+    attached: List[shared_memory.SharedMemory] = []
+    created: List[shared_memory.SharedMemory] = []
+    try:
+        task = task.model_copy(update={"input_data": _import(task.input_data, attached, copy=False)})
+        response = AgentFactory().create_agent(task.agent_name).run(task)
+        response = response.model_copy(update={
+            "output": _export(response.output, threshold, created),
+            "artifacts": _export(response.artifacts, threshold, created),
+        })
+    except BaseException:
+        _release(created, unlink=True)
+        raise
+    finally:
+        _release(attached, unlink=False)
+    _release(created, unlink=False) # The parent copies the payloads out and unlinks the segments
+    return response
+
+
+class ProcessPoolTaskExecutor:
+    """
+    A pool of warm worker processes for agents whose spec sets
+    `executor: process`. Each worker is started with a copy of the agent
+    registry (specs and importable agent classes). Payloads of at least
+    `shm_threshold` bytes (bytes-like values and numpy arrays in `input_data`,
+    upstream artifacts, response output and artifacts) travel through
+    `multiprocessing.shared_memory` instead of being pickled through a pipe;
+    agents receive them as zero-copy memoryviews/arrays.
+
+    Tasks run with a fresh `AgentFactory` in the worker, and cannot be
+    cancelled cooperatively once started.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, shm_threshold: Optional[int] = None):
+        self.max_workers = max_workers or settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+        self.shm_threshold = shm_threshold or settings.PROCESS_POOL_SHM_THRESHOLD
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._snapshot: Optional[tuple] = None
+        self._registry_version: Optional[int] = None # agent_registry.version when the snapshot was taken
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _registry_snapshot() -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
+        specs = [spec.model_dump() for spec in agent_registry.list_agent_specs()]
+        classes = [(cls.__module__, cls.__qualname__) for cls in agent_registry._agents.values()
+                   if cls.__module__ != "__main__" and "<locals>" not in cls.__qualname__]
+        return specs, classes
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Returns the pool, restarting it if agents were registered since its
+        workers started. The registry is only snapshotted and compared again
+        once its version has changed.
+        """
+        with self._lock:
+            version = agent_registry.version
+            if self._pool is not None and version == self._registry_version:
+                return self._pool
+            specs, classes = self._registry_snapshot()
+            snapshot = (repr(specs), tuple(classes))
+            self._registry_version = version
+            if self._pool is None or snapshot != self._snapshot:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"), # Safe alongside the orchestrator's threads
+                    initializer=_init_worker,
+                    initargs=(specs, classes),
+                )
+                self._snapshot = snapshot
+            return self._pool
+
+    def warm(self):
+        """Starts every worker process now rather than on first use."""
+        pool = self._get_pool()
+        for future in [pool.submit(os.getpid) for _ in range(self.max_workers)]:
+            future.result()
+
+    def submit(self, task: TaskSpec) -> Future:
+        """Runs a task on a pool process. Returns a future of its AgentResponse."""
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            shared_task = task.model_copy(update={"input_data": _export(task.input_data, self.shm_threshold, blocks)})
+            inner = self._get_pool().submit(_run_in_worker, shared_task, self.shm_threshold)
+        except BaseException:
+            _release(blocks, unlink=True)
+            raise
+        outer: Future = Future()
+        outer.set_running_or_notify_cancel()
+
+        def resolve(done: Future):
+            _release(blocks, unlink=True)
+            try:
+                response = done.result()
+                attached: List[shared_memory.SharedMemory] = []
+                try:
+                    response = response.model_copy(update={
+                        "output": _import(response.output, attached, copy=True),
+                        "artifacts": _import(response.artifacts, attached, copy=True),
+                    })
+                finally:
+                    _release(attached, unlink=True)
+                outer.set_result(response)
+            except BaseException as e:
+                outer.set_exception(e)
+
+        inner.add_done_callback(resolve)
+        return outer
+
+    def shutdown(self, wait: bool = True):
+        """Stops the worker processes."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+process_pool = ProcessPoolTaskExecutor()
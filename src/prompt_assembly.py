@@ -0,0 +1,133 @@
+# src/prompt_assembly.py
+"""Assembles prompts from a static prefix, rendered once and shared across tasks, and a per-task suffix, within a token budget."""
+import json
+import re
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, Optional, Tuple
+from jinja2 import Environment, StrictUndefined, Template, TemplateError
+from src.models import AssembledPrompt
+from src.prompt_manager import PromptManager, prompt_manager
+from src.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUFFIX_MARKER = "{# suffix #}" # Ends a template's static prefix; without it the prefix ends at the first Jinja tag
+_FIRST_TAG = re.compile(r"\{[{%#]")
+# Roughly one BPE token per short word (or five-character piece of a longer one) and per punctuation mark
+_TOKEN_PIECE = re.compile(r"\w{1,5}|[^\w\s]")
+_strict = Environment(undefined=StrictUndefined)
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local estimate of the number of tokens in a text; close to, and usually slightly above, BPE tokenizers."""
+    return len(_TOKEN_PIECE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts a text after its first `max_tokens` estimated tokens (e.g. a document variable, to fit a budget)."""
+    if max_tokens <= 0:
+        return ""
+    last = None
+    for last in islice(_TOKEN_PIECE.finditer(text), max_tokens - 1, max_tokens):
+        pass
+    return text if last is None else text[:last.end()]
+
+
+def split_template(source: str) -> Tuple[str, str]:
+    """Splits a template's source into its static prefix and its dynamic suffix."""
+    if SUFFIX_MARKER in source:
+        prefix, suffix = source.split(SUFFIX_MARKER, 1)
+        return prefix, suffix
+    match = _FIRST_TAG.search(source)
+    if match is None:
+        return source, ""
+    return source[:match.start()], source[match.start():]
+
+
+class PromptAssembler:
+    """
+    Renders named prompts from a PromptManager as an AssembledPrompt. The
+    prefix of a template (up to SUFFIX_MARKER, or its first Jinja tag) may only
+    use the shared, workflow-level variables; it is rendered once per prompt
+    version and set of shared variables and reused by every task. The suffix is
+    rendered per task with the shared and task variables. Prefixes of at least
+    PROMPT_CACHE_MIN_TOKENS estimated tokens are marked `cacheable` so providers
+    that support prompt caching can reuse their prefill.
+    """
+
+    def __init__(self, manager: Optional[PromptManager] = None, cache_size: Optional[int] = None):
+        self._manager = manager or prompt_manager
+        self._cache_size = cache_size or settings.PROMPT_PREFIX_CACHE_SIZE
+        self._templates: Dict[str, Tuple[str, Template, Template]] = {} # name -> (version, prefix, suffix)
+        self._prefixes: "OrderedDict[Tuple[str, str, str], Tuple[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.prefix_hits = 0
+        self.prefix_misses = 0
+
+    def _compiled(self, name: str) -> Tuple[str, Template, Template]:
+        version = self._manager.get_version(name)
+        if version is None:
+            raise ValueError(f"Unknown prompt: {name}")
+        compiled = self._templates.get(name)
+        if compiled is None or compiled[0] != version:
+            prefix, suffix = split_template(self._manager.get_prompt(name))
+            try:
+                compiled = (version, _strict.from_string(prefix), _strict.from_string(suffix))
+            except TemplateError as e:
+                raise ValueError(f"Invalid prompt template '{name}': {e}") from e
+            self._templates[name] = compiled
+        return compiled
+
+    def _prefix(self, name: str, version: str, template: Template, shared: Dict[str, Any]) -> Tuple[str, int]:
+        key = (name, version, json.dumps(shared, sort_keys=True, default=str))
+        with self._lock:
+            cached = self._prefixes.get(key)
+            if cached is not None:
+                self._prefixes.move_to_end(key)
+                self.prefix_hits += 1
+                return cached
+        try:
+            text = template.render(**shared)
+        except TemplateError as e:
+            raise ValueError(f"The prefix of prompt '{name}' can only use shared variables: {e}") from e
+        rendered = (text, estimate_tokens(text))
+        with self._lock:
+            self.prefix_misses += 1
+            self._prefixes[key] = rendered
+            while len(self._prefixes) > self._cache_size:
+                self._prefixes.popitem(last=False)
+        return rendered
+
+    def assemble(self, name: str, variables: Optional[Dict[str, Any]] = None, shared: Optional[Dict[str, Any]] = None,
+                 max_tokens: Optional[int] = None) -> AssembledPrompt:
+        """
+        Renders a prompt for one task. `shared` holds the variables that are the
+        same across tasks (the only ones the prefix may use); `variables` are
+        the task's own. Raises ValueError if the prompt is unknown or invalid,
+        uses a variable that was not given, or if its estimated tokens exceed
+        `max_tokens` (default: settings.PROMPT_TOKEN_BUDGET).
+        """
+        shared = shared or {}
+        version, prefix_template, suffix_template = self._compiled(name)
+        prefix, prefix_tokens = self._prefix(name, version, prefix_template, shared)
+        try:
+            suffix = suffix_template.render(**{**shared, **(variables or {})})
+        except TemplateError as e:
+            raise ValueError(f"Could not render prompt '{name}': {e}") from e
+        prompt = AssembledPrompt(
+            prefix=prefix, suffix=suffix, prefix_tokens=prefix_tokens, suffix_tokens=estimate_tokens(suffix),
+            cacheable=prefix_tokens >= settings.PROMPT_CACHE_MIN_TOKENS,
+        )
+        budget = max_tokens if max_tokens is not None else settings.PROMPT_TOKEN_BUDGET
+        if budget is not None and prompt.tokens > budget:
+            raise ValueError(
+                f"Prompt '{name}' is about {prompt.tokens} tokens ({prompt.prefix_tokens} in its prefix), "
+                f"over the budget of {budget}."
+            )
+        return prompt
+
+
+prompt_assembler = PromptAssembler()
@@ -1,7 +1,8 @@
 # src/prompt_manager.py
 """Manages loading and retrieval of prompt templates."""
+import hashlib
 import os
-from typing import Dict
+from typing import Dict, Optional
 from src.file_io import read_file
 from src.paths import get_root_dir, ensure_dir
 from src.config import settings
@@ -34,6 +35,13 @@ class PromptManager:
         """Retrieves a prompt template by name."""
         return self.prompts.get(name, "")
 
+    def get_version(self, name: str) -> Optional[str]:
+        """Returns a content hash identifying the current version of a prompt, or None if unknown."""
+        content = self.prompts.get(name)
+        if content is None:
+            return None
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
     def update_prompt(self, name: str, new_content: str):
         """Updates an existing prompt template in memory."""
         self.prompts[name] = new_content
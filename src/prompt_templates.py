@@ -1,5 +1,6 @@
 # src/prompt_templates.py
 """Loads and renders prompt templates, supporting Jinja2."""
+from functools import lru_cache
 from jinja2 import Template
 from src.file_io import read_file
 
@@ -7,7 +8,11 @@ def load_template(template_path: str) -> str:
     """Loads a prompt template from a file."""
     return read_file(template_path)
 
+@lru_cache(maxsize=256)
+def compile_template(template_string: str) -> Template:
+    """Compiles a Jinja2 template once; templates rendered repeatedly reuse the compiled form."""
+    return Template(template_string)
+
 def render_template(template_string: str, **kwargs) -> str:
     """Renders a Jinja2 template with provided arguments."""
-    template = Template(template_string)
-    return template.render(**kwargs)
+    return compile_template(template_string).render(**kwargs)
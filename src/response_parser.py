@@ -1,17 +1,260 @@
 # src/response_parser.py
 """Handles parsing and deserialization of various response formats (e.g., JSON, plain text)."""
 import json
-from typing import Any, Dict
-from src.models import AgentResponse # Assuming AgentResponse is the target model
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from pydantic import TypeAdapter, ValidationError
+from src.models import AgentResponse
+import logging
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# orjson is several times faster on large payloads; both raise ValueError subclasses on invalid JSON
+_loads = orjson.loads if orjson is not None else json.loads
+_decoder = json.JSONDecoder()
+
+_FENCED = re.compile(r"```[ \t]*(?:json)?[ \t]*\r?\n?(.*?)```", re.DOTALL | re.IGNORECASE)
+_OPENING_FENCE = re.compile(r"^```[ \t]*(?:json)?[ \t]*\r?\n?", re.IGNORECASE)
+_OPENING = re.compile(r"[\[{]")
+# A string (its closing quote captured, so an unterminated one can be told apart) or a structural character
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*("?)|[{}\[\],]', re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+_MAX_EMBEDDED_CANDIDATES = 64 # Opening brackets tried when looking for JSON inside prose
+_MAX_PARTIAL_CUTS = 8 # Cut points tried, latest first, when completing cut-off JSON
+
+_responses = TypeAdapter(List[AgentResponse])
+
+
+def parse_partial(text: str) -> Optional[Any]:
+    """
+    Parses JSON that may have been cut off, e.g. a response that is still being
+    streamed: an open string and open containers are closed, and an incomplete
+    trailing member is dropped, so `{"label": "urg` parses as {"label": "urg"}
+    and `{"a": 1, "b": tr` as {"a": 1}. Returns None unless the text (after an
+    optional opening code fence) starts with an object or array that can be
+    completed and, if the value is complete, nothing but whitespace or a
+    closing fence follows it (`[1] See the docs` is prose, not JSON).
+    """
+    text = _OPENING_FENCE.sub("", text.strip(), count=1).strip()
+    if text.endswith("```"):
+        text = text[:-3].rstrip()
+    if not text or text[0] not in _CLOSERS:
+        return None
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = [] # (where the text can be cut, closers needed there)
+    end, tail = len(text), ""
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        if token[0] == '"':
+            if not match.group(1): # Unterminated: the text ends inside this string
+                end, tail = match.end(), '"'
+                break
+        elif token in _CLOSERS:
+            stack.append(_CLOSERS[token])
+            cuts.append((match.end(), "".join(reversed(stack))))
+        elif token == ",":
+            cuts.append((match.start(), "".join(reversed(stack))))
+        else:
+            if not stack or stack.pop() != token:
+                return None
+            if not stack: # The value is complete; anything but a closing fence after it makes the text prose
+                rest = text[match.end():].strip()
+                if rest and rest != "```":
+                    return None
+                try:
+                    return _loads(text[:match.end()])
+                except ValueError:
+                    return None
+    candidates = [text[:end] + tail + "".join(reversed(stack))]
+    candidates.extend(text[:cut] + closers for cut, closers in reversed(cuts[-_MAX_PARTIAL_CUTS:]))
+    for candidate in candidates:
+        try:
+            return _loads(candidate)
+        except ValueError:
+            continue
+    return None
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a JSON object or array that arrives in chunks, e.g.
+    from `LLMProvider.stream`. `feed` returns the members of the root value
+    that each chunk completed, as (key, value) pairs for an object and
+    (index, element) pairs for an array, so consumers can start on the first
+    fields or items while the rest is still being generated. Text before the
+    first `{` or `[` (prose, a code fence) and after the root closes is ignored.
+    Each character is scanned once, except for a string that is still open at
+    the end of a chunk. Raises ValueError for a member that is not valid JSON.
+    """
+
+    def __init__(self):
+        self.value: Any = None # Members completed so far: a dict or a list, once the root has opened
+        self.done = False
+        self._buffer = "" # Text of the root value from the start of the current member
+        self._pos = 0 # Where scanning resumes in _buffer
+        self._depth = 0
+
+    def feed(self, chunk: str) -> List[Tuple[Union[str, int], Any]]:
+        """Adds a chunk and returns the members it completed."""
+        if self.done:
+            return []
+        self._buffer += chunk
+        if self.value is None:
+            match = _OPENING.search(self._buffer)
+            if match is None:
+                self._buffer = ""
+                return []
+            self.value = {} if match.group() == "{" else []
+            self._buffer, self._pos, self._depth = self._buffer[match.end():], 0, 1
+        members = []
+        start = 0 # Of the current member in _buffer
+        for match in _TOKEN.finditer(self._buffer, self._pos):
+            token = match.group()
+            if token[0] == '"':
+                if not match.group(1):
+                    break # Rescanned once the rest of the string has arrived
+            elif token in _CLOSERS:
+                self._depth += 1
+            elif self._depth > 1:
+                if token != ",":
+                    self._depth -= 1
+            else:
+                if self._buffer[start:match.start()].strip():
+                    members.append(self._add(self._buffer[start:match.start()]))
+                start = match.end()
+                if token != ",":
+                    self.done = True
+                    self._buffer = ""
+                    return members
+            self._pos = match.end()
+        self._buffer = self._buffer[start:]
+        self._pos -= start
+        return members
+
+    def _add(self, text: str) -> Tuple[Union[str, int], Any]:
+        try:
+            if isinstance(self.value, dict):
+                (key, value), = _loads("{" + text + "}").items()
+                self.value[key] = value
+                return key, value
+            value = _loads(text)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON in streamed member {text.strip()[:80]!r}: {e}") from e
+        self.value.append(value)
+        return len(self.value) - 1, value
+
+    def close(self) -> Any:
+        """
+        Ends the stream and returns the whole value. A value that was cut off is
+        completed as by `parse_partial`. None if no object or array was streamed.
+        """
+        if self.value is not None and not self.done:
+            if isinstance(self.value, dict):
+                self.value.update(parse_partial("{" + self._buffer) or {})
+            else:
+                self.value.extend(parse_partial("[" + self._buffer) or [])
+        self.done = True
+        self._buffer = ""
+        return self.value
+
+
+def stream_members(chunks: Iterable[str]) -> Iterator[Tuple[Union[str, int], Any]]:
+    """Yields the members of a streamed JSON object or array as each one completes (see StreamingJSONParser)."""
+    parser = StreamingJSONParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+
+def _is_structured(value: Any) -> bool:
+    """Whether a value found inside prose looks like a structured answer rather than e.g. a citation like [1]."""
+    if isinstance(value, dict):
+        return True
+    return isinstance(value, list) and bool(value) and all(isinstance(item, dict) for item in value)
+
+
+def _parse(text: str) -> Tuple[bool, Any]:
+    """
+    (True, value) for the JSON in a response: the whole text, the first fenced
+    block that is valid JSON, JSON that was cut off, or the first object (or
+    array of objects) embedded in prose; (False, None) if there is none.
+    """
+    try:
+        return True, _loads(text)
+    except ValueError:
+        pass
+    if "```" in text:
+        for block in _FENCED.findall(text):
+            try:
+                return True, _loads(block)
+            except ValueError:
+                continue
+    value = parse_partial(text)
+    if value is not None:
+        return True, value
+    match = _OPENING.search(text)
+    for _ in range(_MAX_EMBEDDED_CANDIDATES):
+        if match is None:
+            break
+        try:
+            value, end = _decoder.raw_decode(text, match.start())
+        except ValueError:
+            value, end = None, None
+        if _is_structured(value):
+            if not text[:match.start()].strip() and text[end:].strip():
+                logger.warning(f"Ignoring text after the JSON at the start of a response: {text[end:].strip()[:80]!r}")
+            return True, value
+        match = _OPENING.search(text, match.start() + 1)
+    return False, None
+
 
 def parse_response(response_text: str) -> Dict[str, Any]:
     """
-    Parses a response string, attempting JSON deserialization first,
-    then falling back to plain text.
+    Parses a response string into the JSON object it holds: the whole text, the
+    first fenced code block that is valid JSON, or the first object embedded in
+    prose. JSON that was cut off is completed with `parse_partial`. Other JSON
+    values (arrays, numbers, ...) and plain text are returned as the "output"
+    of a successful response.
+    """
+    found, value = _parse(response_text)
+    if found and isinstance(value, dict):
+        return value
+    return {"output": value if found else response_text, "status": "success", "artifacts": []}
+
+
+def _response_fields(text: str) -> Any:
+    found, value = _parse(text)
+    if not found:
+        return {"status": "completed", "output": {"text": text}}
+    if isinstance(value, dict):
+        return value if "status" in value else {"status": "completed", "output": value}
+    return {"status": "completed", "output": {"result": value}}
+
+
+def parse_many(response_texts: Iterable[str]) -> List[AgentResponse]:
+    """
+    Parses a batch of responses (e.g. classifier outputs) and validates them
+    into AgentResponses in one pass. An object with a "status" is read as an
+    AgentResponse, any other object becomes a completed response's output,
+    other JSON values are wrapped as {"result": value} and plain text as
+    {"text": text}. A response that fails validation comes back as a failed
+    response carrying the validation error; the rest are unaffected.
     """
+    items = [_response_fields(text) for text in response_texts]
     try:
-        data = json.loads(response_text)
-        # Optional: Validate against AgentResponse schema here
-        return data
-    except json.JSONDecodeError:
-        return {"output": response_text, "status": "success", "artifacts": []}
+        return _responses.validate_python(items)
+    except ValidationError as e:
+        errors: Dict[int, str] = {}
+        for error in e.errors():
+            index, *field = error["loc"]
+            errors.setdefault(index, f"{'.'.join(map(str, field))}: {error['msg']}")
+    logger.warning(f"{len(errors)} of {len(items)} response(s) failed validation.")
+    valid = iter(_responses.validate_python([item for i, item in enumerate(items) if i not in errors]))
+    return [
+        AgentResponse(status="failed", output={"error_message": f"Invalid response: {errors[i]}"}) if i in errors else next(valid)
+        for i in range(len(items))
+    ]
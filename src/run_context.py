@@ -0,0 +1,52 @@
+# src/run_context.py
+"""Per-run state: the session, task queue, workflow state machine and execution context of one workflow run."""
+import uuid
+from typing import Optional
+from src.context import ContextManager, context_manager
+from src.models import ExecutionContext, Session
+from src.session_manager import SessionManager, session_manager
+from src.session_store import SessionStore
+from src.task_manager import TaskQueue, task_queue
+from src.workflow.state import WorkflowStateMachine, workflow_state_machine
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RunContext:
+    """
+    Owns the mutable state of a single workflow run, so several runs can
+    proceed concurrently in one process. Process-wide resources (the agent
+    registry, LLM providers, artifact store and task result cache) are shared
+    and are not part of a run.
+
+    `RunContext.default()` wraps the module-level singletons and is what the
+    `Orchestrator` uses when it is not given a context.
+    """
+
+    def __init__(self, store: Optional[SessionStore] = None, run_id: Optional[str] = None):
+        self.run_id = run_id or str(uuid.uuid4())
+        self.state_machine = WorkflowStateMachine()
+        self.task_queue = TaskQueue()
+        self.session_manager = SessionManager(store=store, state_machine=self.state_machine)
+        self.context = ContextManager()
+
+    @classmethod
+    def default(cls) -> "RunContext":
+        """Returns a context backed by the process-wide singletons."""
+        run = cls.__new__(cls)
+        run.run_id = "default"
+        run.state_machine = workflow_state_machine
+        run.task_queue = task_queue
+        run.session_manager = session_manager
+        run.context = context_manager
+        return run
+
+    def start_session(self, resume_session_id: Optional[str] = None) -> Session:
+        """Starts a new session for this run, or resumes a persisted one, and points the execution context at it."""
+        if resume_session_id:
+            session = self.session_manager.resume_session(resume_session_id)
+        else:
+            session = self.session_manager.start_session()
+        self.context.set_context(ExecutionContext(session_id=session.id))
+        return session
@@ -1,16 +1,97 @@
 # src/runtime.py
 """Central class holding global system state, registries, and core components."""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 from src.config import Settings, settings
 from src.agents.registry import AgentRegistry, agent_registry
+from src.agents.factory import AgentFactory
 from src.session_manager import SessionManager, session_manager
+from src.llms.client import LLMClient, llm_client
+from src.artifacts import ArtifactManager, artifact_manager
+from src.task_cache import TaskResultCache, task_result_cache
+from src.models import TaskSpec, TaskOutcome
+from src.run_context import RunContext
+from src.orchestrator import Orchestrator
 import logging
 
+class RuntimeShutdownError(RuntimeError):
+    """Raised when a workflow is submitted to a runtime that has been shut down."""
+
 class SystemRuntime:
-    def __init__(self):
+    """
+    Hosts workflow runs in a long-lived process. Each run gets its own
+    `RunContext` (session, task queue, state machine, execution context);
+    the agent registry, LLM providers, artifact store and task result cache
+    are shared by every run. `session_manager` is the default, single-run
+    session used by the CLI.
+    """
+
+    def __init__(self, max_runs: Optional[int] = None):
         self.config: Settings = settings
         self.logger = logging.getLogger(__name__)
         self.agent_registry: AgentRegistry = agent_registry
         self.session_manager: SessionManager = session_manager
-        # Add other components as they are initialized
+        self.llm_client: LLMClient = llm_client
+        self.artifact_manager: ArtifactManager = artifact_manager
+        self.task_result_cache: TaskResultCache = task_result_cache
+        self.agent_factory = AgentFactory()
+        self.max_runs = max_runs or settings.MAX_CONCURRENT_RUNS
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._runs: Dict[str, RunContext] = {}
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def new_run(self) -> RunContext:
+        """Creates a run context backed by the shared session store."""
+        return RunContext()
+
+    def submit_workflow(self, tasks: List[TaskSpec], run_context: Optional[RunContext] = None,
+                        resume_session_id: Optional[str] = None, **orchestrator_options: Any) -> Future:
+        """
+        Runs a workflow in the background on its own run context. At most
+        `max_runs` workflows execute at once; further submissions wait their turn.
+        `orchestrator_options` are passed to `Orchestrator` (e.g. `failure_policy`).
+        Returns a future of the run's task outcomes. Pass a `run_context` from
+        `new_run()` to observe the run (its id, session and state) while it is active.
+        Raises RuntimeShutdownError once `shutdown()` has been called.
+        """
+        run = run_context or self.new_run()
+
+        def execute() -> Dict[str, TaskOutcome]:
+            try:
+                run.start_session(resume_session_id)
+                orchestrator = Orchestrator(self.agent_factory, run_context=run, **orchestrator_options)
+                return orchestrator.run_workflow(tasks)
+            finally:
+                with self._lock:
+                    self._runs.pop(run.run_id, None)
+
+        # Submitted under the lock so that shutdown() cannot close the pool in between
+        with self._lock:
+            if self._closed:
+                raise RuntimeShutdownError("The runtime has been shut down and accepts no more workflows.")
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_runs, thread_name_prefix="run")
+            self._runs[run.run_id] = run
+            return self._pool.submit(execute)
+
+    def get_run(self, run_id: str) -> Optional[RunContext]:
+        """Returns an active run's context, or None once it has finished."""
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def active_runs(self) -> List[str]:
+        """Returns the ids of runs that are queued or executing."""
+        with self._lock:
+            return list(self._runs)
+
+    def shutdown(self, wait: bool = True):
+        """Stops accepting runs; with `wait`, blocks until the active ones finish."""
+        with self._lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
 
 system_runtime = SystemRuntime()
@@ -0,0 +1,502 @@
+# src/scheduler.py
+"""Dispatches one workflow run's tasks to workers and applies their results to the run's graph."""
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Dict, List, Optional, Set, Tuple
+from src.workflow.state import FailurePolicy
+from src.models import TaskSpec, AgentResponse, TaskCheckpoint, TaskOutcome
+from src.artifacts import artifact_manager
+from src.artifact_bus import artifact_bus
+from src.task_cache import task_result_cache
+from src.cancellation import CancellationToken, TaskCancelled
+from src.executor import TaskExecutor
+from src.distributed.remote import RemoteExecutor
+from src.agents.registry import agent_registry
+from src.process_pool import PROCESS_EXECUTOR, process_pool
+from src.config import settings
+from src.task_dependencies import creates_cycle
+from src.workflow.compact_graph import CompactGraph, TaskCounters
+from src.workflow.conditions import evaluate_condition, validate_conditions
+from src.workflow.mapping import MapExpansion, iter_map_items, validate_map_spec
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_ARTIFACTS_KEY = "upstream_artifacts"
+COMPLETED_STATUS = "completed"
+SKIPPED_STATUS = "skipped"
+FAILED_STATUSES = ("failed", SKIPPED_STATUS, "cancelled")
+
+
+class TaskScheduler:
+    """
+    Runs queued tasks on worker threads, queueing dependents as their last
+    dependency completes. Results are processed on the calling thread, so
+    session, artifact and checkpoint bookkeeping stays single-threaded.
+
+    With a broker, tasks are published to it (with their upstream artifacts)
+    for remote workers to run. Otherwise, tasks of agents whose spec sets
+    `executor: process` run on the shared process pool. Every task runs under
+    a cancellation token bounded by its `timeout` and the workflow deadline.
+    A scheduler is built by `Orchestrator.run_workflow` for one run and takes
+    the orchestrator's settings (agent factory, run context, failure policy,
+    parallelism, deadline and broker).
+    """
+
+    def __init__(self, orchestrator, session_id: str, graph: CompactGraph, waiting: TaskCounters,
+                 fingerprints: Dict[str, str], outcomes: Dict[str, TaskOutcome]):
+        self.agent_factory = orchestrator.agent_factory
+        self.broker = orchestrator.broker
+        self.session_manager = orchestrator.session_manager
+        self.task_queue = orchestrator.task_queue
+        self.failure_policy = orchestrator.failure_policy
+        self.max_parallel = orchestrator.max_parallel
+        self.deadline_s = orchestrator.deadline_s
+        self.session_id = session_id
+        self.graph = graph
+        self.dependents = graph.dependents
+        self.waiting = waiting
+        self.fingerprints = fingerprints
+        self.outcomes = outcomes
+        self.attempts: Dict[str, int] = {}
+        self.expansions: Dict[str, MapExpansion] = {} # Map task id -> its expansion, while items remain
+        self.map_of: Dict[str, str] = {} # Unfinished item task id -> its map task id
+        self.running: Dict[Future, Tuple[TaskSpec, CancellationToken]] = {}
+        self.cached: Set[str] = set()
+        self.stopped = False
+        self.workflow_token: Optional[CancellationToken] = None # Bounded by the workflow deadline, set by `run`
+        self.executor = None
+
+    # Dispatch
+
+    def queue(self, task_id: str):
+        """Queues a task whose dependencies are met; its TaskSpec is built when it is dequeued."""
+        graph = self.graph
+        self.task_queue.add_deferred(task_id, lambda: graph[task_id])
+
+    def run(self) -> Optional[str]:
+        """
+        Dispatches queued tasks until none are left or the run is stopped.
+        Returns None, or why the run was cut short: "interrupted" (Ctrl-C) or
+        "deadline exceeded".
+        """
+        self.workflow_token = CancellationToken.with_timeout(self.deadline_s)
+        # With a broker, tasks go to remote workers (src/distributed/worker.py) instead of local threads
+        self.executor = RemoteExecutor(self.broker) if self.broker is not None else TaskExecutor(thread_name_prefix="task")
+        try:
+            while True:
+                if self.workflow_token.cancelled:
+                    logger.error(f"Workflow deadline of {self.deadline_s}s exceeded; cancelling in-flight tasks.")
+                    self._cancel_running("deadline exceeded")
+                    return "deadline exceeded"
+                self._dispatch_ready()
+                if not self.running:
+                    return None
+                self._wait_for_results()
+                if not self.workflow_token.cancelled: # Otherwise handled at the top of the loop
+                    self._time_out_overdue()
+        except KeyboardInterrupt:
+            self._interrupt()
+            return "interrupted"
+        finally:
+            self.executor.shutdown()
+            # Drain tasks left queued after a stop so they do not leak into the next run
+            task = self.task_queue.get_next_task()
+            while task is not None:
+                self.task_queue.update_task_status(task.id, SKIPPED_STATUS)
+                task = self.task_queue.get_next_task()
+
+    def _dispatch_ready(self):
+        """Starts queued tasks until `max_parallel` are running or the queue is empty."""
+        while not self.stopped and len(self.running) < self.max_parallel:
+            task = self.task_queue.get_next_task()
+            if not task:
+                return
+            self.attempts[task.id] = self.attempts.get(task.id, 0) + 1
+            if task.map is not None:
+                self._start_map(task)
+                continue
+            logger.info(f"Dispatching task: {task.name} (ID: {task.id}) to agent: {task.agent_name}")
+            self.session_manager.add_log_entry(f"Dispatching task: {task.name} to agent: {task.agent_name}")
+
+            timeout = task.timeout if task.timeout is not None else settings.TASK_TIMEOUT_S
+            token = CancellationToken.with_timeout(timeout, parent=self.workflow_token)
+            fingerprint = self.fingerprints.get(task.id)
+            response = task_result_cache.lookup(fingerprint) if fingerprint else None
+            if response is not None:
+                future: Future = Future()
+                future.set_result(response)
+                self.cached.add(task.id)
+            elif self.broker is not None:
+                future = self.executor.submit(self._with_upstream_artifacts(task), token=token)
+            elif self._runs_in_process(task):
+                future = process_pool.submit(self._with_upstream_artifacts(task))
+            else:
+                future = self.executor.submit(self._execute, task, token=token)
+            self.running[future] = (task, token)
+
+    def _wait_for_results(self):
+        """Waits for a running task to finish or overrun its timeout, and handles every finished one."""
+        deadlines = [token.remaining() for _, token in self.running.values()]
+        deadlines = [d for d in deadlines if d is not None]
+        done, _ = wait(self.running, timeout=min(deadlines) if deadlines else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            task, token = self.running.pop(future)
+            if token.cancelled and isinstance(future.exception(), TaskCancelled):
+                self._time_out(task, token) # The task noticed its cancellation before we did
+            else:
+                self._finish(task, future)
+
+    def _runs_in_process(self, task: TaskSpec) -> bool:
+        """Whether the task's agent is CPU-bound and runs on the process pool rather than a thread."""
+        spec = agent_registry.get_agent_spec(task.agent_name)
+        return spec is not None and spec.executor == PROCESS_EXECUTOR
+
+    def _with_upstream_artifacts(self, task: TaskSpec) -> TaskSpec:
+        """
+        Returns the task with its dependencies' artifacts injected into
+        `input_data["upstream_artifacts"]` as {dependency_id: {name: Artifact}}.
+        The original task is left untouched.
+        """
+        upstream = {}
+        for dep_id in task.dependencies:
+            artifacts = artifact_manager.get_task_artifacts(self.session_id, dep_id)
+            if artifacts:
+                upstream[dep_id] = artifacts
+        if not upstream:
+            return task
+        return task.model_copy(update={"input_data": {**task.input_data, UPSTREAM_ARTIFACTS_KEY: upstream}})
+
+    def _execute(self, task: TaskSpec) -> AgentResponse:
+        """Runs a task on its agent. Called on a worker thread."""
+        agent = self.agent_factory.create_agent(task.agent_name)
+        return agent.run(self._with_upstream_artifacts(task))
+
+    # Results
+
+    def _finish(self, task: TaskSpec, future: Optional[Future], error: Optional[str] = None):
+        """Applies a finished task's result (or `error`), retrying or failing it as the failure policy says."""
+        if error is None:
+            error = self._process_result(task, future)
+        if error is None:
+            if task.id in self.map_of:
+                self._finish_item(task, output=future.result().output)
+            else:
+                self._complete(task.id, "cached" if task.id in self.cached else future.result().status, future.result().output)
+            return
+
+        if not self.stopped and self.attempts[task.id] <= self._max_retries(task):
+            logger.warning(f"Retrying task {task.name} (ID: {task.id}), attempt {self.attempts[task.id] + 1}.")
+            self.session_manager.add_log_entry(f"Retrying task {task.name} (ID: {task.id}) after failure: {error}")
+            self.task_queue.add_task(task)
+            return
+
+        if task.id in self.map_of:
+            self._finish_item(task, error=error)
+        else:
+            self._fail(task.id, error)
+
+    def _process_result(self, task: TaskSpec, future: Future) -> Optional[str]:
+        """
+        Records a finished task's response and splices in the tasks it injected.
+        Returns an error message if the task failed or its tasks were rejected, else None.
+        """
+        try:
+            response: AgentResponse = future.result()
+        except Exception as e:
+            self.task_queue.update_task_status(task.id, "failed")
+            if task.id not in self.map_of:
+                self.session_manager.checkpoint_task(task.id, "failed", {"error_message": str(e)})
+            self.session_manager.add_log_entry(f"Task {task.name} (ID: {task.id}) failed due to exception: {e}")
+            logger.error(f"Task {task.name} (ID: {task.id}) failed unexpectedly: {e}", exc_info=e)
+            return str(e)
+
+        fingerprint = self.fingerprints.get(task.id)
+        if task.id in self.cached:
+            logger.info(f"Reusing cached result for task {task.name} (ID: {task.id}).")
+            self.session_manager.add_log_entry(f"Task {task.name} (ID: {task.id}) reused cached result {fingerprint}")
+        elif fingerprint and response.status == COMPLETED_STATUS:
+            task_result_cache.record(fingerprint, self.session_id, response)
+
+        self.task_queue.update_task_status(task.id, response.status)
+        self.session_manager.add_log_entry(f"Task {task.name} (ID: {task.id}) completed with status: {response.status}")
+
+        # Process agent response (artifacts, output etc.). Map items are checkpointed per chunk
+        # through their map task, and their artifacts are only stored: no task reads them by item id.
+        item = task.id in self.map_of
+        writes = []
+        if response.artifacts:
+            if not item:
+                artifact_bus.publish(self.session_id, task.id, response.artifacts)
+            for artifact in response.artifacts:
+                writes.append(self.session_manager.add_artifact(artifact))
+                logger.info(f"Agent {task.agent_name} produced artifact: {artifact.name}")
+
+        if response.status == "failed":
+            if not item:
+                self.session_manager.checkpoint_task(task.id, response.status, response.output, response.artifacts, writes)
+            error = response.output.get('error_message', 'No error message provided')
+            logger.error(f"Task {task.name} reported failure: {error}")
+            return error
+        if item:
+            return None
+        error = self._splice(task, response.new_tasks) if response.new_tasks else None
+        if error is not None:
+            self.task_queue.update_task_status(task.id, "failed")
+            self.session_manager.checkpoint_task(task.id, "failed", {"error_message": error})
+            return error
+        # The injected tasks are checkpointed with their producer so a resumed run can splice them in again
+        self.session_manager.checkpoint_task(task.id, response.status, response.output, response.artifacts, writes, response.new_tasks)
+        return None
+
+    # Conditions
+
+    def _complete(self, task_id: str, status: str, output: Optional[dict] = None):
+        """Records a task's outcome and queues each dependent whose last dependency this was and whose condition holds."""
+        self.outcomes[task_id] = TaskOutcome(task_id=task_id, status=status, attempts=self.attempts[task_id])
+        for dependent_id in self.dependents[task_id]:
+            if dependent_id in self.outcomes:
+                continue
+            condition = self.graph.condition(dependent_id, task_id)
+            if condition is not None:
+                try:
+                    met = evaluate_condition(condition, output or {})
+                except ValueError as e:
+                    self._fail(dependent_id, str(e))
+                    continue
+                if not met:
+                    self._skip_branch(dependent_id, f"Condition on {task_id} not met: {condition}")
+                    continue
+            self.waiting[dependent_id] -= 1
+            if self.waiting[dependent_id] == 0:
+                self.queue(dependent_id)
+
+    def _skip_branch(self, task_id: str, reason: str):
+        """Skips a task and its descendants, checkpointing the skip so a resumed run skips it too."""
+        logger.info(f"Skipping task {task_id}: {reason}")
+        self.session_manager.add_log_entry(f"Skipping task {task_id}: {reason}")
+        self.session_manager.checkpoint_task(task_id, SKIPPED_STATUS, {"reason": reason})
+        self.outcomes[task_id] = TaskOutcome(task_id=task_id, status=SKIPPED_STATUS, error=reason)
+        self._prune_descendants(task_id, reason="was skipped")
+
+    # Failure policy
+
+    def _fail(self, task_id: str, error: str):
+        """Records a failed task: `fail_fast` stops dispatching, the other policies skip its descendants."""
+        self.outcomes[task_id] = TaskOutcome(task_id=task_id, status="failed", attempts=self.attempts.get(task_id, 0), error=error)
+        if self.failure_policy == FailurePolicy.FAIL_FAST:
+            self.stopped = True # Let running tasks finish, but dispatch nothing new
+        else:
+            self._prune_descendants(task_id)
+
+    def _max_retries(self, task: TaskSpec) -> int:
+        """A task's own `retries`, raised to TASK_MAX_RETRIES under the retry_n policy."""
+        if self.failure_policy == FailurePolicy.RETRY_N:
+            return max(task.retries, settings.TASK_MAX_RETRIES)
+        return task.retries
+
+    def _prune_descendants(self, task_id: str, reason: str = "failed"):
+        """Marks every not-yet-finished descendant of a failed (or skipped) task as skipped."""
+        stack = list(self.dependents[task_id])
+        while stack:
+            dependent_id = stack.pop()
+            if dependent_id in self.outcomes:
+                continue
+            self.outcomes[dependent_id] = TaskOutcome(task_id=dependent_id, status=SKIPPED_STATUS, error=f"Upstream task {task_id} {reason}")
+            self.session_manager.add_log_entry(f"Skipping task {dependent_id}: upstream task {task_id} {reason}")
+            stack.extend(self.dependents[dependent_id])
+
+    # Task splicing
+
+    def _splice(self, producer: TaskSpec, new_tasks: List[TaskSpec]) -> Optional[str]:
+        """
+        Adds tasks injected by `producer` to the live graph, between it and its
+        pending dependents. Each new edge is checked for a cycle against the
+        part of the graph below it only. Returns an error if the tasks are
+        rejected, leaving the graph unchanged.
+        """
+        graph, dependents, outcomes = self.graph, self.dependents, self.outcomes
+        new_ids = [task.id for task in new_tasks]
+        try:
+            if len(set(new_ids)) != len(new_ids) or any(task_id in graph for task_id in new_ids):
+                raise ValueError(f"Injected task ids must be new and unique: {new_ids}")
+            for task in new_tasks:
+                unknown = [dep_id for dep_id in task.dependencies if dep_id not in graph and dep_id not in new_ids]
+                if unknown:
+                    raise ValueError(f"Injected task '{task.id}' depends on unknown task(s): {unknown}")
+                validate_conditions(task)
+        except ValueError as e:
+            return str(e)
+
+        downstream = [dependent_id for dependent_id in dependents[producer.id] if dependent_id not in outcomes]
+        edges = [(dep_id, task.id) for task in new_tasks for dep_id in task.dependencies if dep_id in new_ids or dep_id not in outcomes]
+        edges += [(task_id, dependent_id) for task_id in new_ids for dependent_id in downstream]
+        added = []
+        for dep_id, task_id in edges:
+            if creates_cycle(dependents, dep_id, task_id):
+                for added_dep, added_id in added:
+                    dependents.discard(added_dep, added_id)
+                return f"Injected task '{task_id}' would create a circular dependency on '{dep_id}'"
+            dependents.add(dep_id, task_id)
+            added.append((dep_id, task_id))
+
+        logger.info(f"Task {producer.name} (ID: {producer.id}) injected {len(new_tasks)} task(s): {', '.join(new_ids)}")
+        self.session_manager.add_log_entry(f"Task {producer.id} injected task(s): {', '.join(new_ids)}")
+        for dependent_id in downstream:
+            dependent = graph[dependent_id]
+            graph[dependent_id] = dependent.model_copy(update={"dependencies": dependent.dependencies + new_ids})
+            self.waiting[dependent_id] += len(new_ids)
+        for task in new_tasks:
+            graph[task.id] = task
+            self.waiting[task.id] = sum(1 for dep_id, task_id in edges if task_id == task.id)
+        for task in new_tasks:
+            failed_deps = [dep_id for dep_id in task.dependencies if dep_id in outcomes and outcomes[dep_id].status in FAILED_STATUSES]
+            if failed_deps:
+                self._skip_branch(task.id, f"Upstream task {failed_deps[0]} did not complete")
+            elif self.waiting[task.id] == 0:
+                self.task_queue.add_task(task)
+        return None
+
+    def restore_injected(self, checkpoints: Dict[str, TaskCheckpoint]) -> int:
+        """
+        Splices the tasks injected in an earlier run of the session back into
+        the graph, in the order their producers finished, so that a resumed run
+        waits for (or skips) them as the original run did. Only producers that
+        completed are considered. Returns the number of tasks restored.
+        """
+        graph, dependents = self.graph, self.dependents
+        restored = 0
+        for checkpoint in checkpoints.values():
+            if checkpoint.status != COMPLETED_STATUS or checkpoint.task_id not in graph:
+                continue
+            new_tasks = [task for task in checkpoint.new_tasks if task.id not in graph]
+            new_ids = [task.id for task in new_tasks]
+            if not new_ids:
+                continue
+            downstream = dependents[checkpoint.task_id]
+            for dependent_id in downstream:
+                dependent = graph[dependent_id]
+                graph[dependent_id] = dependent.model_copy(update={"dependencies": dependent.dependencies + new_ids})
+            for task in new_tasks:
+                graph[task.id] = task
+                for dep_id in task.dependencies:
+                    dependents.add(dep_id, task.id)
+                for dependent_id in downstream:
+                    dependents.add(task.id, dependent_id)
+            restored += len(new_tasks)
+        return restored
+
+    # Map expansion
+
+    def _start_map(self, task: TaskSpec):
+        """Validates a map task and queues the first chunk of its items."""
+        self.fingerprints.pop(task.id, None) # The collection may change between runs, so neither items nor reduce are memoized
+        try:
+            validate_map_spec(task)
+        except ValueError as e:
+            self._fail_map(task.id, str(e))
+            return
+        self.session_manager.add_log_entry(f"Expanding map task {task.name} (ID: {task.id})")
+        items = iter_map_items(task.map, lambda dep_id: artifact_manager.get_task_artifacts(self.session_id, dep_id))
+        self.expansions[task.id] = MapExpansion(task, items)
+        self._advance_map(task.id)
+
+    def _advance_map(self, map_id: str):
+        """Queues the map task's next items, then its reduce task (or completes it) once every item is done."""
+        expansion = self.expansions[map_id]
+        if self.stopped:
+            return
+        try:
+            items = expansion.expand()
+        except Exception as e:
+            self._fail_map(map_id, f"Could not read map items: {e}")
+            return
+        for item in items:
+            self.map_of[item.id] = map_id
+            self.task_queue.add_task(item)
+        if not expansion.done:
+            return
+        del self.expansions[map_id]
+        error = expansion.error()
+        reduce = expansion.reduce_task() if error is None else None
+        if error is not None:
+            self._fail_map(map_id, error)
+        elif reduce is not None:
+            self.attempts[map_id] = 0 # The reduce task carries the map task's id and gets its own attempts
+            self.task_queue.add_task(reduce)
+        else:
+            logger.info(f"Map task {expansion.task.name} (ID: {map_id}) completed {expansion.summary()['items']} item(s).")
+            self.task_queue.update_task_status(map_id, COMPLETED_STATUS)
+            self.session_manager.checkpoint_task(map_id, COMPLETED_STATUS, expansion.summary())
+            self._complete(map_id, COMPLETED_STATUS, expansion.summary())
+
+    def _fail_map(self, map_id: str, error: str):
+        self.expansions.pop(map_id, None) # Items still running are ignored when they finish
+        logger.error(f"Map task {map_id} failed: {error}")
+        self.task_queue.update_task_status(map_id, "failed")
+        self.session_manager.checkpoint_task(map_id, "failed", {"error_message": error})
+        self._fail(map_id, error)
+
+    def _finish_item(self, task: TaskSpec, output: Optional[dict] = None, error: Optional[str] = None):
+        """Records a map item's result and moves its map task along."""
+        map_id = self.map_of.pop(task.id)
+        self.attempts.pop(task.id, None)
+        expansion = self.expansions.get(map_id)
+        if expansion is None:
+            return
+        expansion.record(task.id, output, error)
+        if error is not None and self.failure_policy == FailurePolicy.FAIL_FAST:
+            self._fail_map(map_id, expansion.error())
+            return
+        if expansion.chunk_finished and not expansion.done:
+            self.session_manager.checkpoint_task(map_id, "in_progress", expansion.progress())
+        self._advance_map(map_id)
+
+    # Cancellation
+
+    def _time_out_overdue(self):
+        """Cancels running tasks whose token has expired, releasing their worker slots at once."""
+        for future, (task, token) in list(self.running.items()):
+            if token.cancelled:
+                del self.running[future]
+                self._time_out(task, token)
+
+    def _time_out(self, task: TaskSpec, token: CancellationToken):
+        """Cancels a task that overran its timeout and fails it, or cancels it if the workflow deadline passed."""
+        token.cancel("timed out")
+        if self.workflow_token.cancelled:
+            self._cancel(task, "deadline exceeded")
+            return
+        error = f"timed out after {task.timeout if task.timeout is not None else settings.TASK_TIMEOUT_S}s"
+        logger.error(f"Task {task.name} (ID: {task.id}) {error}; cancelling it.")
+        self.task_queue.update_task_status(task.id, "failed")
+        if task.id not in self.map_of:
+            self.session_manager.checkpoint_task(task.id, "failed", {"error_message": error})
+        self.session_manager.add_log_entry(f"Task {task.name} (ID: {task.id}) failed: {error}")
+        self._finish(task, None, error)
+
+    def _interrupt(self):
+        """Handles Ctrl-C: stops dispatching, drains in-flight tasks for CANCEL_GRACE_S, then cancels the rest."""
+        self.stopped = True
+        logger.warning(f"Interrupted; draining {len(self.running)} in-flight task(s) for up to {settings.CANCEL_GRACE_S}s (Ctrl-C again to cancel them).")
+        try:
+            done, _ = wait(self.running, timeout=settings.CANCEL_GRACE_S)
+            for future in done:
+                task, _ = self.running.pop(future)
+                self._finish(task, future)
+        except KeyboardInterrupt:
+            pass
+        self._cancel_running("interrupted")
+
+    def _cancel_running(self, reason: str):
+        for task, token in self.running.values():
+            token.cancel(reason)
+            self._cancel(task, reason)
+        self.running.clear()
+
+    def _cancel(self, task: TaskSpec, reason: str):
+        self.task_queue.update_task_status(task.id, "cancelled")
+        task_id = self.map_of.pop(task.id, task.id) # A cancelled item cancels its map task
+        self.session_manager.checkpoint_task(task_id, "cancelled", {"error_message": reason})
+        self.expansions.pop(task_id, None)
+        if task_id not in self.outcomes:
+            self.outcomes[task_id] = TaskOutcome(task_id=task_id, status="cancelled", attempts=self.attempts[task_id], error=reason)
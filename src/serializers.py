@@ -0,0 +1,178 @@
+# src/serializers.py
+"""Serializers that turn artifact data into bytes and back, chosen by `Artifact.type`."""
+import io
+import json
+import math
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple, Union
+import logging
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class ArtifactSerializer(ABC):
+    name: str = ""
+    types: List[str] = []
+
+    @abstractmethod
+    def serialize(self, data: Any) -> bytes:
+        """Encodes artifact data as bytes."""
+        pass
+
+    @abstractmethod
+    def deserialize(self, buffer: Buffer) -> Any:
+        """Decodes bytes (or a memoryview over a mapped file) back into artifact data."""
+        pass
+
+
+class TextSerializer(ArtifactSerializer):
+    name = "text"
+    types = ["text"]
+
+    def serialize(self, data: Any) -> bytes:
+        return data.encode("utf-8") if isinstance(data, str) else str(data).encode("utf-8")
+
+    def deserialize(self, buffer: Buffer) -> str:
+        return str(buffer, "utf-8")
+
+
+class BytesSerializer(ArtifactSerializer):
+    """Raw bytes. Deserializing returns the buffer as-is, so mapped files stay zero-copy."""
+    name = "bytes"
+    types = ["bytes", "binary", "application/octet-stream"]
+
+    def serialize(self, data: Any) -> bytes:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return bytes(data)
+        return str(data).encode("utf-8")
+
+    def deserialize(self, buffer: Buffer) -> Buffer:
+        return buffer
+
+
+class JsonSerializer(ArtifactSerializer):
+    name = "json"
+    types = ["json", "application/json"]
+
+    def serialize(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def deserialize(self, buffer: Buffer) -> Any:
+        return json.loads(bytes(buffer) if isinstance(buffer, memoryview) else buffer)
+
+
+class MsgpackSerializer(ArtifactSerializer):
+    name = "msgpack"
+    types = ["msgpack", "application/msgpack", "application/x-msgpack"]
+
+    def serialize(self, data: Any) -> bytes:
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed. Install it with 'pip install msgpack'.")
+        return msgpack.packb(data, use_bin_type=True)
+
+    def deserialize(self, buffer: Buffer) -> Any:
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed. Install it with 'pip install msgpack'.")
+        return msgpack.unpackb(buffer, raw=False)
+
+
+class NpySerializer(ArtifactSerializer):
+    """
+    NumPy `.npy` format. Deserializing parses only the header and wraps the
+    remaining buffer with `np.frombuffer`, so arrays read from a mapped file
+    share its pages instead of being copied.
+    """
+    name = "npy"
+    types = ["npy", "numpy", "application/x-npy"]
+
+    def serialize(self, data: Any) -> bytes:
+        if np is None:
+            raise RuntimeError("numpy is not installed. Install it with 'pip install numpy'.")
+        stream = io.BytesIO()
+        np.save(stream, np.asarray(data), allow_pickle=False)
+        return stream.getvalue()
+
+    def deserialize(self, buffer: Buffer) -> Any:
+        if np is None:
+            raise RuntimeError("numpy is not installed. Install it with 'pip install numpy'.")
+        view = memoryview(buffer)
+        major = view[6]
+        if major == 1:
+            header_len, = struct.unpack("<H", view[8:10])
+            data_offset = 10 + header_len
+        else:
+            header_len, = struct.unpack("<I", view[8:12])
+            data_offset = 12 + header_len
+        header = io.BytesIO(bytes(view[:data_offset]))
+        version = np.lib.format.read_magic(header)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header)
+        if dtype.hasobject:
+            raise ValueError("Object arrays cannot be loaded without pickling.")
+        count = math.prod(shape)
+        array = np.frombuffer(view, dtype=dtype, count=count, offset=data_offset)
+        return array.reshape(shape, order="F" if fortran_order else "C")
+
+
+_text_serializer = TextSerializer()
+_bytes_serializer = BytesSerializer()
+_serializers: Dict[str, ArtifactSerializer] = {}
+
+
+def register_serializer(serializer: ArtifactSerializer):
+    """Registers a serializer for each artifact type it declares."""
+    for type_ in serializer.types:
+        _serializers[type_.lower()] = serializer
+
+
+def get_serializer(artifact_type: str) -> ArtifactSerializer:
+    """
+    Returns the serializer for an artifact type. `text/*` types are text;
+    any other unregistered type is treated as opaque bytes.
+    """
+    type_ = artifact_type.lower()
+    serializer = _serializers.get(type_)
+    if serializer is not None:
+        return serializer
+    if type_.startswith("text/"):
+        return _text_serializer
+    return _bytes_serializer
+
+
+def serialize(artifact_type: str, data: Any) -> Tuple[bytes, Optional[str]]:
+    """
+    Encodes artifact data with its type's serializer, except that an
+    unregistered type holding anything but bytes-like data is encoded as text,
+    so it reads back as `str`. Returns the bytes and, when they must be read
+    with another serializer than `get_serializer(artifact_type)`, that
+    serializer's name, which callers store with the artifact.
+    """
+    serializer = get_serializer(artifact_type)
+    if serializer is _bytes_serializer and artifact_type.lower() not in _serializers \
+            and not isinstance(data, (bytes, bytearray, memoryview)):
+        return _text_serializer.serialize(data), _text_serializer.name
+    return serializer.serialize(data), None
+
+
+def deserialize(artifact_type: str, buffer: Buffer, serializer: Optional[str] = None) -> Any:
+    """Decodes what `serialize` returned, given the serializer name it reported (if any)."""
+    return get_serializer(serializer or artifact_type).deserialize(buffer)
+
+
+for _serializer in (_text_serializer, _bytes_serializer, JsonSerializer(), MsgpackSerializer(), NpySerializer()):
+    register_serializer(_serializer)
@@ -0,0 +1,255 @@
+# src/server.py
+"""Long-running worker daemon: a local HTTP (TCP or Unix-socket) API for submitting workflows to a warm runtime."""
+import datetime
+import json
+import os
+import socketserver
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from src.config import settings
+from pydantic import ValidationError
+from src.models import Job, JobOptions, TaskSpec
+from src.paths import get_root_dir
+from src.run_context import RunContext
+from src.runtime import RuntimeShutdownError, SystemRuntime, system_runtime
+from src.workflow_loader import workflow_loader
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Submission options -> Orchestrator / SystemRuntime.submit_workflow keyword
+JOB_OPTIONS = {
+    "failure_policy": "failure_policy",
+    "max_parallel": "max_parallel",
+    "timeout": "deadline_s",
+    "incremental": "use_cache",
+    "resume": "resume_session_id",
+}
+
+
+class JobManager:
+    """
+    Queues submitted workflows on a `SystemRuntime` and tracks them as `Job`s.
+    Runs execute concurrently up to the runtime's `max_runs`; the rest wait in
+    its queue. Finished jobs are kept for status queries, up to
+    SERVE_MAX_FINISHED_JOBS, after which the oldest are forgotten.
+    """
+
+    def __init__(self, runtime: Optional[SystemRuntime] = None):
+        self.runtime = runtime or system_runtime
+        self._jobs: "OrderedDict[str, Tuple[Job, RunContext, Future]]" = OrderedDict()
+        self._finished: List[str] = []
+        self._lock = threading.Lock()
+
+    def submit(self, request: Dict[str, Any]) -> Job:
+        """
+        Submits a workflow. `request` holds either `workflow` (a workflow file
+        path, relative to SERVE_WORKFLOWS_DIR) or `tasks` (inline task
+        definitions), and optionally `options` (see `JobOptions`). Raises
+        ValueError or FileNotFoundError for an invalid submission, and
+        RuntimeShutdownError once the runtime has been shut down.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Request body must be a JSON object.")
+        try:
+            options = JobOptions.model_validate(request.get("options") or {})
+        except ValidationError as e:
+            raise ValueError(f"Invalid job options: {e}") from e
+        tasks = self._load_tasks(request)
+        kwargs = {JOB_OPTIONS[key]: value for key, value in options.model_dump(exclude_none=True).items()}
+
+        run = self.runtime.new_run()
+        job = Job(id=run.run_id, status="queued", submitted_at=datetime.datetime.now().isoformat())
+        with self._lock:
+            future = self.runtime.submit_workflow(tasks, run_context=run, **kwargs)
+            self._jobs[job.id] = (job, run, future)
+        future.add_done_callback(lambda f: self._on_finished(job.id, f))
+        logger.info(f"Queued job {job.id} with {len(tasks)} task(s).")
+        return job
+
+    def _load_tasks(self, request: Dict[str, Any]) -> List[TaskSpec]:
+        if "tasks" in request:
+            return workflow_loader.load_workflow({"tasks": request["tasks"]})
+        if isinstance(request.get("workflow"), str):
+            return workflow_loader.load_workflow_from_file(self._workflow_path(request["workflow"]))
+        raise ValueError("Request must include 'workflow' (a file path) or 'tasks'.")
+
+    @staticmethod
+    def _workflow_path(workflow: str) -> str:
+        """
+        Resolves a submitted workflow path under SERVE_WORKFLOWS_DIR. Raises
+        ValueError for absolute paths, `..` components, and paths (e.g. through
+        symlinks) that resolve outside the directory.
+        """
+        if os.path.isabs(workflow) or ".." in workflow.replace("\\", "/").split("/"):
+            raise ValueError("'workflow' must be a path relative to the workflows directory, without '..'.")
+        workflows_dir = os.path.realpath(os.path.join(get_root_dir(), settings.SERVE_WORKFLOWS_DIR))
+        path = os.path.realpath(os.path.join(workflows_dir, workflow))
+        if os.path.commonpath([workflows_dir, path]) != workflows_dir:
+            raise ValueError("'workflow' must lie inside the workflows directory.")
+        return path
+
+    def _on_finished(self, job_id: str, future: Future):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return
+            job, run, _ = entry
+            job.finished_at = datetime.datetime.now().isoformat()
+            job.session_id = self._session_id(run)
+            try:
+                job.outcomes = future.result()
+                job.status = run.state_machine.get_state().value.lower()
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}", exc_info=e)
+                job.status = "failed"
+                job.error = str(e)
+            self._finished.append(job_id)
+            while len(self._finished) > settings.SERVE_MAX_FINISHED_JOBS:
+                self._jobs.pop(self._finished.pop(0), None)
+        logger.info(f"Job {job_id} finished with status {job.status}.")
+
+    @staticmethod
+    def _session_id(run: RunContext) -> Optional[str]:
+        session_id = run.context.get_context().session_id
+        return None if session_id == "default" else session_id
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Returns a snapshot of a job, or None if it is unknown or was forgotten."""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            job, run, future = entry
+            if job.finished_at is None:
+                job.status = "running" if future.running() else "queued"
+                job.session_id = self._session_id(run)
+            return job.model_copy(deep=True)
+
+    def list_jobs(self) -> List[Job]:
+        """Returns snapshots of all known jobs, oldest first, without their task outcomes."""
+        with self._lock:
+            job_ids = list(self._jobs)
+        jobs = [self.get_job(job_id) for job_id in job_ids]
+        return [job.model_copy(update={"outcomes": {}}) for job in jobs if job is not None]
+
+    def shutdown(self, wait: bool = True):
+        """Stops accepting jobs; with `wait`, blocks until queued and running jobs finish."""
+        self.runtime.shutdown(wait=wait)
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+        POST /jobs         submit a workflow (see `JobManager.submit`) -> 202 + job
+        GET  /jobs         list jobs
+        GET  /jobs/<id>    a job's status and, once finished, its task outcomes
+        GET  /health       liveness and the number of active runs
+    """
+    server_version = "AgentFramework"
+
+    @property
+    def job_manager(self) -> JobManager:
+        return self.server.job_manager # type: ignore[attr-defined]
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok", "active_runs": len(self.job_manager.runtime.active_runs())})
+        elif path == "/jobs":
+            self._send_json(HTTPStatus.OK, {"jobs": [job.model_dump() for job in self.job_manager.list_jobs()]})
+        elif path.startswith("/jobs/"):
+            job = self.job_manager.get_job(path[len("/jobs/"):])
+            if job is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Job not found"})
+            else:
+                self._send_json(HTTPStatus.OK, job.model_dump())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for {self.path}"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > settings.SERVE_MAX_REQUEST_BYTES:
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Missing or oversized request body"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+            job = self.job_manager.submit(request)
+        except (ValueError, FileNotFoundError) as e: # json.JSONDecodeError is a ValueError
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except RuntimeShutdownError as e:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+            return
+        self._send_json(HTTPStatus.ACCEPTED, job.model_dump())
+
+    def _send_json(self, status: HTTPStatus, body: Dict[str, Any]):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def create_server(job_manager: JobManager, host: Optional[str] = None, port: Optional[int] = None,
+                  socket_path: Optional[str] = None) -> socketserver.BaseServer:
+    """
+    Creates (but does not start) the job API server, listening on a Unix socket
+    if `socket_path` is given, else on host:port (default SERVE_HOST:SERVE_PORT).
+    """
+    server: socketserver.BaseServer
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path) # A stale socket from a previous daemon
+        server = _ThreadingUnixHTTPServer(socket_path, _JobRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host or settings.SERVE_HOST, settings.SERVE_PORT if port is None else port), _JobRequestHandler)
+        server.daemon_threads = True
+    server.job_manager = job_manager # type: ignore[attr-defined]
+    return server
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, socket_path: Optional[str] = None,
+          concurrency: Optional[int] = None):
+    """Runs the job API until interrupted, then lets queued and running jobs finish."""
+    runtime = SystemRuntime(max_runs=concurrency) if concurrency else system_runtime
+    job_manager = JobManager(runtime)
+    server = create_server(job_manager, host, port, socket_path)
+    where = socket_path or "http://{}:{}".format(*server.server_address[:2])
+    logger.info(f"Serving workflow jobs on {where} with up to {runtime.max_runs} concurrent run(s).")
+    print(f"Serving workflow jobs on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down; waiting for queued and running jobs to finish.")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        job_manager.shutdown(wait=True)
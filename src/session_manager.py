@@ -1,51 +1,254 @@
 # src/session_manager.py
 """Manages individual session runs, persisting logs and artifacts."""
 import uuid
+from collections import deque
 import datetime
-from typing import List
-from src.models import Session, Artifact
-from src.workflow.state import workflow_state_machine, WorkflowState
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from src.models import Session, Artifact, ArtifactRef, TaskCheckpoint, TaskSpec
+from src.workflow.state import WorkflowStateMachine, workflow_state_machine, WorkflowState
 from src.artifacts import artifact_manager
+from src.session_store import SessionStore, get_session_store
+from src.config import settings
 import logging
 
 class SessionManager:
-    def __init__(self):
+    def __init__(self, store: Optional[SessionStore] = None, state_machine: Optional[WorkflowStateMachine] = None):
         self._current_session: Session = None # type: ignore
+        self.state_machine = state_machine or workflow_state_machine
         self.logger = logging.getLogger(__name__)
+        self._store = store
+        self._saved = False # Whether the current session has been written to the store
+        self._pending_logs: List[Tuple[str, str]] = [] # (created_at, entry)
+        self._pending_artifacts: List[Tuple[str, str, str]] = [] # (name, type, data_path)
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock() # Guards the pending buffers against background artifact writes
+
+    def _get_store(self) -> Optional[SessionStore]:
+        """Returns the session store, or None if persistence is disabled."""
+        if self._store is not None:
+            return self._store
+        return get_session_store() if settings.SESSION_PERSISTENCE_ENABLED else None
 
     def start_session(self) -> Session:
-        """Starts a new session."""
+        """
+        Starts a new session. It is saved to the store once a workflow runs on
+        it (see `save_session`) or something is written to it, so commands that
+        never run a workflow leave no session behind.
+        """
         session_id = str(uuid.uuid4())
         self._current_session = Session(
             id=session_id,
             start_time=datetime.datetime.now().isoformat(),
             status=WorkflowState.INIT.value,
-            logs=[],
+            logs=deque(maxlen=settings.SESSION_LOG_BUFFER_SIZE),
             artifacts=[]
         )
-        workflow_state_machine.set_session(self._current_session)
+        self.state_machine.set_session(self._current_session)
+        self._saved = False
         self.logger.info(f"Session {session_id} started.")
         return self._current_session
 
+    def resume_session(self, session_id: str) -> Session:
+        """
+        Reopens a persisted session, replacing the current one, so a workflow can
+        continue where it stopped. Its task checkpoints are available through
+        `get_checkpoints`.
+        Raises ValueError if the session is unknown or persistence is disabled.
+        """
+        store = self._get_store()
+        if store is None:
+            raise ValueError("Cannot resume a session: session persistence is disabled.")
+        row = store.get_session(session_id)
+        if row is None:
+            raise ValueError(f"Session not found: {session_id}")
+        self._current_session = Session(
+            id=session_id,
+            start_time=row["start_time"],
+            status=WorkflowState.INIT.value,
+            logs=deque(maxlen=settings.SESSION_LOG_BUFFER_SIZE),
+            artifacts=[]
+        )
+        self.state_machine.set_session(self._current_session)
+        self._persist_session()
+        self.logger.info(f"Session {session_id} resumed (previous status: {row['status']}).")
+        return self._current_session
+
+    def save_session(self):
+        """Writes the current session, e.g. when a workflow starts on it."""
+        if self._current_session:
+            self._persist_session()
+
     def end_session(self, status: WorkflowState = WorkflowState.COMPLETED):
         """Ends the current session."""
         if self._current_session:
             self._current_session.end_time = datetime.datetime.now().isoformat()
-            workflow_state_machine.transition_to(status)
+            self.state_machine.transition_to(status)
             self.logger.info(f"Session {self._current_session.id} ended with status: {status.value}")
-            # Persist session details (e.g., to DB or file)
+            self.flush()
+            self._persist_session()
             self._current_session = None
 
     def add_log_entry(self, entry: str):
-        """Adds a log entry to the current session."""
+        """
+        Adds a log entry to the current session.
+        Only the last SESSION_LOG_BUFFER_SIZE entries stay in `Session.logs`;
+        every entry is written behind to the session store.
+        """
         if self._current_session:
-            self._current_session.logs.append(entry)
+            self._current_session.logs.append(entry) # A bounded deque: the oldest entry drops out in O(1)
+            self._pending_logs.append((datetime.datetime.now().isoformat(), entry))
+            self._maybe_flush()
 
-    def add_artifact(self, artifact: Artifact):
-        """Adds an artifact to the current session and stores it."""
+    def add_artifact(self, artifact: Artifact) -> Optional[Future]:
+        """
+        Records an artifact in the current session and stores it in the background.
+        Only the artifact's metadata is kept on the session, not its payload; its
+        `data_path` is filled in once the write completes (see `flush`).
+        Returns the future of the background write.
+        """
         if self._current_session:
-            self._current_session.artifacts.append(artifact)
-            artifact_manager.store_artifact(artifact, self._current_session.id)
+            ref = ArtifactRef(name=artifact.name, type=artifact.type)
+            self._current_session.artifacts.append(ref)
+            future = artifact_manager.store_artifact_async(artifact, self._current_session.id)
+            future.add_done_callback(lambda f: self._on_artifact_stored(ref, f))
+            self._maybe_flush()
+            return future
+        return None
+
+    def checkpoint_task(self, task_id: str, status: str, output: Optional[Dict[str, Any]] = None,
+                        artifacts: Sequence[Artifact] = (), writes: Sequence[Future] = (),
+                        new_tasks: Sequence[TaskSpec] = ()):
+        """
+        Durably records a task's outcome: its status, a hash of its output, refs
+        to its artifacts and the tasks it injected into the workflow (`new_tasks`),
+        which a resumed run splices in again. `writes` are the futures returned by `add_artifact`
+        for those artifacts; the checkpoint is written only once all of them
+        have succeeded, so a resumed run never skips a task whose artifacts
+        did not reach the store.
+        """
+        store = self._get_store()
+        if not self._current_session or store is None:
+            return
+        self._ensure_saved()
+        session_id = self._current_session.id
+        output_hash = hashlib.sha256(json.dumps(output or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+        def write_checkpoint():
+            refs: List[ArtifactRef] = []
+            for artifact, write in zip(artifacts, writes):
+                if write.exception() is not None:
+                    self.logger.error(f"Not checkpointing task {task_id}: artifact {artifact.name} was not stored.")
+                    return
+                refs.append(ArtifactRef(name=artifact.name, type=artifact.type, data_path=write.result()))
+            try:
+                store.save_checkpoint(session_id, TaskCheckpoint(
+                    task_id=task_id, status=status, output_hash=output_hash, artifacts=refs, new_tasks=list(new_tasks)
+                ))
+            except sqlite3.Error as e:
+                self.logger.error(f"Failed to checkpoint task {task_id} of session {session_id}: {e}")
+
+        remaining = [len(writes)]
+        remaining_lock = threading.Lock()
+
+        def on_write_done(_):
+            with remaining_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                write_checkpoint()
+
+        if not writes:
+            write_checkpoint()
+        for write in writes:
+            write.add_done_callback(on_write_done)
+
+    def get_checkpoints(self, session_id: Optional[str] = None) -> Dict[str, TaskCheckpoint]:
+        """Returns the task checkpoints of a session (the current one by default), keyed by task id."""
+        store = self._get_store()
+        if session_id is None and self._current_session:
+            session_id = self._current_session.id
+        if session_id is None or store is None:
+            return {}
+        try:
+            return store.get_checkpoints(session_id)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to load checkpoints for session {session_id}: {e}")
+            return {}
+
+    def _on_artifact_stored(self, ref: ArtifactRef, future):
+        """Completion callback of a background artifact write."""
+        try:
+            ref.data_path = future.result()
+        except Exception as e:
+            self.logger.error(f"Failed to store artifact {ref.name}: {e}")
+            return
+        with self._lock:
+            self._pending_artifacts.append((ref.name, ref.type, ref.data_path))
+
+    def _maybe_flush(self):
+        """Flushes once a batch is full or the flush interval has elapsed."""
+        if (len(self._pending_logs) >= settings.SESSION_LOG_FLUSH_BATCH
+                or len(self._pending_artifacts) >= settings.SESSION_LOG_FLUSH_BATCH
+                or time.monotonic() - self._last_flush >= settings.SESSION_LOG_FLUSH_INTERVAL_S):
+            self.flush(wait_for_artifacts=False)
+
+    def flush(self, wait_for_artifacts: bool = True):
+        """
+        Writes buffered log entries and artifact metadata to the session store in
+        one batch each. By default it first waits for the session's background
+        artifact writes, so every stored artifact's metadata is included.
+        """
+        self._last_flush = time.monotonic()
+        if self._current_session and wait_for_artifacts:
+            artifact_manager.wait_for_writes(self._current_session.id)
+        store = self._get_store()
+        with self._lock:
+            logs, self._pending_logs = self._pending_logs, []
+            artifacts, self._pending_artifacts = self._pending_artifacts, []
+        if not self._current_session or store is None or not (logs or artifacts):
+            return
+        self._ensure_saved()
+        try:
+            store.append_logs(self._current_session.id, logs)
+            store.add_artifacts(self._current_session.id, artifacts)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to persist logs/artifacts for session {self._current_session.id}: {e}")
+
+    def get_logs(self, session_id: Optional[str] = None) -> List[str]:
+        """
+        Returns the full log history of a session (the current one by default),
+        reading flushed entries from the session store.
+        """
+        if self._current_session and session_id in (None, self._current_session.id):
+            self.flush()
+            session_id = self._current_session.id
+            if self._get_store() is None:
+                return list(self._current_session.logs)
+        store = self._get_store()
+        if session_id is None or store is None:
+            return []
+        return store.get_logs(session_id)
+
+    def _ensure_saved(self):
+        """Writes the current session before rows that reference it."""
+        if not self._saved:
+            self._persist_session()
+
+    def _persist_session(self):
+        store = self._get_store()
+        if store is None:
+            return
+        try:
+            store.upsert_session(self._current_session)
+            self._saved = True
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to persist session {self._current_session.id}: {e}")
 
     def get_current_session(self) -> Session:
         """Returns the current session object."""
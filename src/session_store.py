@@ -0,0 +1,194 @@
+# src/session_store.py
+"""SQLite-backed persistence for sessions, log entries and artifact metadata (see database/schema.sql)."""
+import os
+import sqlite3
+import threading
+import uuid
+import datetime
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.models import Session, ArtifactRef, TaskCheckpoint, TaskSpec
+from src.file_io import read_file
+from src.paths import get_root_dir
+from src.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = os.path.join("database", "schema.sql")
+
+# Statements are kept as module constants so sqlite3's statement cache
+# reuses the prepared form across calls.
+_UPSERT_SESSION_SQL = (
+    "INSERT INTO sessions (id, start_time, end_time, status) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET end_time = excluded.end_time, status = excluded.status"
+)
+_INSERT_LOG_SQL = "INSERT INTO session_logs (session_id, created_at, entry) VALUES (?, ?, ?)"
+_INSERT_ARTIFACT_SQL = (
+    "INSERT INTO artifacts (id, session_id, name, type, data_path, created_at) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_UPSERT_CHECKPOINT_SQL = (
+    "INSERT INTO task_checkpoints (session_id, task_id, status, output_hash, artifacts, new_tasks, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(session_id, task_id) DO UPDATE SET status = excluded.status, output_hash = excluded.output_hash, "
+    "artifacts = excluded.artifacts, new_tasks = excluded.new_tasks, updated_at = excluded.updated_at"
+)
+_UPSERT_TASK_RESULT_SQL = (
+    "INSERT OR REPLACE INTO task_results (fingerprint, session_id, status, output, artifacts, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+class SessionStore:
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(get_root_dir(), settings.SESSION_DB_PATH)
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        self._conn.row_factory = sqlite3.Row
+        self._configure()
+        self._apply_schema()
+
+    def _configure(self):
+        """Enables WAL so readers never block the writer, and relaxes fsync to once per checkpoint."""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+
+    def _apply_schema(self):
+        """Creates tables and indexes from database/schema.sql."""
+        schema_path = os.path.join(get_root_dir(), SCHEMA_PATH)
+        schema = read_file(schema_path)
+        if schema is None:
+            raise FileNotFoundError(f"Database schema not found or unreadable: {schema_path}")
+        with self._lock:
+            self._conn.executescript(schema)
+            # Databases created before checkpoints recorded injected tasks lack the column
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(task_checkpoints)")}
+            if "new_tasks" not in columns:
+                self._conn.execute("ALTER TABLE task_checkpoints ADD COLUMN new_tasks TEXT NOT NULL DEFAULT '[]'")
+
+    def upsert_session(self, session: Session):
+        """Inserts a session row, or updates its end time and status if it already exists."""
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT_SESSION_SQL, (session.id, session.start_time, session.end_time, session.status))
+
+    def append_logs(self, session_id: str, entries: Iterable[Tuple[str, str]]):
+        """Appends a batch of (created_at, entry) log rows in a single transaction."""
+        rows = [(session_id, created_at, entry) for created_at, entry in entries]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(_INSERT_LOG_SQL, rows)
+
+    def add_artifacts(self, session_id: str, records: Iterable[Tuple[str, str, str]]):
+        """Records a batch of (name, type, data_path) artifact metadata rows in a single transaction."""
+        now = datetime.datetime.now().isoformat()
+        rows = [(str(uuid.uuid4()), session_id, name, type_, data_path, now) for name, type_, data_path in records]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(_INSERT_ARTIFACT_SQL, rows)
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a stored session row as a dict, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, start_time, end_time, status FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_sessions(self, status: Optional[str] = None, since: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Lists stored sessions, newest first, optionally filtered by status and start time (ISO format)."""
+        query = "SELECT id, start_time, end_time, status FROM sessions"
+        clauses: List[str] = []
+        params: List[Any] = []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if since:
+            clauses.append("start_time >= ?")
+            params.append(since)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY start_time DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params).fetchall()]
+
+    def get_logs(self, session_id: str, limit: Optional[int] = None) -> List[str]:
+        """Returns the log entries of a session in insertion order."""
+        query = "SELECT entry FROM session_logs WHERE session_id = ? ORDER BY id"
+        params: List[Any] = [session_id]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row["entry"] for row in self._conn.execute(query, params).fetchall()]
+
+    def list_artifacts(self, session_id: str) -> List[Dict[str, Any]]:
+        """Returns artifact metadata rows recorded for a session."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, type, data_path, created_at FROM artifacts WHERE session_id = ? ORDER BY created_at",
+                (session_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def save_checkpoint(self, session_id: str, checkpoint: TaskCheckpoint):
+        """Records (or replaces) the latest outcome of a task in a session."""
+        artifacts = json.dumps([ref.model_dump() for ref in checkpoint.artifacts])
+        new_tasks = json.dumps([task.model_dump(mode="json") for task in checkpoint.new_tasks])
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT_CHECKPOINT_SQL, (
+                session_id, checkpoint.task_id, checkpoint.status, checkpoint.output_hash,
+                artifacts, new_tasks, datetime.datetime.now().isoformat(),
+            ))
+
+    def get_checkpoints(self, session_id: str) -> Dict[str, TaskCheckpoint]:
+        """Returns the task checkpoints of a session, keyed by task id, in the order they were last written."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, status, output_hash, artifacts, new_tasks FROM task_checkpoints "
+                "WHERE session_id = ? ORDER BY updated_at, rowid",
+                (session_id,),
+            ).fetchall()
+        return {
+            row["task_id"]: TaskCheckpoint(
+                task_id=row["task_id"],
+                status=row["status"],
+                output_hash=row["output_hash"],
+                artifacts=[ArtifactRef(**ref) for ref in json.loads(row["artifacts"])],
+                new_tasks=[TaskSpec.model_validate(task) for task in json.loads(row["new_tasks"])],
+            )
+            for row in rows
+        }
+
+    def save_task_result(self, fingerprint: str, session_id: str, status: str, output: str, artifacts: str):
+        """Memoizes a task result under its fingerprint. `output` and `artifacts` are JSON strings."""
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT_TASK_RESULT_SQL, (
+                fingerprint, session_id, status, output, artifacts, datetime.datetime.now().isoformat(),
+            ))
+
+    def get_task_result(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Returns the memoized task result row for a fingerprint, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, session_id, status, output, artifacts FROM task_results WHERE fingerprint = ?",
+                (fingerprint,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def close(self):
+        """Closes the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+@lru_cache(maxsize=None)
+def get_session_store() -> SessionStore:
+    """The process-wide store, opened (and the database created) on first use rather than on import."""
+    return SessionStore()
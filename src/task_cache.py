@@ -0,0 +1,116 @@
+# src/task_cache.py
+"""Build-system-style memoization of task results, keyed by a fingerprint of everything a task depends on."""
+import hashlib
+import json
+import sqlite3
+from typing import Dict, List, Optional
+from src.models import AgentResponse, Artifact, TaskSpec, construct_trusted
+from src.agents.registry import agent_registry
+from src.prompt_manager import prompt_manager
+from src.artifacts import artifact_manager
+from src.session_store import SessionStore, get_session_store
+from src.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROMPT_KEYS = ("prompt", "prompts") # input_data keys naming the prompt templates a task uses
+
+
+class TaskResultCache:
+    """
+    Memoizes completed task results in the session store. A task's fingerprint
+    covers its agent name and spec, its `input_data`, the versions of the
+    prompts it uses and the fingerprints of its dependencies, so changing one
+    task invalidates exactly that task and its downstream cone.
+
+    Prompts are attributed to a task when they are named by `input_data["prompt"]`
+    or `input_data["prompts"]`, or share the task's agent name.
+    """
+
+    def __init__(self, store: Optional[SessionStore] = None):
+        self._store = store
+
+    def _get_store(self) -> Optional[SessionStore]:
+        """Returns the backing store, or None if persistence is disabled."""
+        if self._store is not None:
+            return self._store
+        return get_session_store() if settings.SESSION_PERSISTENCE_ENABLED else None
+
+    def _prompt_versions(self, task: TaskSpec) -> Dict[str, Optional[str]]:
+        names = {task.agent_name}
+        for key in PROMPT_KEYS:
+            value = task.input_data.get(key)
+            if isinstance(value, str):
+                names.add(value)
+            elif isinstance(value, list):
+                names.update(v for v in value if isinstance(v, str))
+        return {name: prompt_manager.get_version(name) for name in sorted(names)}
+
+    def fingerprint(self, task: TaskSpec, upstream: Dict[str, str]) -> str:
+        """Fingerprints a task given the fingerprints of its dependencies (task_id -> fingerprint)."""
+        spec = agent_registry.get_agent_spec(task.agent_name)
+        payload = {
+            "agent_name": task.agent_name,
+            "agent_spec": spec.model_dump() if spec else None,
+            "input_data": task.input_data,
+            "prompts": self._prompt_versions(task),
+            "upstream": [upstream.get(dep_id) for dep_id in task.dependencies],
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def fingerprints(self, sorted_tasks: List[TaskSpec]) -> Dict[str, str]:
+        """Fingerprints every task of a topologically sorted workflow."""
+        result: Dict[str, str] = {}
+        for task in sorted_tasks:
+            result[task.id] = self.fingerprint(task, result)
+        return result
+
+    def lookup(self, fingerprint: str) -> Optional[AgentResponse]:
+        """
+        Returns the memoized response for a fingerprint, with its artifacts read
+        back from the artifact store, or None on a miss (including when any of
+        the artifacts is no longer stored).
+        """
+        store = self._get_store()
+        if store is None:
+            return None
+        try:
+            row = store.get_task_result(fingerprint)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to look up task result {fingerprint}: {e}")
+            return None
+        if row is None:
+            return None
+        artifact_manager.wait_for_writes(row["session_id"])
+        artifacts: List[Artifact] = []
+        for ref in json.loads(row["artifacts"]):
+            artifact = artifact_manager.retrieve_artifact(ref["name"], row["session_id"])
+            if artifact is None:
+                logger.info(f"Cached result {fingerprint} is missing artifact {ref['name']}; treating as a miss.")
+                return None
+            artifacts.append(artifact)
+        # Recorded responses were validated when the agent returned them
+        return construct_trusted(AgentResponse, status=row["status"], output=json.loads(row["output"]), artifacts=artifacts)
+
+    def record(self, fingerprint: str, session_id: str, response: AgentResponse):
+        """Memoizes a response; its artifacts must be stored under `session_id`."""
+        store = self._get_store()
+        if store is None:
+            return
+        if response.new_tasks:
+            logger.debug(f"Not caching result {fingerprint}: it injects tasks, which a cache hit would not re-create.")
+            return
+        try:
+            output = json.dumps(response.output)
+        except TypeError as e:
+            logger.debug(f"Not caching result {fingerprint}: output is not JSON-serializable ({e}).")
+            return
+        artifacts = json.dumps([{"name": a.name, "type": a.type} for a in response.artifacts])
+        try:
+            store.save_task_result(fingerprint, session_id, response.status, output, artifacts)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to record task result {fingerprint}: {e}")
+
+task_result_cache = TaskResultCache()
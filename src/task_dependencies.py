@@ -1,7 +1,8 @@
 # src/task_dependencies.py
 """Manages task dependencies, including topological sorting and cycle detection."""
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict
 from src.models import TaskSpec
+from src.workflow.compact_graph import CompactGraph
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,71 +12,32 @@ def topological_sort(tasks: List[TaskSpec]) -> List[TaskSpec]:
     Performs a topological sort on a list of tasks.
     Raises ValueError if a cycle is detected.
     """
-    adj: Dict[str, List[str]] = {task.id: [] for task in tasks}
-    in_degree: Dict[str, int] = {task.id: 0 for task in tasks}
-    task_map: Dict[str, TaskSpec] = {task.id: task for task in tasks}
-
-    for task in tasks:
-        for dep_id in task.dependencies:
-            if dep_id not in task_map:
-                logger.warning(f"Dependency '{dep_id}' for task '{task.id}' not found in provided tasks. Skipping.")
-                continue
-            adj[dep_id].append(task.id)
-            in_degree[task.id] += 1
-    
-    # Kahn's algorithm
-    queue: List[str] = [task_id for task_id, degree in in_degree.items() if degree == 0]
-    sorted_tasks_ids: List[str] = []
-
-    while queue:
-        u = queue.pop(0)
-        sorted_tasks_ids.append(u)
-
-        for v in adj[u]:
-            in_degree[v] -= 1
-            if in_degree[v] == 0:
-                queue.append(v)
-    
-    if len(sorted_tasks_ids) != len(tasks):
-        raise ValueError("Circular dependency detected in tasks.")
-
-    return [task_map[task_id] for task_id in sorted_tasks_ids]
+    # The graph is built over integer indexes into `tasks` (see src/workflow/compact_graph.py)
+    return [tasks[i] for i in CompactGraph(tasks).topological_order()]
 
 
 def detect_cycles(tasks: List[TaskSpec]) -> bool:
     """
-    Detects cycles in task dependencies using DFS.
+    Detects cycles in task dependencies.
     Returns True if a cycle is found, False otherwise.
     """
-    adj: Dict[str, List[str]] = {task.id: [] for task in tasks}
-    task_map: Dict[str, TaskSpec] = {task.id: task for task in tasks}
+    return CompactGraph(tasks).has_cycle()
 
-    for task in tasks:
-        for dep_id in task.dependencies:
-            if dep_id not in task_map:
-                continue # Ignore dependencies not in the current set of tasks
-            adj[task.id].append(dep_id) # Represent dependencies as edges from task to its dependency
-    
-    visited: Set[str] = set()
-    recursion_stack: Set[str] = set()
 
-    def dfs(u: str) -> bool:
-        visited.add(u)
-        recursion_stack.add(u)
-
-        for v in adj[u]:
-            if v not in visited:
-                if dfs(v):
-                    return True
-            elif v in recursion_stack:
-                return True
-        
-        recursion_stack.remove(u)
-        return False
-    
-    for task_id in adj:
-        if task_id not in visited:
-            if dfs(task_id):
-                return True
-    
+def creates_cycle(dependents: Dict[str, List[str]], dep_id: str, task_id: str) -> bool:
+    """
+    Whether making `task_id` depend on `dep_id` would close a cycle in an
+    acyclic graph given as {task id: ids of its dependents}, i.e. whether
+    `dep_id` is already downstream of `task_id`. Only the subgraph below
+    `task_id` is visited, so graphs can be extended edge by edge cheaply.
+    """
+    stack, seen = [task_id], {task_id}
+    while stack:
+        current = stack.pop()
+        if current == dep_id:
+            return True
+        for dependent_id in dependents.get(current, ()):
+            if dependent_id not in seen:
+                seen.add(dependent_id)
+                stack.append(dependent_id)
     return False
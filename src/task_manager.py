@@ -1,12 +1,12 @@
 # src/task_manager.py
 """Core module for managing tasks, queues, and status."""
 from collections import deque
-from typing import Deque, Dict, Optional
+from typing import Callable, Deque, Dict, Optional, Union
 from src.models import TaskSpec
 
 class TaskQueue:
     def __init__(self):
-        self._queue: Deque[TaskSpec] = deque()
+        self._queue: Deque[Union[TaskSpec, Callable[[], TaskSpec]]] = deque()
         self._status: Dict[str, str] = {} # task_id -> status
 
     def add_task(self, task: TaskSpec):
@@ -14,10 +14,17 @@ class TaskQueue:
         self._queue.append(task)
         self._status[task.id] = "pending"
 
+    def add_deferred(self, task_id: str, materialize: Callable[[], TaskSpec]):
+        """Queues a task that is only built, by calling `materialize`, when it is retrieved."""
+        self._queue.append(materialize)
+        self._status[task_id] = "pending"
+
     def get_next_task(self) -> Optional[TaskSpec]:
         """Retrieves the next task from the queue."""
         if self._queue:
             task = self._queue.popleft()
+            if not isinstance(task, TaskSpec):
+                task = task()
             self._status[task.id] = "in_progress"
             return task
         return None
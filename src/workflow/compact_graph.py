@@ -0,0 +1,243 @@
+# src/workflow/compact_graph.py
+"""Array-backed task graph for very large workflows: integer ids, CSR adjacency, TaskSpecs built on demand."""
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from pydantic import ValidationError
+from src.models import MapSpec, TaskSpec, construct_trusted
+import logging
+
+logger = logging.getLogger(__name__)
+
+_EMPTY: Dict[str, Any] = {} # Shared by the (many) records without input data or conditions
+
+
+class TaskRecord:
+    """A task's fields other than its id and dependencies, which the graph stores in arrays."""
+    __slots__ = ("name", "description", "agent_name", "input_data", "timeout", "retries", "map", "when")
+
+    def __init__(self, task: TaskSpec):
+        self.name = task.name
+        self.description = task.description
+        self.agent_name = sys.intern(task.agent_name)
+        self.input_data = task.input_data or _EMPTY
+        self.timeout = task.timeout
+        self.retries = task.retries
+        self.map: Optional[MapSpec] = task.map
+        self.when = task.when or _EMPTY
+
+
+class CompactGraph:
+    """
+    A workflow's tasks and dependencies in compact form. Task i's dependencies
+    are `_dep_targets[_dep_offsets[i]:_dep_offsets[i + 1]]` and its dependents
+    are laid out the same way (compressed sparse rows), so the graph costs a
+    few machine words per edge instead of Python lists and dicts.
+    Dependencies on unknown tasks are dropped with a warning.
+
+    The graph is also a read/write mapping from task id to `TaskSpec`: specs
+    are materialized on access (e.g. when a task is dispatched), and tasks
+    added or replaced while a workflow runs are kept in a small overlay.
+    """
+
+    def __init__(self, tasks: Iterable[Union[TaskSpec, Dict[str, Any]]] = ()):
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._records: List[TaskRecord] = []
+        raw_offsets = array("q", [0])
+        raw_deps: List[str] = []
+        for task in tasks:
+            if not isinstance(task, TaskSpec):
+                try:
+                    task = TaskSpec.model_validate(task) # Validated once here; materialized specs are trusted
+                except ValidationError as e:
+                    raise ValueError(f"Invalid task definition: {e}") from e
+            if task.id in self._index:
+                raise ValueError(f"Duplicate task id: {task.id}")
+            self._index[task.id] = len(self._ids)
+            self._ids.append(task.id)
+            self._records.append(TaskRecord(task))
+            raw_deps.extend(task.dependencies)
+            raw_offsets.append(len(raw_deps))
+
+        # Resolve dependency ids to indexes, then invert them into the dependents rows
+        self._dep_offsets = array("q", [0])
+        self._dep_targets = array("q")
+        for i in range(len(self._ids)):
+            for dep_id in raw_deps[raw_offsets[i]:raw_offsets[i + 1]]:
+                dep = self._index.get(dep_id)
+                if dep is None:
+                    logger.warning(f"Dependency '{dep_id}' for task '{self._ids[i]}' not found in provided tasks. Skipping.")
+                    continue
+                self._dep_targets.append(dep)
+            self._dep_offsets.append(len(self._dep_targets))
+        del raw_deps, raw_offsets
+        self._base_size = len(self._ids)
+        counts = array("q", bytes(8 * (self._base_size + 1)))
+        for dep in self._dep_targets:
+            counts[dep + 1] += 1
+        for i in range(self._base_size):
+            counts[i + 1] += counts[i]
+        self._out_offsets = array("q", counts)
+        self._out_targets = array("q", bytes(8 * len(self._dep_targets)))
+        for i in range(self._base_size):
+            for dep in self._dep_targets[self._dep_offsets[i]:self._dep_offsets[i + 1]]:
+                self._out_targets[counts[dep]] = i
+                counts[dep] += 1
+        self._overrides: Dict[int, TaskSpec] = {} # Tasks added or replaced after construction
+        self.dependents = DependentsView(self)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self._index
+
+    def index(self, task_id: str) -> int:
+        return self._index[task_id]
+
+    def task_id(self, index: int) -> str:
+        return self._ids[index]
+
+    def dependency_ids(self, task_id: str) -> List[str]:
+        i = self._index[task_id]
+        if i in self._overrides:
+            return [dep_id for dep_id in self._overrides[i].dependencies if dep_id in self._index]
+        return [self._ids[dep] for dep in self._dep_targets[self._dep_offsets[i]:self._dep_offsets[i + 1]]]
+
+    def has_map(self, task_id: str) -> bool:
+        i = self._index[task_id]
+        return (self._overrides[i] if i in self._overrides else self._records[i]).map is not None
+
+    def condition(self, task_id: str, dep_id: str) -> Optional[str]:
+        """The task's condition on one of its dependencies, without materializing the task."""
+        i = self._index[task_id]
+        return (self._overrides[i].when if i in self._overrides else self._records[i].when).get(dep_id)
+
+    def with_conditions(self) -> Iterator[TaskSpec]:
+        """Materializes the tasks that have conditions."""
+        for i, record in enumerate(self._records):
+            if record.when:
+                yield self[self._ids[i]]
+
+    def __getitem__(self, task_id: str) -> TaskSpec:
+        i = self._index[task_id]
+        if i in self._overrides:
+            return self._overrides[i]
+        record = self._records[i]
+        return construct_trusted(
+            TaskSpec, id=task_id, name=record.name, description=record.description, agent_name=record.agent_name,
+            input_data=dict(record.input_data), dependencies=self.dependency_ids(task_id),
+            timeout=record.timeout, retries=record.retries, map=record.map, when=dict(record.when),
+        )
+
+    def __setitem__(self, task_id: str, task: TaskSpec):
+        """Adds a task, or replaces one. Edges to and from added tasks are kept in `dependents`."""
+        if task_id not in self._index:
+            self._index[task_id] = len(self._ids)
+            self._ids.append(task_id)
+            self._records.append(TaskRecord(task))
+        self._overrides[self._index[task_id]] = task
+
+    def topological_order(self) -> array:
+        """
+        Task indexes in dependency order (Kahn's algorithm, ties in insertion
+        order) over the tasks given at construction. Raises ValueError on a cycle.
+        """
+        size = self._base_size
+        in_degree = array("q", (self._dep_offsets[i + 1] - self._dep_offsets[i] for i in range(size)))
+        order = array("q", (i for i in range(size) if in_degree[i] == 0))
+        head = 0
+        while head < len(order):
+            u = order[head]
+            head += 1
+            for v in self._out_targets[self._out_offsets[u]:self._out_offsets[u + 1]]:
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    order.append(v)
+        if len(order) != size:
+            raise ValueError("Circular dependency detected in tasks.")
+        return order
+
+    def live_order(self) -> array:
+        """
+        Like `topological_order`, but over every task, including tasks added
+        or replaced since construction (such as injected tasks restored when a
+        session is resumed), whose edges are read from `dependents`.
+        """
+        if not self._overrides:
+            return self.topological_order()
+        size = len(self._ids)
+        in_degree = array("q", (len(self.dependency_ids(task_id)) for task_id in self._ids))
+        order = array("q", (i for i in range(size) if in_degree[i] == 0))
+        head = 0
+        while head < len(order):
+            u = order[head]
+            head += 1
+            for dependent_id in self.dependents[self._ids[u]]:
+                v = self._index[dependent_id]
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    order.append(v)
+        if len(order) != size:
+            raise ValueError("Circular dependency detected in tasks.")
+        return order
+
+    def has_cycle(self) -> bool:
+        try:
+            self.topological_order()
+        except ValueError:
+            return True
+        return False
+
+
+class DependentsView:
+    """
+    `{task id: ids of its dependents}` over a CompactGraph's CSR rows, plus
+    edges added while a workflow runs. Lookups return fresh lists; change
+    edges with `add` and `discard`.
+    """
+
+    def __init__(self, graph: CompactGraph):
+        self._graph = graph
+        self._extra: Dict[str, List[str]] = {}
+
+    def __getitem__(self, task_id: str) -> List[str]:
+        graph = self._graph
+        i = graph._index.get(task_id)
+        base = []
+        if i is not None and i < graph._base_size:
+            base = [graph._ids[j] for j in graph._out_targets[graph._out_offsets[i]:graph._out_offsets[i + 1]]]
+        return base + self._extra.get(task_id, [])
+
+    def get(self, task_id: str, default=None) -> List[str]:
+        return self[task_id]
+
+    def add(self, dep_id: str, task_id: str):
+        self._extra.setdefault(dep_id, []).append(task_id)
+
+    def discard(self, dep_id: str, task_id: str):
+        extra = self._extra.get(dep_id, [])
+        if task_id in extra:
+            extra.remove(task_id)
+
+
+class TaskCounters:
+    """Per-task integers (e.g. unmet dependencies) in an array indexed like a CompactGraph, keyed by task id."""
+
+    def __init__(self, graph: CompactGraph):
+        self._graph = graph
+        self._values = array("q", bytes(8 * len(graph)))
+
+    def __getitem__(self, task_id: str) -> int:
+        i = self._graph.index(task_id)
+        return self._values[i] if i < len(self._values) else 0
+
+    def __setitem__(self, task_id: str, value: int):
+        i = self._graph.index(task_id)
+        if i >= len(self._values):
+            self._values.extend([0] * (i + 1 - len(self._values))) # A task added while running
+        self._values[i] = value
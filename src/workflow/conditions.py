@@ -0,0 +1,94 @@
+# src/workflow/conditions.py
+"""Evaluates conditional edges: expressions over an upstream task's AgentResponse.output."""
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Dict
+from src.models import TaskSpec
+
+_COMPARE = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge, ast.Is: operator.is_, ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+}
+_UNARY = {ast.Not: operator.not_, ast.USub: operator.neg}
+_FUNCTIONS = {"len": len}
+
+
+@lru_cache(maxsize=256)
+def _parse(expression: str) -> ast.Expression:
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid condition {expression!r}: {e.msg}") from e
+    for node in ast.walk(tree):
+        allowed = (ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Attribute, ast.Subscript, ast.Compare,
+                   ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.List, ast.Tuple, ast.Call, *_COMPARE, *_UNARY)
+        if not isinstance(node, allowed):
+            raise ValueError(f"Invalid condition {expression!r}: {type(node).__name__} is not allowed.")
+        if isinstance(node, ast.Name) and node.id not in ("output", *_FUNCTIONS):
+            raise ValueError(f"Invalid condition {expression!r}: unknown name '{node.id}'.")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS):
+            raise ValueError(f"Invalid condition {expression!r}: only {', '.join(_FUNCTIONS)}() may be called.")
+    return tree
+
+
+def _lookup(container: Any, key: Any) -> Any:
+    if isinstance(container, dict):
+        return container.get(key) # A missing key reads as None
+    if isinstance(container, (list, tuple, str)) and isinstance(key, int):
+        return container[key] if -len(container) <= key < len(container) else None
+    raise ValueError(f"Cannot look up {key!r} in a {type(container).__name__}.")
+
+
+def _evaluate(node: ast.AST, output: Dict[str, Any]) -> Any:
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, output)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return output if node.id == "output" else _FUNCTIONS[node.id]
+    if isinstance(node, ast.Attribute): # output.label is shorthand for output["label"]
+        return _lookup(_evaluate(node.value, output), node.attr)
+    if isinstance(node, ast.Subscript):
+        return _lookup(_evaluate(node.value, output), _evaluate(node.slice, output))
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_evaluate(item, output) for item in node.elts]
+    if isinstance(node, ast.UnaryOp):
+        return _UNARY[type(node.op)](_evaluate(node.operand, output))
+    if isinstance(node, ast.BoolOp):
+        values = (_evaluate(value, output) for value in node.values)
+        return all(values) if isinstance(node.op, ast.And) else any(values)
+    if isinstance(node, ast.Compare):
+        left = _evaluate(node.left, output)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _evaluate(comparator, output)
+            if not _COMPARE[type(op)](left, right):
+                return False
+            left = right
+        return True
+    if isinstance(node, ast.Call):
+        return _evaluate(node.func, output)(*(_evaluate(arg, output) for arg in node.args))
+    raise ValueError(f"Unsupported expression: {type(node).__name__}")
+
+
+def evaluate_condition(expression: str, output: Dict[str, Any]) -> bool:
+    """
+    Evaluates a condition such as `output.label == 'urgent' and output["score"] >= 0.8`
+    against an upstream task's output. Conditions may use `output`, constants,
+    lookups (missing keys read as None), comparisons, `and`/`or`/`not` and `len()`;
+    nothing else is evaluated. Raises ValueError if the expression is invalid or
+    cannot be evaluated.
+    """
+    try:
+        return bool(_evaluate(_parse(expression), output))
+    except (TypeError, ZeroDivisionError) as e:
+        raise ValueError(f"Could not evaluate condition {expression!r}: {e}") from e
+
+
+def validate_conditions(task: TaskSpec):
+    """Raises ValueError unless every condition of the task is on one of its dependencies and parses."""
+    for dep_id, expression in task.when.items():
+        if dep_id not in task.dependencies:
+            raise ValueError(f"Task '{task.id}' has a condition on '{dep_id}', which is not one of its dependencies.")
+        _parse(expression)
@@ -0,0 +1,235 @@
+# src/workflow/mapping.py
+"""Expands map tasks into per-item tasks lazily, a bounded chunk at a time."""
+import glob
+import json
+import os
+from itertools import islice
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional
+import yaml
+from src.config import settings
+from src.file_io import DEFAULT_CHUNK_SIZE, open_stream
+from src.models import Artifact, MapSpec, TaskSpec
+from src.paths import get_root_dir
+
+MAP_INDEX_KEY = "map_index" # input_data key holding an item's position in the collection
+MAP_OUTPUTS_KEY = "map_outputs" # input_data key of the reduce task: item outputs in collection order
+
+
+def validate_map_spec(task: TaskSpec):
+    """Raises ValueError unless the task's map spec names exactly one well-formed collection."""
+    spec = task.map
+    sources = [name for name in ("file", "glob", "artifact") if getattr(spec, name)]
+    if len(sources) != 1:
+        raise ValueError(f"Map task '{task.id}' must set exactly one of 'file', 'glob' or 'artifact'.")
+    if spec.artifact:
+        dep_id, _, name = spec.artifact.partition("/")
+        if not name or dep_id not in task.dependencies:
+            raise ValueError(f"Map task '{task.id}': artifact must be '<dependency id>/<artifact name>' of one of its dependencies.")
+    for name in ("file", "glob"):
+        path = getattr(spec, name)
+        if path and (os.path.isabs(path) or ".." in path.replace("\\", "/").split("/")):
+            raise ValueError(f"Map task '{task.id}': {name} must be a path relative to the root dir, without '..'.")
+    if spec.chunk_size is not None and spec.chunk_size < 1:
+        raise ValueError(f"Map task '{task.id}': chunk_size must be at least 1.")
+
+
+def _under_root(path: str) -> str:
+    """Resolves a path (and any symlinks in it) and raises ValueError unless it lies inside the root dir."""
+    root = os.path.realpath(get_root_dir())
+    resolved = os.path.realpath(path)
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Map input '{path}' is outside the root dir.")
+    return resolved
+
+
+def _iter_lines(text: Any) -> Iterator[str]:
+    lines = text.decode("utf-8") if isinstance(text, (bytes, bytearray, memoryview)) else text
+    for line in (lines.splitlines() if isinstance(lines, str) else lines):
+        line = line.strip()
+        if line:
+            yield line
+
+
+def _iter_json_array(stream: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yields the elements of a JSON array one at a time, reading the stream a
+    chunk at a time so memory is bounded by the largest element rather than
+    the file. Raises ValueError if the content is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+    def next_char() -> str:
+        """Skips whitespace and returns the next character, or '' at the end of the stream."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            read_more()
+
+    if next_char() != "[":
+        raise ValueError("A JSON map input must hold a list.")
+    pos += 1
+    if next_char() == "]":
+        return
+    while True:
+        next_char()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                if eof or buffer[end:end + 1] in (",", "]") or buffer[end:end + 1].isspace():
+                    break # Otherwise the value (e.g. a number cut at the chunk boundary) may continue
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"Invalid JSON map input: {e}") from e
+            read_more()
+        yield item
+        pos = end
+        char = next_char()
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError(f"Invalid JSON map input: expected ',' or ']' but found {char or 'the end of the file'!r}.")
+        pos += 1
+
+
+def _iter_file(path: str) -> Iterator[Any]:
+    with open_stream(path) as stream:
+        if path.endswith(".json"):
+            yield from _iter_json_array(stream)
+        elif path.endswith((".yaml", ".yml")):
+            yield from yaml.safe_load(stream) or []
+        elif path.endswith(".jsonl"):
+            for line in _iter_lines(stream):
+                yield json.loads(line)
+        else:
+            yield from _iter_lines(stream)
+
+
+def iter_map_items(spec: MapSpec, artifacts_of: Callable[[str], Dict[str, Artifact]]) -> Iterator[Any]:
+    """
+    Yields the items of a map task's collection. Files and globs are read
+    incrementally (YAML files, which are parsed whole, excepted); `artifacts_of(task_id)` returns a dependency's artifacts.
+    Raises ValueError if an upstream artifact is missing, or if a file or
+    glob match resolves (e.g. through a symlink) outside the root dir.
+    """
+    if spec.file:
+        yield from _iter_file(_under_root(os.path.join(get_root_dir(), spec.file)))
+    elif spec.glob:
+        for path in glob.iglob(os.path.join(get_root_dir(), spec.glob), recursive=True):
+            _under_root(path)
+            yield path
+    else:
+        dep_id, _, name = spec.artifact.partition("/")
+        artifact = artifacts_of(dep_id).get(name)
+        if artifact is None:
+            raise ValueError(f"Map input artifact '{name}' of task '{dep_id}' not found.")
+        if isinstance(artifact.data, (str, bytes, bytearray, memoryview)):
+            yield from _iter_lines(artifact.data)
+        else:
+            yield from artifact.data
+
+
+class MapExpansion:
+    """
+    Expansion state of one map task in a running workflow. Item tasks are
+    copies of the template (without its `map`) with the item in
+    `input_data[item_key]`, ids of the form `<map id>[<index>]`, and the
+    template's dependencies, so they receive its upstream artifacts. At most
+    `chunk_size` items exist at once; more are expanded once half of them
+    have finished.
+    """
+
+    def __init__(self, task: TaskSpec, items: Iterator[Any]):
+        self.task = task
+        self.template = task.model_copy(update={"map": None})
+        self.spec: MapSpec = task.map
+        self.chunk_size = self.spec.chunk_size or settings.MAP_CHUNK_SIZE
+        self._items = items
+        self._next_index = 0
+        self._exhausted = False
+        self.pending: Dict[str, int] = {} # Expanded, unfinished item id -> index
+        self.finished = 0
+        self.failed = 0
+        self.first_error: Optional[str] = None
+        # Item outputs are kept only for the reduce task
+        self._outputs: Optional[Dict[int, Dict[str, Any]]] = {} if self.spec.reduce else None
+
+    @property
+    def done(self) -> bool:
+        """Whether every item has been expanded and has finished."""
+        return self._exhausted and not self.pending
+
+    def expand(self) -> List[TaskSpec]:
+        """Returns the next item tasks to queue: none while more than half a chunk is still pending."""
+        if self._exhausted or len(self.pending) > self.chunk_size // 2:
+            return []
+        wanted = self.chunk_size - len(self.pending)
+        tasks = []
+        for item in islice(self._items, wanted):
+            index = self._next_index
+            self._next_index += 1
+            task_id = f"{self.task.id}[{index}]"
+            self.pending[task_id] = index
+            tasks.append(self.template.model_copy(update={
+                "id": task_id,
+                "name": f"{self.task.name}[{index}]",
+                "input_data": {**self.template.input_data, self.spec.item_key: item, MAP_INDEX_KEY: index},
+            }))
+        if len(tasks) < wanted:
+            self._exhausted = True
+        return tasks
+
+    def record(self, task_id: str, output: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """Records a finished item: its output, or the error it failed with."""
+        index = self.pending.pop(task_id)
+        self.finished += 1
+        if error is not None:
+            self.failed += 1
+            self.first_error = self.first_error or f"item {index}: {error}"
+        elif self._outputs is not None:
+            self._outputs[index] = output or {}
+
+    @property
+    def chunk_finished(self) -> bool:
+        """Whether the last recorded item completed another `chunk_size` items."""
+        return self.finished % self.chunk_size == 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Output recorded for the map task itself."""
+        return {"items": self._next_index, "failed": self.failed}
+
+    def progress(self) -> Dict[str, Any]:
+        """Output checkpointed for the map task while its items run."""
+        return {"items": self._next_index, "finished": self.finished, "failed": self.failed}
+
+    def error(self) -> Optional[str]:
+        """Why the map task failed, or None if every item succeeded."""
+        if not self.failed:
+            return None
+        return f"{self.failed} of {self._next_index} item(s) failed; first: {self.first_error}"
+
+    def reduce_task(self) -> Optional[TaskSpec]:
+        """
+        The task that combines the item outputs, if the map has a `reduce`. It
+        takes the map task's id, so its response and artifacts become the map
+        task's and flow to its dependents.
+        """
+        reduce = self.spec.reduce
+        if reduce is None:
+            return None
+        outputs = [self._outputs[index] for index in sorted(self._outputs)]
+        self._outputs = {}
+        return TaskSpec(
+            id=self.task.id, name=f"{self.task.name} (reduce)", description=reduce.description or self.task.description,
+            agent_name=reduce.agent_name, input_data={**reduce.input_data, MAP_OUTPUTS_KEY: outputs},
+            dependencies=self.task.dependencies, timeout=reduce.timeout, retries=reduce.retries,
+        )
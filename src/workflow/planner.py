@@ -3,15 +3,23 @@
 from typing import List
 from src.models import TaskSpec
 from src.task_dependencies import topological_sort, detect_cycles
+from src.workflow.conditions import validate_conditions
 
 class WorkflowPlanner:
     def __init__(self):
         pass
 
     def generate_plan(self, tasks: List[TaskSpec]) -> List[TaskSpec]:
-        """Generates an execution plan (topologically sorted tasks)."""
+        """
+        Generates an execution plan (topologically sorted tasks). The plan is
+        the static upper bound of a run: conditional tasks (`when`) may be
+        skipped, and tasks may inject more while the workflow runs.
+        Raises ValueError on cycles or invalid conditions.
+        """
         if detect_cycles(tasks):
             raise ValueError("Workflow contains circular dependencies.")
+        for task in tasks:
+            validate_conditions(task)
         return topological_sort(tasks)
 
     def validate_plan(self, plan: List[TaskSpec]) -> bool:
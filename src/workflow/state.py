@@ -8,6 +8,12 @@ class WorkflowState(str, Enum):
     RUNNING = "RUNNING"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+class FailurePolicy(str, Enum):
+    FAIL_FAST = "fail_fast" # Stop dispatching on the first failure
+    CONTINUE_INDEPENDENT = "continue_independent" # Skip only the failed task's descendants
+    RETRY_N = "retry_n" # Retry a failed task up to TASK_MAX_RETRIES times, then continue independently
 
 class WorkflowStateMachine:
     def __init__(self, initial_state: WorkflowState = WorkflowState.INIT):
@@ -3,10 +3,14 @@
 import os
 import yaml
 import json
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List
+from pydantic import ValidationError
 from src.models import TaskSpec
-from src.file_io import read_file
+from src.workflow.compact_graph import CompactGraph
+from src.file_io import open_stream
 from src.paths import get_root_dir
+from src.workflow.conditions import validate_conditions
+from src.workflow.mapping import validate_map_spec
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,34 +19,74 @@ class WorkflowLoader:
     def __init__(self):
         pass
 
+    def load_workflow(self, data: Dict[str, Any]) -> List[TaskSpec]:
+        """
+        Builds TaskSpec objects from a parsed workflow definition ({"tasks": [...]}).
+        Raises ValueError if the definition is malformed.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Workflow definition must be a mapping with a 'tasks' key.")
+        tasks_data = data.get("tasks", [])
+        if not isinstance(tasks_data, list):
+            raise ValueError("Workflow 'tasks' key must be a list.")
+        try:
+            tasks = [TaskSpec(**task_dict) for task_dict in tasks_data]
+        except (TypeError, ValidationError) as e:
+            raise ValueError(f"Invalid task definition: {e}") from e
+        for task in tasks:
+            validate_conditions(task)
+            if task.map is not None:
+                validate_map_spec(task)
+        return tasks
+
+    def load_workflow_graph(self, data: Dict[str, Any]) -> CompactGraph:
+        """
+        Like `load_workflow`, but returns the tasks as a CompactGraph: each task
+        is validated once and then kept in compact form, so very large
+        workflows do not hold a TaskSpec per task. Raises ValueError if the
+        definition is malformed.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("tasks", []), list):
+            raise ValueError("Workflow definition must be a mapping whose 'tasks' key is a list.")
+        graph = CompactGraph(data.get("tasks", []))
+        for task in graph.with_conditions():
+            validate_conditions(task)
+        for task_id in graph:
+            if graph.has_map(task_id):
+                validate_map_spec(graph[task_id])
+        return graph
+
     def load_workflow_from_file(self, filepath: str) -> List[TaskSpec]:
         """
         Loads a workflow definition from a YAML or JSON file and returns a list of TaskSpec objects.
         """
+        return self._load_file(filepath, self.load_workflow)
+
+    def load_workflow_graph_from_file(self, filepath: str) -> CompactGraph:
+        """Loads a workflow definition from a YAML or JSON file as a CompactGraph."""
+        return self._load_file(filepath, self.load_workflow_graph)
+
+    def _load_file(self, filepath: str, build: Callable[[Dict[str, Any]], Any]):
         full_filepath = os.path.join(get_root_dir(), filepath)
-        content = read_file(full_filepath)
-        if content is None:
-            raise FileNotFoundError(f"Workflow file not found or unreadable: {full_filepath}")
+        try:
+            stream = open_stream(full_filepath)
+        except OSError as e:
+            raise FileNotFoundError(f"Workflow file not found or unreadable: {full_filepath}") from e
 
         data: Dict[str, Any]
         try:
-            if filepath.endswith((".yaml", ".yml")):
-                data = yaml.safe_load(content)
-            elif filepath.endswith(".json"):
-                data = json.loads(content)
-            else:
-                raise ValueError(f"Unsupported workflow file type: {filepath}. Must be .yaml, .yml, or .json")
-
-            tasks_data = data.get("tasks", [])
-            if not isinstance(tasks_data, list):
-                raise ValueError("Workflow 'tasks' key must be a list.")
-            
-            task_specs: List[TaskSpec] = []
-            for task_dict in tasks_data:
-                task_specs.append(TaskSpec(**task_dict))
-            
-            logger.info(f"Loaded workflow from {filepath} with {len(task_specs)} tasks.")
-            return task_specs
+            # Parse straight from the file handle rather than reading it into a string first.
+            with stream:
+                if filepath.endswith((".yaml", ".yml")):
+                    data = yaml.safe_load(stream)
+                elif filepath.endswith(".json"):
+                    data = json.load(stream)
+                else:
+                    raise ValueError(f"Unsupported workflow file type: {filepath}. Must be .yaml, .yml, or .json")
+
+            tasks = build(data)
+            logger.info(f"Loaded workflow from {filepath} with {len(tasks)} tasks.")
+            return tasks
 
         except (yaml.YAMLError, json.JSONDecodeError) as e:
             raise ValueError(f"Error parsing workflow file {full_filepath}: {e}")
@@ -0,0 +1,27 @@
+# tests/conftest.py
+import pytest
+from unittest.mock import MagicMock
+from src.session_manager import session_manager
+from src.workflow.state import workflow_state_machine, WorkflowState
+
+@pytest.fixture
+def isolated_run(tmp_path, monkeypatch):
+    """Runs workflows without persistence and with artifacts in a temporary directory."""
+    monkeypatch.setattr('src.config.settings.SESSION_PERSISTENCE_ENABLED', False)
+    monkeypatch.setattr('src.artifacts.artifact_manager.artifact_dir', str(tmp_path / "artifacts"))
+    yield
+
+@pytest.fixture
+def workflow_session(isolated_run):
+    """Resets the default run's state machine and starts a fresh session on it."""
+    workflow_state_machine._state = WorkflowState.INIT
+    return session_manager.start_session()
+
+@pytest.fixture
+def agent_factory():
+    """Builds AgentFactory stand-ins: `agent_factory(make_agent)` creates agents with `make_agent(name)`."""
+    def build(make_agent):
+        factory = MagicMock()
+        factory.create_agent.side_effect = make_agent
+        return factory
+    return build
@@ -112,3 +112,9 @@ def test_agent_registry_warns_on_class_without_spec(clean_agent_registry, caplog
     with caplog.at_level(logging.WARNING):
         agent_registry.register_agent_class(NoSpecAgent)
         assert "Attempted to register agent class NoSpecAgent without a corresponding AgentSpec." in caplog.text
+
+def test_agent_registry_register_agent_spec(clean_agent_registry):
+    """Test registering an agent specification programmatically."""
+    spec = AgentSpec(name="InlineAgent", role="Inline", description="Registered without a spec file.")
+    agent_registry.register_agent_spec(spec)
+    assert agent_registry.get_agent_spec("InlineAgent") == spec
@@ -0,0 +1,87 @@
+# tests/test_artifact_bus.py
+import pytest
+from unittest.mock import MagicMock
+from src.artifact_bus import ArtifactBus, estimate_size
+from src.artifacts import artifact_manager
+from src.agents.base import Agent
+from src.models import Artifact, AgentResponse, TaskSpec
+from src.orchestrator import Orchestrator
+from src.session_manager import session_manager
+from src.workflow.state import workflow_state_machine, WorkflowState
+
+@pytest.fixture
+def bus():
+    """Provides an ArtifactBus with a 10-byte budget per session."""
+    return ArtifactBus(max_bytes=10)
+
+def test_estimate_size():
+    """Test payload size estimates for common types."""
+    assert estimate_size(b"abcd") == 4
+    assert estimate_size("abc") == 3
+    assert estimate_size(memoryview(b"ab")) == 2
+
+def test_publish_and_get(bus):
+    """Test that published artifacts can be fetched by task and name."""
+    artifact = Artifact(name="out", type="text", data="hi")
+    bus.publish("s1", "t1", [artifact])
+    assert bus.get("s1", "t1", "out") is artifact
+    assert bus.get("s1", "t2", "out") is None
+    assert bus.get("s2", "t1", "out") is None
+    assert bus.produced_by("s1", "t1") == ["out"]
+
+def test_lru_eviction_by_bytes(bus):
+    """Test that least recently used artifacts are evicted once the byte budget is exceeded."""
+    bus.publish("s1", "t1", [Artifact(name="a", type="bytes", data=b"1234")])
+    bus.publish("s1", "t2", [Artifact(name="b", type="bytes", data=b"1234")])
+    bus.get("s1", "t1", "a") # t1/a becomes most recently used
+    bus.publish("s1", "t3", [Artifact(name="c", type="bytes", data=b"1234")])
+
+    assert bus.get("s1", "t2", "b") is None
+    assert bus.get("s1", "t1", "a") is not None
+    assert bus.size("s1") == 8
+    assert bus.produced_by("s1", "t2") == ["b"] # Still known after eviction
+
+def test_oversized_artifact_is_not_cached(bus):
+    """Test that an artifact larger than the whole budget is skipped."""
+    bus.publish("s1", "t1", [Artifact(name="big", type="bytes", data=b"x" * 11)])
+    assert bus.get("s1", "t1", "big") is None
+    assert bus.size("s1") == 0
+
+def test_clear_session(bus):
+    """Test that clearing a session drops its artifacts."""
+    bus.publish("s1", "t1", [Artifact(name="a", type="text", data="x")])
+    bus.clear_session("s1")
+    assert bus.session_artifacts("s1") == {}
+    assert bus.produced_by("s1", "t1") == []
+
+def test_orchestrator_hands_artifacts_to_dependents(tmp_path, monkeypatch):
+    """Test that a dependent task receives its upstream task's artifacts in input_data."""
+    monkeypatch.setattr('src.config.settings.SESSION_PERSISTENCE_ENABLED', False)
+    monkeypatch.setattr(artifact_manager, "artifact_dir", str(tmp_path))
+    received = {}
+
+    class Producer(Agent):
+        def run(self, task: TaskSpec) -> AgentResponse:
+            return AgentResponse(status="completed", artifacts=[Artifact(name="data.json", type="json", data={"n": 1})])
+
+    class Consumer(Agent):
+        def run(self, task: TaskSpec) -> AgentResponse:
+            received.update(task.input_data)
+            return AgentResponse(status="completed")
+
+    agents = {"Producer": Producer("Producer"), "Consumer": Consumer("Consumer")}
+    factory = MagicMock()
+    factory.create_agent.side_effect = lambda name: agents[name]
+    tasks = [
+        TaskSpec(id="p", name="p", description="", agent_name="Producer"),
+        TaskSpec(id="c", name="c", description="", agent_name="Consumer", input_data={"k": "v"}, dependencies=["p"]),
+    ]
+
+    workflow_state_machine._state = WorkflowState.INIT
+    session_manager.start_session()
+    Orchestrator(factory).run_workflow(tasks)
+
+    assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+    assert received["k"] == "v"
+    assert received["upstream_artifacts"]["p"]["data.json"].data == {"n": 1}
+    assert tasks[1].input_data == {"k": "v"} # Original task is not mutated
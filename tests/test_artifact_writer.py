@@ -0,0 +1,106 @@
+# tests/test_artifact_writer.py
+import pytest
+import os
+import threading
+from src.artifact_writer import ArtifactWriter
+
+@pytest.fixture
+def writer():
+    """Provides an ArtifactWriter that is closed after the test."""
+    writer = ArtifactWriter(num_threads=2, queue_size=8, batch_size=4)
+    yield writer
+    writer.close()
+
+def test_submit_writes_file_and_resolves_to_path(writer, tmp_path):
+    """Test that a submitted write lands on disk and its future resolves to the path."""
+    path = str(tmp_path / "nested" / "out.bin")
+    future = writer.submit(path, b"payload")
+    assert future.result(timeout=5) == path
+    with open(path, "rb") as f:
+        assert f.read() == b"payload"
+
+def test_flush_waits_for_all_queued_writes(writer, tmp_path):
+    """Test that flush is a barrier over every write queued before it."""
+    futures = [writer.submit(str(tmp_path / f"{i}.txt"), str(i).encode()) for i in range(50)]
+    writer.flush()
+    assert all(f.done() for f in futures)
+    assert sorted(os.listdir(tmp_path), key=lambda n: int(n.split(".")[0])) == [f"{i}.txt" for i in range(50)]
+
+def test_fsync_is_grouped_per_batch(tmp_path, monkeypatch):
+    """Test that a batch of writes into one directory fsyncs that directory once."""
+    calls = []
+    monkeypatch.setattr("src.artifact_writer.fsync_dir", calls.append)
+    writer = ArtifactWriter(num_threads=1, batch_size=16, fsync=True)
+    release = threading.Event()
+    blocker = writer.submit(str(tmp_path / "first.txt"), b"x")
+    # Queue the rest while the worker is busy so they are drained as one batch.
+    original = writer._write_batch
+    def gated(batch):
+        release.wait(5)
+        original(batch)
+    writer._write_batch = gated
+    futures = [writer.submit(str(tmp_path / f"{i}.txt"), b"y") for i in range(10)]
+    release.set()
+    writer.close()
+    blocker.result(timeout=5)
+    assert all(f.result(timeout=5) for f in futures)
+    assert len(calls) <= 2
+
+def test_failed_write_sets_exception(writer, tmp_path):
+    """Test that a write that cannot be performed fails its future."""
+    blocked = tmp_path / "file"
+    blocked.write_text("not a directory")
+    future = writer.submit(str(blocked / "child.txt"), b"data")
+    with pytest.raises(OSError):
+        future.result(timeout=5)
+
+def test_submit_after_close_raises(tmp_path):
+    """Test that a closed writer rejects new work."""
+    writer = ArtifactWriter(num_threads=1)
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit(str(tmp_path / "late.txt"), b"data")
+
+def test_flush_of_a_group_waits_only_for_its_own_writes(tmp_path):
+    """Test that flushing one group returns, with its callbacks run, while another group's write is still blocked."""
+    writer = ArtifactWriter(num_threads=2, batch_size=1)
+    release = threading.Event()
+    original = writer._write_batch
+    def gated(batch):
+        if batch[0][3] == "slow":
+            release.wait(5)
+        original(batch)
+    writer._write_batch = gated
+    slow = writer.submit(str(tmp_path / "slow.txt"), b"x", group="slow")
+    fast = writer.submit(str(tmp_path / "fast.txt"), b"y", group="fast")
+    stored = []
+    fast.add_done_callback(lambda f: stored.append(f.result()))
+    writer.flush("fast")
+    assert stored == [str(tmp_path / "fast.txt")]
+    assert not slow.done()
+    writer.flush("idle") # Nothing queued for this group
+    release.set()
+    writer.flush("slow")
+    assert slow.done()
+    writer.close()
+
+def test_unexpected_errors_fail_the_job_and_keep_the_writer_alive(tmp_path, monkeypatch):
+    """Test that non-OSError failures resolve the affected futures and later writes still complete."""
+    writer = ArtifactWriter(num_threads=1, batch_size=1)
+    bad = writer.submit(str(tmp_path / "bad.txt"), "not bytes", group="s") # TypeError from the file write
+    with pytest.raises(TypeError):
+        bad.result(timeout=5)
+
+    def broken_fsync(directory):
+        raise ValueError("backend failure")
+    monkeypatch.setattr("src.artifact_writer.fsync_dir", broken_fsync)
+    writer.fsync = True
+    failed = writer.submit(str(tmp_path / "failed.txt"), b"x", group="s")
+    with pytest.raises(ValueError, match="backend failure"):
+        failed.result(timeout=5)
+
+    monkeypatch.undo()
+    good = writer.submit(str(tmp_path / "good.txt"), b"y", group="s")
+    assert good.result(timeout=5) == str(tmp_path / "good.txt")
+    writer.flush("s") # Every job of the group finished, so the barrier does not block
+    writer.close()
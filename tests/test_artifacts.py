@@ -55,10 +55,9 @@ def test_store_and_retrieve_binary_artifact(clean_artifact_manager):
     with open(expected_path, "rb") as f:
         assert f.read() == binary_content
 
-    # Further development will need to make retrieve_artifact handle binary properly
-    # For now, it will return str(binary_content)
     retrieved_artifact = clean_artifact_manager.retrieve_artifact(artifact_name, session_id)
-    assert retrieved_artifact.data == str(binary_content) # Current limitation of stub
+    assert retrieved_artifact.type == "image/png"
+    assert retrieved_artifact.data == binary_content
 
 def test_retrieve_non_existent_artifact(clean_artifact_manager):
     """Test retrieving a non-existent artifact returns None."""
@@ -70,3 +69,94 @@ def test_get_contextual_artifacts(clean_artifact_manager):
     session_id = str(uuid.uuid4())
     context = clean_artifact_manager.get_contextual_artifacts(session_id)
     assert context == {} # Currently an empty dict as per stub
+
+def test_cas_backend_deduplicates_across_sessions(tmp_path):
+    """Test that the CAS backend stores identical artifacts once and retrieves them per session."""
+    manager = ArtifactManager(artifact_dir=str(tmp_path / "cas_artifacts"), backend="cas")
+    first = manager.store_artifact(Artifact(name="out.txt", type="text/plain", data="same output"), "s1")
+    second = manager.store_artifact(Artifact(name="result.txt", type="text/plain", data="same output"), "s2")
+    assert first == second
+
+    retrieved = manager.retrieve_artifact("result.txt", "s2")
+    assert retrieved.type == "text/plain"
+    assert retrieved.data == "same output"
+    assert manager.retrieve_artifact("out.txt", "s2") is None
+
+    binary = manager.store_artifact(Artifact(name="blob.bin", type="application/octet-stream", data=b"\x00\x01"), "s1")
+    assert manager.retrieve_artifact("blob.bin", "s1").data == b"\x00\x01"
+
+    manager.release_session("s1")
+    assert manager.collect_garbage() == [os.path.basename(binary)]
+    assert manager.retrieve_artifact("result.txt", "s2").data == "same output"
+
+@pytest.mark.parametrize("backend", ["filesystem", "cas"])
+def test_unregistered_types_round_trip_text_and_bytes(tmp_path, backend):
+    """Test that an artifact type without a serializer reads back as str for text data and as bytes for bytes data."""
+    manager = ArtifactManager(artifact_dir=str(tmp_path / "artifacts"), backend=backend)
+    manager.store_artifact(Artifact(name="run.log", type="x-build-log", data="line 1\nline 2"), "s")
+    manager.store_artifact_async(Artifact(name="summary", type="x-build-log", data=42), "s").result(timeout=5)
+    manager.store_artifact(Artifact(name="core", type="x-core-dump", data=b"\x00\xff"), "s")
+    assert manager.retrieve_artifact("run.log", "s").data == "line 1\nline 2"
+    assert manager.retrieve_artifact("summary", "s").data == "42"
+    assert bytes(manager.retrieve_artifact("core", "s").data) == b"\x00\xff"
+
+    reopened = ArtifactManager(artifact_dir=str(tmp_path / "artifacts"), backend=backend) # Reads the persisted manifest
+    assert reopened.retrieve_artifact("run.log", "s").data == "line 1\nline 2"
+    assert bytes(reopened.retrieve_artifact("core", "s").data) == b"\x00\xff"
+
+def test_unknown_backend_raises(tmp_path):
+    """Test that an unknown artifact backend is rejected."""
+    with pytest.raises(ValueError):
+        ArtifactManager(artifact_dir=str(tmp_path / "x"), backend="s3")
+
+def test_store_and_retrieve_json_artifact(clean_artifact_manager):
+    """Test that JSON artifacts round-trip as structured data."""
+    session_id = str(uuid.uuid4())
+    payload = {"labels": ["a", "b"], "score": 0.5}
+    clean_artifact_manager.store_artifact(Artifact(name="result.json", type="application/json", data=payload), session_id)
+    retrieved = clean_artifact_manager.retrieve_artifact("result.json", session_id)
+    assert retrieved.type == "application/json"
+    assert retrieved.data == payload
+
+def test_large_binary_artifact_is_memory_mapped(clean_artifact_manager, monkeypatch):
+    """Test that artifacts above the mmap threshold come back as a memoryview."""
+    monkeypatch.setattr('src.config.settings.ARTIFACT_MMAP_THRESHOLD', 16)
+    session_id = str(uuid.uuid4())
+    content = bytes(range(256)) * 4
+    clean_artifact_manager.store_artifact(Artifact(name="blob.bin", type="bytes", data=content), session_id)
+    retrieved = clean_artifact_manager.retrieve_artifact("blob.bin", session_id)
+    assert isinstance(retrieved.data, memoryview)
+    assert retrieved.data == content
+
+def test_npy_artifact_round_trip_without_copy(clean_artifact_manager, monkeypatch):
+    """Test that .npy artifacts are read back as arrays backed by the mapped file."""
+    np = pytest.importorskip("numpy")
+    monkeypatch.setattr('src.config.settings.ARTIFACT_MMAP_THRESHOLD', 0)
+    session_id = str(uuid.uuid4())
+    embeddings = np.random.default_rng(0).random((8, 4), dtype=np.float32)
+    clean_artifact_manager.store_artifact(Artifact(name="emb.npy", type="npy", data=embeddings), session_id)
+    retrieved = clean_artifact_manager.retrieve_artifact("emb.npy", session_id)
+    assert np.array_equal(retrieved.data, embeddings)
+    assert not retrieved.data.flags.owndata
+
+def test_get_task_artifacts_falls_back_to_store(clean_artifact_manager):
+    """Test that artifacts evicted from the bus are read back from the store."""
+    from src.artifact_bus import artifact_bus
+    session_id = str(uuid.uuid4())
+    artifact = Artifact(name="out.txt", type="text", data="persisted")
+    clean_artifact_manager.store_artifact_async(artifact, session_id)
+    artifact_bus.publish(session_id, "t1", [artifact])
+    artifact_bus._entries[session_id].clear() # Simulate eviction
+
+    retrieved = clean_artifact_manager.get_task_artifacts(session_id, "t1")
+    assert retrieved["out.txt"].data == "persisted"
+    artifact_bus.clear_session(session_id)
+
+def test_async_cas_writes_are_deduplicated(tmp_path):
+    """Test that asynchronous CAS stores link immediately and write each blob once."""
+    manager = ArtifactManager(artifact_dir=str(tmp_path / "cas_async"), backend="cas")
+    first = manager.store_artifact_async(Artifact(name="a.txt", type="text", data="same"), "s1")
+    manager.flush()
+    second = manager.store_artifact_async(Artifact(name="b.txt", type="text", data="same"), "s2")
+    assert first.result() == second.result()
+    assert manager.retrieve_artifact("b.txt", "s2").data == "same"
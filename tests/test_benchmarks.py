@@ -0,0 +1,86 @@
+# tests/test_benchmarks.py
+import pytest
+from unittest.mock import patch
+from benchmarks.workflows import chain, fan_out, diamond, random_dag
+from benchmarks.harness import run_benchmark, run_suite, compare_results, save_results, load_results, run_construction_benchmark
+from src.task_dependencies import detect_cycles
+from src.agents.registry import agent_registry
+from src.agents.dummy_agent import DummyAgent
+from src.models import AgentSpec
+from src.artifacts import artifact_manager
+from src.session_manager import session_manager
+
+@pytest.fixture
+def registry_with_dummy_agent():
+    """Ensures the DummyAgent spec is registered regardless of what other tests did to the registry."""
+    original_specs = agent_registry._agent_specs.copy()
+    original_agents = agent_registry._agents.copy()
+    agent_registry.register_agent_spec(AgentSpec(name="DummyAgent", role="Test Executor", description="Dummy."))
+    agent_registry.register_agent_class(DummyAgent)
+    yield
+    agent_registry._agent_specs = original_specs
+    agent_registry._agents = original_agents
+
+def test_chain_shape():
+    """Test that every chain task depends on its predecessor."""
+    tasks = chain(5)
+    assert [t.dependencies for t in tasks] == [[], ["t0"], ["t1"], ["t2"], ["t3"]]
+
+def test_fan_out_shape():
+    """Test that fan-out tasks all depend on the root."""
+    tasks = fan_out(4)
+    assert tasks[0].dependencies == []
+    assert all(t.dependencies == ["t0"] for t in tasks[1:])
+
+def test_diamond_shape():
+    """Test that the diamond sink depends on the whole middle layer."""
+    tasks = diamond(5)
+    assert tasks[-1].dependencies == ["t1", "t2", "t3"]
+
+def test_random_dag_is_acyclic_and_reproducible():
+    """Test that random DAGs are acyclic and seeded."""
+    tasks = random_dag(200, seed=7)
+    assert not detect_cycles(tasks)
+    assert [t.dependencies for t in tasks] == [t.dependencies for t in random_dag(200, seed=7)]
+
+@pytest.mark.parametrize("agent_name", ["DummyAgent", "SimulatedLatencyAgent"])
+def test_run_benchmark_reports_metrics(agent_name, registry_with_dummy_agent):
+    """Test that a small benchmark run completes and reports all metrics."""
+    result = run_benchmark("diamond", 10, agent_name)
+    assert result["status"] == "COMPLETED"
+    for metric in ("planning_time_s", "per_task_overhead_us", "throughput_tasks_per_s", "peak_memory_bytes"):
+        assert result[metric] >= 0
+
+def test_run_benchmark_leaves_project_state_alone(registry_with_dummy_agent):
+    """Test that a benchmark run uses its own session store and leaves the shared session and artifact dir untouched."""
+    before = (session_manager.get_current_session(), artifact_manager.artifact_dir)
+    with patch('src.session_manager.get_session_store', side_effect=AssertionError("project session store used")):
+        result = run_benchmark("chain", 5, track_memory=False)
+    assert result["status"] == "COMPLETED"
+    assert (session_manager.get_current_session(), artifact_manager.artifact_dir) == before
+
+def test_unknown_shape_raises():
+    """Test that an unknown shape is rejected."""
+    with pytest.raises(ValueError):
+        run_benchmark("hexagon", 10)
+
+def test_results_round_trip_and_compare(tmp_path, registry_with_dummy_agent):
+    """Test that reports round-trip through JSON and regressions are flagged."""
+    report = run_suite(["chain"], [5], ["DummyAgent"], track_memory=False)
+    path = tmp_path / "bench.json"
+    save_results(report, str(path))
+    baseline = load_results(str(path))
+    assert compare_results(baseline, baseline) == []
+
+    slower = {"results": [dict(baseline["results"][0], planning_time_s=baseline["results"][0]["planning_time_s"] * 10)]}
+    regressions = compare_results(baseline, slower, threshold=0.5)
+    assert len(regressions) == 1
+    assert "planning_time_s" in regressions[0]
+
+def test_construction_benchmark_reports_both_paths():
+    """Test that the construction benchmark times validated and trusted construction of each per-task model."""
+    results = run_construction_benchmark(iterations=100)
+    assert [entry["model"] for entry in results] == ["TaskSpec", "AgentResponse"]
+    for entry in results:
+        assert entry["validated_us"] > 0 and entry["trusted_us"] > 0
+        assert entry["saved_us"] == pytest.approx(entry["validated_us"] - entry["trusted_us"])
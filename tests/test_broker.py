@@ -0,0 +1,83 @@
+# tests/test_broker.py
+import time
+import pytest
+from src.distributed.broker import InProcessBroker
+from src.distributed.messages import decode_response, decode_task, encode_response, encode_task
+from src.distributed.redis_broker import RedisBroker
+from src.distributed.sqlite_broker import SQLiteBroker
+from src.models import AgentResponse, Artifact, TaskSpec
+
+@pytest.fixture(params=["inprocess", "sqlite", "redis"])
+def broker(request, tmp_path):
+    """Provides each broker backend with a limit of two deliveries per task."""
+    if request.param == "inprocess":
+        broker = InProcessBroker(max_deliveries=2)
+    elif request.param == "sqlite":
+        broker = SQLiteBroker(db_path=str(tmp_path / "broker.db"), max_deliveries=2)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        broker = RedisBroker(client=fakeredis.FakeRedis(), max_deliveries=2)
+    yield broker
+    broker.close()
+
+def test_lease_complete_and_take_result(broker):
+    """Test that tasks are leased in publish order and their results collected once."""
+    first = broker.publish("a", b"task-a")
+    second = broker.publish("b", b"task-b")
+    delivery = broker.lease("w1", lease_s=10)
+    assert (delivery.message_id, delivery.task_id, delivery.payload, delivery.attempt) == (first, "a", b"task-a", 1)
+    assert broker.lease("w2", lease_s=10).message_id == second
+    assert broker.lease("w3", lease_s=10) is None
+
+    assert broker.take_results([first]) == {}
+    assert broker.complete(first, "w1", b"result-a")
+    assert broker.take_results([first, second]) == {first: b"result-a"}
+    assert broker.take_results([first]) == {}
+
+def test_expired_lease_is_redelivered(broker):
+    """Test that a task whose worker stops heartbeating goes to another worker, and the first loses it."""
+    message_id = broker.publish("a", b"task-a")
+    broker.lease("dead", lease_s=0.05)
+    time.sleep(0.1)
+    delivery = broker.lease("alive", lease_s=10)
+    assert delivery.message_id == message_id
+    assert delivery.attempt == 2
+    assert not broker.heartbeat(message_id, "dead", lease_s=10)
+    assert not broker.complete(message_id, "dead", b"stale")
+    assert broker.heartbeat(message_id, "alive", lease_s=10)
+    assert broker.complete(message_id, "alive", b"fresh")
+    assert broker.take_results([message_id]) == {message_id: b"fresh"}
+
+def test_task_is_given_up_after_max_deliveries(broker):
+    """Test that a task is reported lost (None) once every allowed delivery expired."""
+    message_id = broker.publish("a", b"task-a")
+    for _ in range(2):
+        assert broker.lease("flaky", lease_s=0.05) is not None
+        time.sleep(0.1)
+    assert broker.lease("next", lease_s=10) is None
+    assert broker.take_results([message_id]) == {message_id: None}
+
+def test_cancel_withdraws_task(broker):
+    """Test that a cancelled task is not delivered and its worker loses the lease."""
+    queued = broker.publish("a", b"task-a")
+    running = broker.publish("b", b"task-b")
+    broker.cancel(queued)
+    assert broker.lease("w1", lease_s=10).message_id == running
+    broker.cancel(running)
+    assert not broker.heartbeat(running, "w1", lease_s=10)
+    assert not broker.complete(running, "w1", b"late")
+    assert broker.take_results([queued, running]) == {}
+
+def test_messages_round_trip_artifacts():
+    """Test that tasks and responses keep artifact payloads, including raw bytes, on the wire."""
+    upstream = Artifact(name="blob.bin", type="bytes", data=b"\x00\xff")
+    task = TaskSpec(id="t", name="t", description="", agent_name="A", input_data={"upstream_artifacts": {"dep": {"blob.bin": upstream}}, "n": 1})
+    decoded = decode_task(encode_task(task))
+    assert decoded.input_data["n"] == 1
+    assert bytes(decoded.input_data["upstream_artifacts"]["dep"]["blob.bin"].data) == b"\x00\xff"
+
+    response = AgentResponse(status="completed", output={"k": "v"}, artifacts=[
+        Artifact(name="out.json", type="json", data={"x": [1, 2]}),
+        Artifact(name="run.log", type="x-build-log", data="unregistered type, text data"),
+    ])
+    assert decode_response(encode_response(response)) == response
@@ -0,0 +1,107 @@
+# tests/test_cancellation.py
+import threading
+import time
+import pytest
+from src.cancellation import CancellationToken, TaskCancelled, current_token, use_token
+from src.executor import TaskExecutor
+from src.agents.base import Agent
+from src.models import AgentResponse, TaskSpec
+from src.orchestrator import Orchestrator
+from src.workflow.state import workflow_state_machine, WorkflowState
+
+pytestmark = pytest.mark.usefixtures("workflow_session")
+
+class SleepyAgent(Agent):
+    """Sleeps cooperatively for `input_data["sleep"]` seconds, raising TaskCancelled if cancelled."""
+    def __init__(self, name, runs):
+        super().__init__(name)
+        self.runs = runs
+
+    def run(self, task: TaskSpec) -> AgentResponse:
+        self.runs.append(task.id)
+        sleep = task.input_data.get("sleep", 0)
+        if isinstance(sleep, list):
+            sleep = sleep[min(self.runs.count(task.id), len(sleep)) - 1]
+        current_token().wait(sleep)
+        current_token().raise_if_cancelled()
+        return AgentResponse(status="completed")
+
+def task(id, sleep=0, deps=(), **kwargs):
+    return TaskSpec(id=id, name=id, description="", agent_name="Sleepy", input_data={"sleep": sleep}, dependencies=list(deps), **kwargs)
+
+def test_token_deadline_and_parent():
+    """Test that a token is cancelled by its deadline and by its parent's cancellation."""
+    parent = CancellationToken()
+    child = CancellationToken.with_timeout(10, parent=parent)
+    assert not child.cancelled
+    assert 9 < child.remaining() <= 10
+    parent.cancel("stop")
+    assert child.cancelled and child.reason == "stop"
+    with pytest.raises(TaskCancelled):
+        child.raise_if_cancelled()
+
+    expired = CancellationToken.with_timeout(0)
+    assert expired.cancelled and expired.reason == "deadline exceeded"
+
+def test_token_wait_wakes_on_cancel():
+    """Test that wait returns early once the token is cancelled from another thread."""
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel).start()
+    start = time.monotonic()
+    assert token.wait(5) is True
+    assert time.monotonic() - start < 1
+
+def test_current_token_is_thread_local():
+    """Test that use_token installs a token for the current thread only."""
+    token = CancellationToken()
+    seen = []
+    with use_token(token):
+        assert current_token() is token
+        worker = threading.Thread(target=lambda: seen.append(current_token()))
+        worker.start()
+        worker.join()
+    assert seen[0] is not token
+    assert not current_token().cancelled
+
+def test_executor_runs_under_token():
+    """Test that submitted callables see their token and a stuck worker does not block the next task."""
+    executor = TaskExecutor()
+    stuck = CancellationToken()
+    blocked = executor.submit(lambda: current_token().wait(5), token=stuck)
+    other = CancellationToken()
+    assert executor.submit(current_token, token=other).result(timeout=1) is other
+    stuck.cancel()
+    assert blocked.result(timeout=1) is True
+    executor.shutdown()
+
+def test_timed_out_task_frees_its_slot(agent_factory):
+    """Test that a task exceeding its timeout is cancelled and the next task runs without waiting for it."""
+    runs = []
+    tasks = [task("slow", sleep=5, timeout=0.1), task("fast")]
+    start = time.monotonic()
+    outcomes = Orchestrator(agent_factory(lambda name: SleepyAgent(name, runs)), failure_policy="continue_independent", max_parallel=1).run_workflow(tasks)
+    assert time.monotonic() - start < 2
+    assert outcomes["slow"].status == "failed"
+    assert "timed out" in outcomes["slow"].error
+    assert outcomes["fast"].status == "completed"
+    assert workflow_state_machine.get_state() == WorkflowState.FAILED
+
+def test_timed_out_task_is_retried(agent_factory):
+    """Test that a task with retries succeeds when a later attempt finishes within its timeout."""
+    runs = []
+    outcomes = Orchestrator(agent_factory(lambda name: SleepyAgent(name, runs))).run_workflow([task("flaky", sleep=[5, 0], timeout=0.1, retries=1)])
+    assert runs == ["flaky", "flaky"]
+    assert outcomes["flaky"].status == "completed"
+    assert outcomes["flaky"].attempts == 2
+    assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+
+def test_workflow_deadline_cancels_running_tasks(agent_factory):
+    """Test that passing the workflow deadline cancels in-flight tasks and skips the rest."""
+    runs = []
+    tasks = [task("a", sleep=5), task("b", deps=["a"])]
+    start = time.monotonic()
+    outcomes = Orchestrator(agent_factory(lambda name: SleepyAgent(name, runs)), deadline_s=0.1).run_workflow(tasks)
+    assert time.monotonic() - start < 2
+    assert outcomes["a"].status == "cancelled"
+    assert outcomes["b"].status == "skipped"
+    assert workflow_state_machine.get_state() == WorkflowState.FAILED
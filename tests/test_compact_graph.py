@@ -0,0 +1,91 @@
+# tests/test_compact_graph.py
+import tracemalloc
+import pytest
+from unittest.mock import MagicMock
+from src.models import TaskSpec
+from src.orchestrator import Orchestrator
+from src.task_dependencies import topological_sort
+from src.workflow.compact_graph import CompactGraph, TaskCounters
+from src.workflow.state import workflow_state_machine, WorkflowState
+from src.workflow_loader import workflow_loader
+
+pytestmark = pytest.mark.usefixtures("workflow_session")
+
+def task_dict(task_id, dependencies=(), **input_data):
+    return {"id": task_id, "name": task_id, "description": "", "agent_name": "DummyAgent",
+            "input_data": input_data, "dependencies": list(dependencies)}
+
+def test_adjacency_order_and_materialization():
+    """Test that dependencies, dependents and topological order match the task definitions."""
+    graph = CompactGraph([task_dict("d", ["b", "c"]), task_dict("b", ["a"]), task_dict("c", ["a", "ghost"]), task_dict("a", n=1)])
+    assert graph.dependency_ids("d") == ["b", "c"]
+    assert graph.dependency_ids("c") == ["a"] # Unknown dependencies are dropped
+    assert graph.dependents["a"] == ["b", "c"]
+    assert [graph.task_id(i) for i in graph.topological_order()] == ["a", "b", "c", "d"]
+    task = graph["a"]
+    assert isinstance(task, TaskSpec) and task.input_data == {"n": 1}
+    task.input_data["n"] = 2
+    assert graph["a"].input_data == {"n": 1} # Materialized specs do not alias the stored record
+
+def test_cycles_and_invalid_tasks_are_rejected():
+    """Test cycle detection and validation of raw task definitions."""
+    assert CompactGraph([task_dict("a", ["b"]), task_dict("b", ["a"])]).has_cycle()
+    with pytest.raises(ValueError, match="Invalid task definition"):
+        CompactGraph([{"id": "a"}])
+    with pytest.raises(ValueError, match="Duplicate"):
+        CompactGraph([task_dict("a"), task_dict("a")])
+
+def test_overlay_for_tasks_added_while_running():
+    """Test that added tasks, replaced tasks and added edges are visible through the graph's views."""
+    graph = CompactGraph([task_dict("a"), task_dict("b", ["a"])])
+    waiting = TaskCounters(graph)
+    waiting["b"] = 1
+    graph["x"] = TaskSpec(id="x", name="x", description="", agent_name="DummyAgent", dependencies=["a"])
+    graph.dependents.add("a", "x")
+    graph.dependents.add("x", "b")
+    graph["b"] = graph["b"].model_copy(update={"dependencies": ["a", "x"]})
+    waiting["x"] = 1
+    assert graph.dependents["a"] == ["b", "x"]
+    assert graph.dependency_ids("b") == ["a", "x"]
+    assert (waiting["b"], waiting["x"], len(graph)) == (1, 1, 3)
+    graph.dependents.discard("a", "x")
+    assert graph.dependents["a"] == ["b"]
+
+def test_topological_sort_matches_previous_ordering():
+    """Test that topological_sort keeps insertion order among ready tasks and returns the given objects."""
+    tasks = [TaskSpec(**task_dict(task_id, deps)) for task_id, deps in [("c", ["a"]), ("a", []), ("b", []), ("d", ["b", "c"])]]
+    ordered = topological_sort(tasks)
+    assert [t.id for t in ordered] == ["a", "b", "c", "d"]
+    assert ordered[0] is tasks[1]
+
+def test_orchestrator_runs_a_compact_graph():
+    """Test that a workflow given as a CompactGraph runs to completion."""
+    graph = CompactGraph([task_dict("a"), task_dict("b", ["a"]), task_dict("c", ["a"]), task_dict("d", ["b", "c"])])
+    outcomes = Orchestrator(MagicMock(**{"create_agent.return_value.run.return_value": MagicMock(status="completed", output={}, artifacts=[], new_tasks=[])})).run_workflow(graph)
+    assert {o.status for o in outcomes.values()} == {"completed"}
+    assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+
+def test_loader_builds_a_compact_graph():
+    """Test that the loader validates workflows into a CompactGraph."""
+    graph = workflow_loader.load_workflow_graph({"tasks": [task_dict("a"), task_dict("b", ["a"])]})
+    assert isinstance(graph, CompactGraph) and graph.dependents["a"] == ["b"]
+    with pytest.raises(ValueError, match="not one of its dependencies"):
+        workflow_loader.load_workflow_graph({"tasks": [dict(task_dict("b"), when={"a": "True"})]})
+
+def test_graph_is_smaller_than_task_specs():
+    """Test that a chain held as a CompactGraph takes a fraction of the memory of its TaskSpecs."""
+    size = 5000
+    definitions = [task_dict(f"t{i}", [f"t{i - 1}"] if i else []) for i in range(size)]
+    tracemalloc.start()
+    try:
+        specs = [TaskSpec(**d) for d in definitions]
+        specs_bytes = tracemalloc.get_traced_memory()[0]
+        del specs
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        graph = CompactGraph(definitions)
+        graph_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    assert len(graph) == size
+    assert graph_bytes < specs_bytes / 2
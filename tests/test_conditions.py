@@ -0,0 +1,78 @@
+# tests/test_conditions.py
+import pytest
+from src.agents.base import Agent
+from src.models import AgentResponse, TaskSpec
+from src.orchestrator import Orchestrator
+from src.workflow.conditions import evaluate_condition, validate_conditions
+from src.workflow.state import workflow_state_machine, WorkflowState
+
+pytestmark = pytest.mark.usefixtures("workflow_session")
+
+class ScriptedAgent(Agent):
+    """Returns the output and injected tasks given in its input_data, recording the tasks it ran."""
+    ran = []
+
+    def run(self, task: TaskSpec) -> AgentResponse:
+        ScriptedAgent.ran.append(task.id)
+        return AgentResponse(status="completed", output=task.input_data.get("output", {}),
+                             new_tasks=task.input_data.get("new_tasks", []))
+
+@pytest.fixture
+def factory(agent_factory):
+    ScriptedAgent.ran = []
+    return agent_factory(ScriptedAgent)
+
+def make_task(task_id, dependencies=(), **input_data):
+    return TaskSpec(id=task_id, name=task_id, description="", agent_name="Scripted", dependencies=list(dependencies), input_data=input_data)
+
+def test_evaluate_condition():
+    """Test lookups, comparisons, boolean operators and len() over an output."""
+    output = {"label": "urgent", "score": 0.9, "tags": ["a", "b"]}
+    assert evaluate_condition("output.label == 'urgent' and output['score'] >= 0.8", output)
+    assert evaluate_condition("'b' in output.tags and len(output.tags) == 2", output)
+    assert evaluate_condition("output.missing is None", output)
+    assert not evaluate_condition("not output.tags or output.label in ['low', 'normal']", output)
+
+@pytest.mark.parametrize("expression", ["__import__('os')", "output.label.upper()", "x == 1", "output ==", "[c for c in output]"])
+def test_unsafe_or_invalid_conditions_are_rejected(expression):
+    """Test that only the restricted expression language is accepted."""
+    with pytest.raises(ValueError):
+        evaluate_condition(expression, {})
+
+def test_condition_must_be_on_a_dependency():
+    """Test that a condition names one of the task's dependencies."""
+    with pytest.raises(ValueError, match="not one of its dependencies"):
+        validate_conditions(make_task("b", ["a"]).model_copy(update={"when": {"c": "True"}}))
+
+def test_branch_not_taken_is_skipped_with_descendants(factory):
+    """Test that only the branch whose condition holds runs, and the other is skipped with its descendants."""
+    tasks = [
+        make_task("classify", output={"label": "urgent"}),
+        make_task("escalate", ["classify"]).model_copy(update={"when": {"classify": "output.label == 'urgent'"}}),
+        make_task("archive", ["classify"]).model_copy(update={"when": {"classify": "output.label != 'urgent'"}}),
+        make_task("notify", ["archive"]),
+    ]
+    outcomes = Orchestrator(factory).run_workflow(tasks)
+    assert ScriptedAgent.ran == ["classify", "escalate"]
+    assert {task_id: o.status for task_id, o in outcomes.items()} == {
+        "classify": "completed", "escalate": "completed", "archive": "skipped", "notify": "skipped",
+    }
+    assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+
+def test_injected_tasks_run_before_dependents(factory):
+    """Test that tasks returned by an agent are spliced in between it and its dependents."""
+    injected = [make_task("sub1"), make_task("sub2", ["sub1"])]
+    tasks = [make_task("plan", new_tasks=injected), make_task("summarize", ["plan"])]
+    outcomes = Orchestrator(factory).run_workflow(tasks)
+    assert ScriptedAgent.ran == ["plan", "sub1", "sub2", "summarize"]
+    assert {o.status for o in outcomes.values()} == {"completed"}
+    assert set(outcomes) == {"plan", "sub1", "sub2", "summarize"}
+
+def test_injection_that_creates_a_cycle_fails_the_producer(factory):
+    """Test that injected tasks depending on the producer's dependents are rejected."""
+    tasks = [make_task("plan", new_tasks=[make_task("loop", ["summarize"])]), make_task("summarize", ["plan"])]
+    outcomes = Orchestrator(factory).run_workflow(tasks)
+    assert outcomes["plan"].status == "failed"
+    assert "circular dependency" in outcomes["plan"].error
+    assert "loop" not in outcomes
+    assert ScriptedAgent.ran == ["plan"]
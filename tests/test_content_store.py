@@ -0,0 +1,80 @@
+# tests/test_content_store.py
+import pytest
+import os
+from src.content_store import ContentAddressedStore
+
+@pytest.fixture
+def store(tmp_path):
+    """Provides a ContentAddressedStore rooted in a temporary directory."""
+    store = ContentAddressedStore(str(tmp_path / "cas"))
+    yield store
+    store.close()
+
+def test_put_is_keyed_by_sha256_and_sharded(store):
+    """Test that blobs are stored under sharded SHA-256 paths."""
+    digest = store.put(b"hello")
+    assert digest == "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824"
+    path = store.blob_path(digest)
+    assert path.endswith(os.path.join("objects", "2c", "f2", digest))
+    assert store.read(digest) == b"hello"
+
+def test_identical_content_is_written_once(store):
+    """Test that storing the same content twice does not rewrite the blob."""
+    digest = store.put(b"same")
+    mtime = os.stat(store.blob_path(digest)).st_mtime_ns
+    assert store.put(b"same") == digest
+    assert os.stat(store.blob_path(digest)).st_mtime_ns == mtime
+
+def test_manifests_point_at_hashes(store):
+    """Test that per-session manifests map names to digests."""
+    digest = store.put(b"report")
+    store.link("s1", "report.txt", digest, "text/plain")
+    store.link("s2", "copy.txt", digest, "text/plain")
+    assert store.lookup("s1", "report.txt") == {"digest": digest, "type": "text/plain", "serializer": None}
+    assert store.manifest("s2") == {"copy.txt": {"digest": digest, "type": "text/plain"}}
+    assert store.lookup("s1", "missing") is None
+
+def test_indexes_without_a_serializer_column_are_upgraded(tmp_path):
+    """Test that an index created before serializers were recorded gains the column and keeps its entries."""
+    import sqlite3
+    root = tmp_path / "old"
+    root.mkdir()
+    conn = sqlite3.connect(str(root / "index.db"))
+    conn.executescript(
+        "CREATE TABLE blobs (digest TEXT PRIMARY KEY, size INTEGER NOT NULL, refcount INTEGER NOT NULL DEFAULT 0);"
+        "CREATE TABLE manifests (session_id TEXT NOT NULL, name TEXT NOT NULL, digest TEXT NOT NULL, type TEXT NOT NULL, "
+        "PRIMARY KEY (session_id, name));"
+        "INSERT INTO blobs VALUES ('d', 1, 1); INSERT INTO manifests VALUES ('s', 'a.txt', 'd', 'text');"
+    )
+    conn.close()
+    store = ContentAddressedStore(str(root))
+    assert store.lookup("s", "a.txt") == {"digest": "d", "type": "text", "serializer": None}
+    store.link("s", "b.log", "d", "x-log", "text")
+    assert store.lookup("s", "b.log")["serializer"] == "text"
+    store.close()
+
+def test_garbage_collection_respects_references(store):
+    """Test that shared blobs survive until the last referencing session is released."""
+    shared = store.put(b"shared")
+    only_s1 = store.put(b"only s1")
+    store.link("s1", "a", shared, "bytes")
+    store.link("s1", "b", only_s1, "bytes")
+    store.link("s2", "a", shared, "bytes")
+
+    assert store.collect_garbage() == []
+    store.release_session("s1")
+    assert store.collect_garbage() == [only_s1]
+    assert store.read(shared) == b"shared"
+    assert store.read(only_s1) is None
+
+    store.release_session("s2")
+    assert store.collect_garbage() == [shared]
+
+def test_relinking_a_name_releases_the_old_blob(store):
+    """Test that overwriting a manifest entry drops the reference to the previous blob."""
+    old = store.put(b"v1")
+    new = store.put(b"v2")
+    store.link("s1", "out", old, "bytes")
+    store.link("s1", "out", new, "bytes")
+    assert store.collect_garbage() == [old]
+    assert store.lookup("s1", "out")["digest"] == new
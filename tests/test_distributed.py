@@ -0,0 +1,118 @@
+# tests/test_distributed.py
+import json
+import multiprocessing
+import sqlite3
+import sys
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from src.agents.base import Agent
+from src.cli import main_cli
+from src.distributed.broker import InProcessBroker
+from src.distributed.messages import decode_response, encode_task
+from src.distributed.sqlite_broker import SQLiteBroker
+from src.distributed.worker import Worker
+from src.models import AgentResponse, Artifact, TaskSpec
+from src.orchestrator import Orchestrator
+from src.workflow.state import workflow_state_machine, WorkflowState
+
+pytestmark = pytest.mark.usefixtures("workflow_session")
+
+def run_worker_process(db_path):
+    """Entry point of a worker process: serves DummyAgent and SimulatedLatencyAgent tasks until terminated."""
+    from benchmarks.agents import SimulatedLatencyAgent, SIMULATED_LATENCY_AGENT_SPEC
+    from src.agents.registry import agent_registry
+    agent_registry.register_agent_spec(SIMULATED_LATENCY_AGENT_SPEC)
+    agent_registry.register_agent_class(SimulatedLatencyAgent)
+    Worker(SQLiteBroker(db_path=db_path), lease_s=0.5, heartbeat_s=0.1, poll_interval_s=0.01).run()
+
+def start_workers(db_path, count):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=run_worker_process, args=(db_path,), daemon=True) for _ in range(count)]
+    for process in processes:
+        process.start()
+    return processes
+
+class UpstreamAgent(Agent):
+    """Produces a bytes artifact, and fails unless it received every dependency's artifact."""
+    def run(self, task: TaskSpec) -> AgentResponse:
+        upstream = task.input_data.get("upstream_artifacts", {})
+        if any(bytes(upstream.get(dep, {}).get(f"{dep}.bin").data) != dep.encode() for dep in task.dependencies):
+            return AgentResponse(status="failed", output={"error_message": "missing upstream artifact"})
+        return AgentResponse(status="completed", artifacts=[Artifact(name=f"{task.id}.bin", type="bytes", data=task.id.encode())])
+
+def test_orchestrator_runs_tasks_on_worker_threads(agent_factory):
+    """Test that tasks published to an in-process broker run on workers and dependents get upstream artifacts."""
+    factory = agent_factory(UpstreamAgent)
+    broker = InProcessBroker()
+    stop = threading.Event()
+    for _ in range(2):
+        threading.Thread(target=Worker(broker, factory, poll_interval_s=0.01).run, args=(stop,), daemon=True).start()
+    tasks = [
+        TaskSpec(id="a", name="a", description="", agent_name="Upstream"),
+        TaskSpec(id="b", name="b", description="", agent_name="Upstream", dependencies=["a"]),
+    ]
+    try:
+        outcomes = Orchestrator(MagicMock(), broker=broker, max_parallel=2).run_workflow(tasks)
+    finally:
+        stop.set()
+    assert {o.status for o in outcomes.values()} == {"completed"}
+    assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+
+def test_orchestrator_with_worker_processes(tmp_path):
+    """Test that a fan-out workflow completes on two worker processes sharing a SQLite broker."""
+    db_path = str(tmp_path / "broker.db")
+    broker = SQLiteBroker(db_path=db_path)
+    processes = start_workers(db_path, 2)
+    tasks = [TaskSpec(id="root", name="root", description="", agent_name="DummyAgent")]
+    tasks += [TaskSpec(id=f"leaf{i}", name=f"leaf{i}", description="", agent_name="DummyAgent", dependencies=["root"]) for i in range(6)]
+    try:
+        outcomes = Orchestrator(MagicMock(), broker=broker, max_parallel=4, deadline_s=60).run_workflow(tasks)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+    assert {o.status for o in outcomes.values()} == {"completed"}
+    assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+
+def test_task_of_killed_worker_is_redelivered(tmp_path):
+    """Test that a task held by a worker process that dies is re-delivered to another worker."""
+    db_path = str(tmp_path / "broker.db")
+    broker = SQLiteBroker(db_path=db_path)
+    task = TaskSpec(id="slow", name="slow", description="", agent_name="SimulatedLatencyAgent", input_data={"latency_s": 1.0})
+    message_id = broker.publish(task.id, encode_task(task))
+
+    [doomed] = start_workers(db_path, 1)
+    conn = sqlite3.connect(db_path)
+    deadline = time.monotonic() + 30
+    while conn.execute("SELECT status FROM broker_messages WHERE id = ?", (message_id,)).fetchone()[0] != "leased":
+        assert time.monotonic() < deadline, "worker never leased the task"
+        time.sleep(0.01)
+    doomed.kill()
+    doomed.join()
+
+    [survivor] = start_workers(db_path, 1)
+    try:
+        while not (results := broker.take_results([message_id])):
+            assert time.monotonic() < deadline, "task was not re-delivered"
+            time.sleep(0.05)
+    finally:
+        survivor.terminate()
+        survivor.join()
+    assert decode_response(results[message_id]).status == "completed"
+
+def test_cli_inprocess_broker_needs_workers_and_is_closed(tmp_path):
+    """Test that 'run --broker inprocess' refuses to start without workers, and closes the broker after the run."""
+    workflow = tmp_path / "workflow.json"
+    workflow.write_text(json.dumps({"tasks": [{"id": "a", "name": "a", "description": "", "agent_name": "DummyAgent"}]}))
+    with patch.object(sys, "argv", ["main.py", "run", str(workflow), "--broker", "inprocess"]), pytest.raises(SystemExit) as exit_info:
+        main_cli()
+    assert exit_info.value.code == 2
+
+    broker = InProcessBroker()
+    broker.close = MagicMock()
+    with patch.object(sys, "argv", ["main.py", "run", str(workflow), "--broker", "inprocess", "--workers", "1", "--timeout", "30"]), \
+         patch("src.cli.create_broker", return_value=broker):
+        main_cli()
+    broker.close.assert_called_once()
@@ -0,0 +1,79 @@
+# tests/test_failure_policy.py
+import threading
+import pytest
+from src.agents.base import Agent
+from src.models import AgentResponse, TaskSpec
+from src.orchestrator import Orchestrator
+from src.task_manager import task_queue
+from src.workflow.state import workflow_state_machine, WorkflowState, FailurePolicy
+
+pytestmark = pytest.mark.usefixtures("workflow_session")
+
+class ScriptedAgent(Agent):
+    """Fails the tasks listed in `failures` (task_id -> number of failing attempts)."""
+    def __init__(self, name, failures, runs):
+        super().__init__(name)
+        self.failures = failures
+        self.runs = runs
+
+    def run(self, task: TaskSpec) -> AgentResponse:
+        self.runs.append(task.id)
+        if self.failures.get(task.id, 0) > 0:
+            self.failures[task.id] -= 1
+            return AgentResponse(status="failed", output={"error_message": f"{task.id} broke"})
+        return AgentResponse(status="completed")
+
+def fan_out_tasks():
+    """root -> (bad -> bad_child), (good -> good_child)"""
+    def task(id, deps=()):
+        return TaskSpec(id=id, name=id, description="", agent_name="Scripted", dependencies=list(deps))
+    return [task("root"), task("bad", ["root"]), task("bad_child", ["bad"]), task("good", ["root"]), task("good_child", ["good"])]
+
+def test_fail_fast_stops_dispatching(agent_factory):
+    """Test that fail_fast dispatches nothing after the first failure."""
+    runs = []
+    failures = {"root": 1}
+    outcomes = Orchestrator(agent_factory(lambda name: ScriptedAgent(name, failures, runs)), failure_policy="fail_fast").run_workflow(fan_out_tasks())
+    assert runs == ["root"]
+    assert outcomes["root"].status == "failed"
+    assert {outcomes[t].status for t in ("bad", "bad_child", "good", "good_child")} == {"skipped"}
+    assert workflow_state_machine.get_state() == WorkflowState.FAILED
+    assert task_queue.get_next_task() is None
+
+def test_continue_independent_prunes_only_descendants(agent_factory):
+    """Test that continue_independent skips the failed task's descendants and finishes the rest."""
+    runs = []
+    failures = {"bad": 1}
+    outcomes = Orchestrator(agent_factory(lambda name: ScriptedAgent(name, failures, runs)), failure_policy=FailurePolicy.CONTINUE_INDEPENDENT).run_workflow(fan_out_tasks())
+    assert sorted(runs) == ["bad", "good", "good_child", "root"]
+    assert {t: o.status for t, o in outcomes.items()} == {
+        "root": "completed", "bad": "failed", "bad_child": "skipped", "good": "completed", "good_child": "completed",
+    }
+    assert outcomes["bad"].error == "bad broke"
+    assert workflow_state_machine.get_state() == WorkflowState.FAILED
+
+def test_retry_n_retries_then_succeeds(monkeypatch, agent_factory):
+    """Test that retry_n re-runs a failed task up to TASK_MAX_RETRIES times."""
+    monkeypatch.setattr('src.config.settings.TASK_MAX_RETRIES', 2)
+    runs = []
+    failures = {"bad": 2}
+    outcomes = Orchestrator(agent_factory(lambda name: ScriptedAgent(name, failures, runs)), failure_policy="retry_n").run_workflow(fan_out_tasks())
+    assert runs.count("bad") == 3
+    assert outcomes["bad"].status == "completed"
+    assert outcomes["bad"].attempts == 3
+    assert outcomes["bad_child"].status == "completed"
+    assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+
+def test_independent_tasks_run_in_parallel(agent_factory):
+    """Test that ready tasks run concurrently up to max_parallel."""
+    barrier = threading.Barrier(3, timeout=5)
+
+    class Waiting(Agent):
+        def run(self, task: TaskSpec) -> AgentResponse:
+            barrier.wait() # Deadlocks unless all three tasks run at once
+            return AgentResponse(status="completed")
+
+    factory = agent_factory(Waiting)
+    tasks = [TaskSpec(id=f"t{i}", name=f"t{i}", description="", agent_name="Waiting") for i in range(3)]
+    outcomes = Orchestrator(factory, max_parallel=3).run_workflow(tasks)
+    assert {o.status for o in outcomes.values()} == {"completed"}
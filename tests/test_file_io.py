@@ -1,7 +1,7 @@
 # tests/test_file_io.py
 import pytest
 import os
-from src.file_io import read_file, write_file
+from src.file_io import read_file, write_file, atomic_write_file, open_stream, iter_chunks, write_chunks, copy_file, DEFAULT_FILE_MODE
 
 def test_write_read_text_file(tmp_path):
     """Test writing and reading a text file."""
@@ -28,3 +28,71 @@ def test_write_error(tmp_path):
     read_only_dir.mkdir(mode=0o555) # r-xr-xr-x
     file_path = read_only_dir / "cant_write.txt"
     assert not write_file(str(file_path), "some content")
+
+def test_atomic_write_replaces_file(tmp_path):
+    """Test that an atomic write replaces existing content and leaves no temp files."""
+    file_path = tmp_path / "atomic.txt"
+    file_path.write_text("old")
+    assert atomic_write_file(str(file_path), "new")
+    assert read_file(str(file_path)) == "new"
+    assert os.listdir(tmp_path) == ["atomic.txt"]
+
+def test_atomic_write_error(tmp_path):
+    """Test that an atomic write into a missing directory returns False."""
+    assert not atomic_write_file(str(tmp_path / "missing" / "file.bin"), b"data", fsync=False)
+
+def test_iter_chunks_bounds_chunk_size(tmp_path):
+    """Test that iter_chunks yields the whole file in chunks no larger than requested."""
+    file_path = tmp_path / "data.bin"
+    content = os.urandom(10_000)
+    file_path.write_bytes(content)
+    chunks = list(iter_chunks(str(file_path), chunk_size=4096))
+    assert [len(c) for c in chunks] == [4096, 4096, 1808]
+    assert b"".join(chunks) == content
+
+def test_streaming_helpers_raise_on_missing_file(tmp_path):
+    """Test that the streaming helpers raise instead of returning None."""
+    missing = str(tmp_path / "missing.txt")
+    with pytest.raises(FileNotFoundError):
+        open_stream(missing)
+    with pytest.raises(FileNotFoundError):
+        list(iter_chunks(missing))
+    with pytest.raises(FileNotFoundError):
+        copy_file(missing, str(tmp_path / "copy.txt"))
+
+def test_write_chunks_is_atomic(tmp_path):
+    """Test that a failing chunk iterator leaves the original file untouched."""
+    file_path = tmp_path / "out.bin"
+    file_path.write_bytes(b"original")
+    def chunks():
+        yield b"partial"
+        raise OSError("producer failed")
+    with pytest.raises(OSError):
+        write_chunks(str(file_path), chunks(), fsync=False)
+    assert file_path.read_bytes() == b"original"
+    assert os.listdir(tmp_path) == ["out.bin"]
+    assert write_chunks(str(file_path), [b"a", b"bc"], fsync=False) == 3
+    assert file_path.read_bytes() == b"abc"
+
+def test_copy_file(tmp_path):
+    """Test that copy_file reproduces the source byte for byte."""
+    src = tmp_path / "src.bin"
+    content = os.urandom(3 * 1024 * 1024 + 17)
+    src.write_bytes(content)
+    dst = tmp_path / "dst.bin"
+    assert copy_file(str(src), str(dst)) == len(content)
+    assert dst.read_bytes() == content
+
+def test_atomic_writes_get_the_default_file_mode(tmp_path):
+    """Test that files renamed into place get the mode open() would give them, not mkstemp's 0600."""
+    from src.artifact_writer import ArtifactWriter
+    plain = tmp_path / "plain.txt"
+    plain.write_text("x")
+    written, copied = str(tmp_path / "written.bin"), str(tmp_path / "copied.bin")
+    write_chunks(written, [b"data"], fsync=False)
+    copy_file(written, copied)
+    writer = ArtifactWriter(num_threads=1, fsync=False)
+    stored = writer.submit(str(tmp_path / "stored.bin"), b"data").result(timeout=5)
+    writer.close()
+    modes = {path: os.stat(path).st_mode & 0o777 for path in (str(plain), written, copied, stored)}
+    assert set(modes.values()) == {DEFAULT_FILE_MODE}
@@ -0,0 +1,159 @@
+# tests/test_mapping.py
+import io
+import json
+import pytest
+from unittest.mock import patch
+from src.agents.base import Agent
+from src.models import AgentResponse, Artifact, MapSpec, TaskSpec
+from src.orchestrator import Orchestrator
+from src.workflow.mapping import MAP_OUTPUTS_KEY, MapExpansion, _iter_json_array
+from src.workflow_loader import workflow_loader
+
+pytestmark = pytest.mark.usefixtures("workflow_session")
+
+@pytest.fixture(autouse=True)
+def map_inputs_in_tmp_path(tmp_path):
+    """Resolves map input files relative to the temporary directory."""
+    with patch('src.workflow.mapping.get_root_dir', return_value=str(tmp_path)):
+        yield
+
+class MathAgent(Agent):
+    """Squares map items, sums map outputs, emits a list artifact, or reports what it was given."""
+    seen = []
+    received = {}
+
+    def run(self, task: TaskSpec) -> AgentResponse:
+        MathAgent.seen.append(task.id)
+        data = task.input_data
+        if "n" in data:
+            if data["n"] == data.get("fail_on"):
+                return AgentResponse(status="failed", output={"error_message": f"bad item {data['n']}"})
+            return AgentResponse(status="completed", output={"square": int(data["n"]) ** 2})
+        if MAP_OUTPUTS_KEY in data:
+            total = sum(o["square"] for o in data[MAP_OUTPUTS_KEY])
+            return AgentResponse(status="completed", artifacts=[Artifact(name="total.json", type="json", data={"total": total})])
+        if data.get("emit"):
+            return AgentResponse(status="completed", artifacts=[Artifact(name="numbers.json", type="json", data=data["emit"])])
+        MathAgent.received[task.id] = {dep: {name: a.data for name, a in artifacts.items()}
+                                       for dep, artifacts in data.get("upstream_artifacts", {}).items()}
+        return AgentResponse(status="completed")
+
+@pytest.fixture
+def factory(agent_factory):
+    MathAgent.seen, MathAgent.received = [], {}
+    return agent_factory(MathAgent)
+
+def map_task(task_id="squares", **map_options):
+    return TaskSpec(id=task_id, name=task_id, description="", agent_name="Math", map=MapSpec(item_key="n", **map_options))
+
+def test_map_over_file_with_reduce(tmp_path, factory):
+    """Test that each line of a JSON-lines file runs as an item, and the reduce result reaches dependents."""
+    (tmp_path / "numbers.jsonl").write_text("\n".join(json.dumps(n) for n in range(1, 11)))
+    tasks = [
+        map_task(file="numbers.jsonl", chunk_size=3, reduce={"agent_name": "Math"}),
+        TaskSpec(id="report", name="report", description="", agent_name="Math", dependencies=["squares"]),
+    ]
+    outcomes = Orchestrator(factory, max_parallel=2).run_workflow(tasks)
+    assert set(outcomes) == {"squares", "report"}
+    assert {o.status for o in outcomes.values()} == {"completed"}
+    assert sorted(t for t in MathAgent.seen if t.startswith("squares[")) == sorted(f"squares[{i}]" for i in range(10))
+    assert MathAgent.seen[-2:] == ["squares", "report"] # The reduce task runs under the map task's id
+    assert MathAgent.received["report"] == {"squares": {"total.json": {"total": 385}}}
+
+def test_map_over_upstream_artifact_and_glob(tmp_path, factory):
+    """Test that items can come from a dependency's artifact or from files matching a glob."""
+    for name in ("a.txt", "b.txt", "c.log"):
+        (tmp_path / name).write_text(name)
+    tasks = [
+        TaskSpec(id="source", name="source", description="", agent_name="Math", input_data={"emit": [2, 3]}),
+        map_task(artifact="source/numbers.json", reduce={"agent_name": "Math"}).model_copy(update={"dependencies": ["source"]}),
+        TaskSpec(id="files", name="files", description="", agent_name="Math", map=MapSpec(glob="*.txt", item_key="path")),
+    ]
+    outcomes = Orchestrator(factory, max_parallel=4).run_workflow(tasks)
+    assert {o.status for o in outcomes.values()} == {"completed"}
+    assert sorted(t for t in MathAgent.seen if "[" in t) == ["files[0]", "files[1]", "squares[0]", "squares[1]"]
+
+def test_failed_item_fails_map_and_prunes_dependents(tmp_path, factory):
+    """Test that a failed item fails its map task, other items still run, and dependents are skipped."""
+    (tmp_path / "numbers.txt").write_text("1\n2\n3\n4\n")
+    task = map_task(file="numbers.txt", chunk_size=2)
+    task = task.model_copy(update={"input_data": {"fail_on": "2"}})
+    tasks = [task, TaskSpec(id="after", name="after", description="", agent_name="Math", dependencies=["squares"])]
+    outcomes = Orchestrator(factory, failure_policy="continue_independent").run_workflow(tasks)
+    assert outcomes["squares"].status == "failed"
+    assert "1 of 4 item(s) failed" in outcomes["squares"].error
+    assert outcomes["after"].status == "skipped"
+    assert len([t for t in MathAgent.seen if t.startswith("squares[")]) == 4
+
+def test_items_are_checkpointed_per_chunk_and_kept_off_the_artifact_bus(tmp_path, agent_factory):
+    """Test that a map task is checkpointed once per chunk of items, and item artifacts are stored but not cached."""
+    (tmp_path / "numbers.txt").write_text("\n".join(str(n) for n in range(10)))
+
+    class ItemAgent(Agent):
+        def run(self, task: TaskSpec) -> AgentResponse:
+            return AgentResponse(status="completed", artifacts=[Artifact(name=f"item{task.input_data['n']}.txt", type="text", data="x")])
+
+    with patch('src.session_manager.session_manager.checkpoint_task') as checkpoint, \
+         patch('src.session_manager.session_manager.add_artifact') as add_artifact, \
+         patch('src.scheduler.artifact_bus.publish') as publish:
+        outcomes = Orchestrator(agent_factory(ItemAgent)).run_workflow([map_task(file="numbers.txt", chunk_size=4)])
+    assert outcomes["squares"].status == "completed"
+    assert [c.args[:2] for c in checkpoint.call_args_list] == [("squares", "in_progress")] * 2 + [("squares", "completed")]
+    assert checkpoint.call_args_list[1].args[2] == {"items": 10, "finished": 8, "failed": 0}
+    assert add_artifact.call_count == 10
+    publish.assert_not_called()
+
+def test_expansion_is_lazy_and_bounded():
+    """Test that items are pulled from the collection only as earlier ones finish."""
+    pulled = []
+    def items():
+        for n in range(10):
+            pulled.append(n)
+            yield n
+    expansion = MapExpansion(map_task(file="unused", chunk_size=4), items())
+    first = expansion.expand()
+    assert [t.id for t in first] == [f"squares[{i}]" for i in range(4)]
+    assert len(pulled) == 4 and first[0].map is None and first[0].input_data["n"] == 0
+    expansion.record(first[0].id, {"square": 0})
+    assert expansion.expand() == [] # Three of four still pending
+    expansion.record(first[1].id, {"square": 1})
+    assert [t.id for t in expansion.expand()] == ["squares[4]", "squares[5]"]
+    assert len(pulled) == 6 and not expansion.done
+
+def test_loader_rejects_ambiguous_map():
+    """Test that a map task must name exactly one collection."""
+    data = {"tasks": [{"id": "m", "name": "m", "description": "", "agent_name": "Math", "map": {"file": "a", "glob": "*"}}]}
+    with pytest.raises(ValueError, match="exactly one"):
+        workflow_loader.load_workflow(data)
+
+def test_map_inputs_must_stay_under_the_root_dir(tmp_path, factory):
+    """Test that absolute or '..' map paths are rejected at load time, and symlinks out of the root fail the map."""
+    for map_spec in ({"file": "/etc/passwd"}, {"file": "../secret.txt"}, {"glob": "data/../../*"}):
+        data = {"tasks": [{"id": "m", "name": "m", "description": "", "agent_name": "Math", "map": map_spec}]}
+        with pytest.raises(ValueError, match="relative to the root dir"):
+            workflow_loader.load_workflow(data)
+
+    root = tmp_path / "root"
+    root.mkdir()
+    (tmp_path / "secret.txt").write_text("1\n2\n")
+    (root / "numbers.txt").symlink_to(tmp_path / "secret.txt")
+    with patch('src.workflow.mapping.get_root_dir', return_value=str(root)):
+        outcomes = Orchestrator(factory).run_workflow([map_task(file="numbers.txt")])
+    assert outcomes["squares"].status == "failed"
+    assert "outside the root dir" in outcomes["squares"].error
+    assert MathAgent.seen == []
+
+def test_json_arrays_are_streamed():
+    """Test that JSON array items are decoded as the file is read, across chunk boundaries."""
+    items = [12345, -1.5e3, "a, ]b", {"x": [1, {"y": "]"}]}, None, []] * 100
+    text = json.dumps(items, indent=1)
+    stream = io.StringIO(text)
+    read = []
+    stream_read = stream.read
+    stream.read = lambda size: read.append(size) or stream_read(size)
+    parsed = _iter_json_array(stream, chunk_size=7)
+    assert next(parsed) == 12345
+    assert sum(read) < 20 # Only the first chunks were read
+    assert [12345, *parsed] == items
+    with pytest.raises(ValueError, match="must hold a list"):
+        list(_iter_json_array(io.StringIO('{"a": 1}')))
@@ -0,0 +1,110 @@
+# tests/test_mock_llm.py
+import json
+import time
+import pytest
+from src.cancellation import CancellationToken, TaskCancelled, use_token
+from src.config import settings
+from src.llms.client import LLMClient
+from src.llms.mock import MockLLMProvider, load_recordings
+from src.llms.provider import LLMProviderError, RateLimitError
+from benchmarks.harness import run_mock_llm_benchmark
+
+def test_latency_distributions_are_seeded():
+    """Test that each distribution draws plausible latencies and the same seed reproduces them."""
+    import random
+    fixed = MockLLMProvider(latency="fixed", latency_s=0.2)
+    assert fixed.sample_latency(random.Random(1)) == 0.2
+    lognormal = MockLLMProvider(latency="lognormal", latency_s=0.2, latency_sigma=0.5)
+    draws = sorted(lognormal.sample_latency(random.Random(i)) for i in range(1001))
+    assert draws[500] == pytest.approx(0.2, rel=0.15)
+    pareto = MockLLMProvider(latency="pareto", latency_s=0.1, pareto_alpha=1.5)
+    draws = [pareto.sample_latency(random.Random(i)) for i in range(1000)]
+    assert min(draws) >= 0.1 and max(draws) > 1.0 # Heavy tail: some draws are ten times the minimum
+    with pytest.raises(ValueError, match="Unknown latency distribution"):
+        MockLLMProvider(latency="uniform")
+
+def test_generate_waits_for_latency_and_tokens():
+    """Test that a response takes the latency plus its tokens at the configured rate."""
+    provider = MockLLMProvider(latency_s=0.05, tokens_per_s=200)
+    start = time.perf_counter()
+    response = provider.generate("ping")
+    elapsed = time.perf_counter() - start
+    assert response == "Mock response to: ping" # 6 tokens: 0.03s at 200 tokens/s
+    assert 0.07 <= elapsed < 0.5
+
+def test_stream_yields_tokens_that_join_to_the_response():
+    """Test that streaming splits the response into tokens, paced after the first."""
+    provider = MockLLMProvider(tokens_per_s=1000)
+    chunks = list(provider.stream("Classify: printer on fire!"))
+    assert len(chunks) > 5
+    assert "".join(chunks) == provider.generate("Classify: printer on fire!")
+
+def test_failures_are_injected_at_the_configured_rates():
+    """Test that rate-limit and error rates are honoured and reproducible per prompt and attempt."""
+    def outcomes(provider):
+        results = []
+        for i in range(400):
+            try:
+                provider.generate(f"prompt {i}")
+                results.append("ok")
+            except RateLimitError as e:
+                assert e.retry_after is not None
+                results.append("429")
+            except LLMProviderError:
+                results.append("error")
+        return results
+    provider = MockLLMProvider(error_rate=0.1, rate_limit_rate=0.2, seed=3)
+    results = outcomes(provider)
+    assert 40 < results.count("429") < 120 and 15 < results.count("error") < 70
+    assert results == outcomes(MockLLMProvider(error_rate=0.1, rate_limit_rate=0.2, seed=3))
+    stats = provider.stats()
+    assert stats["requests"] == 400 and stats["completed"] == results.count("ok")
+
+def test_retries_get_fresh_draws():
+    """Test that retrying a failed prompt eventually succeeds."""
+    provider = MockLLMProvider(error_rate=0.5, seed=1)
+    for attempt in range(20):
+        try:
+            assert provider.generate("flaky") == "Mock response to: flaky"
+            break
+        except LLMProviderError:
+            continue
+    assert provider.stats()["completed"] == 1
+
+def test_cancellation_interrupts_the_latency():
+    """Test that a cancelled task stops waiting for the mock response."""
+    provider = MockLLMProvider(latency_s=5.0)
+    start = time.perf_counter()
+    with use_token(CancellationToken.with_timeout(0.05)):
+        with pytest.raises(TaskCancelled):
+            provider.generate("slow")
+    assert time.perf_counter() - start < 1.0
+
+def test_recorded_responses_are_replayed(tmp_path):
+    """Test that recordings load from JSON or JSON lines and are replayed for their prompts."""
+    as_object = tmp_path / "recordings.json"
+    as_object.write_text(json.dumps({"Classify: printer on fire": '{"label": "urgent"}'}))
+    as_lines = tmp_path / "recordings.jsonl"
+    as_lines.write_text(json.dumps({"prompt": "Classify: printer on fire", "response": '{"label": "urgent"}'}) + "\n")
+    assert load_recordings(str(as_object)) == load_recordings(str(as_lines))
+    provider = MockLLMProvider(recordings=load_recordings(str(as_lines)))
+    assert provider.generate("Classify: printer on fire") == '{"label": "urgent"}'
+    assert provider.generate("Something else") == "Mock response to: Something else"
+    assert provider.stats()["replayed"] == 1
+    (tmp_path / "broken.json").write_text("[1, 2]")
+    with pytest.raises(ValueError, match="Invalid mock LLM recordings"):
+        load_recordings(str(tmp_path / "broken.json"))
+
+def test_llm_client_registers_the_mock_provider(monkeypatch):
+    """Test that "mock" in ACTIVE_LLM_PROVIDERS initializes a MockLLMProvider from the settings."""
+    monkeypatch.setattr(settings, "ACTIVE_LLM_PROVIDERS", "mock")
+    monkeypatch.setattr(settings, "MOCK_LLM_LATENCY_S", 0.01)
+    provider = LLMClient().get_provider("mock")
+    assert isinstance(provider, MockLLMProvider) and provider.latency_s == 0.01
+
+def test_mock_llm_benchmark_reports_provider_stats(tmp_path, monkeypatch):
+    """Test that the harness runs a workflow against the mock provider and reports its requests."""
+    monkeypatch.setattr(settings, "SESSION_PERSISTENCE_ENABLED", False)
+    result = run_mock_llm_benchmark("fan_out", 8, latency_s=0.001)
+    assert result["status"] == "COMPLETED"
+    assert result["llm"]["requests"] == 8 and result["llm"]["completed"] == 8
@@ -1,7 +1,7 @@
 # tests/test_models.py
 import pytest
 from pydantic import ValidationError
-from src.models import AgentSpec, TaskSpec, Artifact, Session, ExecutionContext, AgentResponse
+from src.models import AgentSpec, TaskSpec, Artifact, Session, ExecutionContext, AgentResponse, construct_trusted
 import uuid
 import datetime
 
@@ -37,7 +37,7 @@ def test_session_model():
     assert session.id == session_id
     assert session.status == "RUNNING"
     assert session.end_time is None
-    assert session.logs == []
+    assert list(session.logs) == []
     assert session.artifacts == []
 
 def test_execution_context_model():
@@ -58,3 +58,15 @@ def test_agent_response_model():
     response_with_artifact = AgentResponse(status="success", artifacts=[artifact])
     assert len(response_with_artifact.artifacts) == 1
     assert response_with_artifact.artifacts[0].name == "log.txt"
+
+def test_construct_trusted_matches_validated_model():
+    """Test that construct_trusted builds the same model as validation, with fresh mutable defaults."""
+    fields = dict(id="t1", name="t1", description="", agent_name="A", input_data={"n": 1})
+    task = construct_trusted(TaskSpec, **fields)
+    assert task == TaskSpec(**fields)
+    assert list(task.model_dump()) == list(TaskSpec(**fields).model_dump())
+    assert task.model_fields_set == set(fields)
+    task.dependencies.append("t0")
+    assert construct_trusted(TaskSpec, **fields).dependencies == []
+    response = construct_trusted(AgentResponse, status="completed")
+    assert response.output == {} and response.model_copy(update={"status": "failed"}).status == "failed"
@@ -0,0 +1,116 @@
+# tests/test_process_pool.py
+import os
+import numpy as np
+import pytest
+from src.agents.base import Agent
+from src.agents.factory import AgentFactory
+from src.agents.registry import agent_registry
+from src.models import AgentResponse, AgentSpec, Artifact, TaskSpec
+from src.orchestrator import Orchestrator
+from src.process_pool import ProcessPoolTaskExecutor
+
+pytestmark = pytest.mark.usefixtures("workflow_session")
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Provides a two-process pool that moves payloads of 1 KiB or more through shared memory."""
+    for cls in (ChecksumAgent, PidAgent, ExplodingAgent):
+        agent_registry.register_agent_spec(AgentSpec(name=cls.__name__, role="CPU", description="", executor="process"))
+        agent_registry.register_agent_class(cls)
+    agent_registry.register_agent_spec(AgentSpec(name="ThreadPidAgent", role="IO", description=""))
+    agent_registry.register_agent_class(ThreadPidAgent)
+    pool = ProcessPoolTaskExecutor(max_workers=2, shm_threshold=1024)
+    monkeypatch.setattr('src.scheduler.process_pool', pool)
+    yield pool
+    pool.shutdown()
+
+def shm_segments():
+    """Names of the shared memory segments currently allocated by `multiprocessing.shared_memory`."""
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")} if os.path.isdir("/dev/shm") else set()
+
+class ChecksumAgent(Agent):
+    """Reports how its payloads arrived and returns a large artifact derived from them."""
+    def run(self, task: TaskSpec) -> AgentResponse:
+        blob, array = task.input_data["blob"], task.input_data["array"]
+        return AgentResponse(status="completed", output={
+            "blob_type": type(blob).__name__, "blob_sum": sum(bytes(blob)),
+            "array_type": type(array).__name__, "array_sum": int(array.sum()),
+        }, artifacts=[Artifact(name="out.bin", type="bytes", data=bytes(reversed(bytes(blob))))])
+
+class PidAgent(Agent):
+    """Reports the process it ran in."""
+    def run(self, task: TaskSpec) -> AgentResponse:
+        return AgentResponse(status="completed", output={"pid": os.getpid()})
+
+class ThreadPidAgent(PidAgent):
+    """Reports the process it ran in, from a thread of the orchestrator's process."""
+
+class LateAgent(Agent):
+    """Registered only after the pool's workers have started."""
+    def run(self, task: TaskSpec) -> AgentResponse:
+        return AgentResponse(status="completed", output={"late": True})
+
+class ExplodingAgent(Agent):
+    """Always raises."""
+    def run(self, task: TaskSpec) -> AgentResponse:
+        raise RuntimeError("boom")
+
+def test_large_payloads_round_trip_through_shared_memory(pool):
+    """Test that large bytes and arrays reach the agent as shared views, and large results come back as bytes."""
+    blob = os.urandom(64 * 1024)
+    array = np.arange(100_000, dtype=np.int64)
+    before = shm_segments()
+    task = TaskSpec(id="t", name="t", description="", agent_name="ChecksumAgent", input_data={"blob": blob, "array": array})
+    response = pool.submit(task).result(timeout=60)
+    assert response.output == {
+        "blob_type": "memoryview", "blob_sum": sum(blob),
+        "array_type": "ndarray", "array_sum": int(array.sum()),
+    }
+    assert response.artifacts[0].data == bytes(reversed(blob))
+    assert shm_segments() <= before
+
+def test_agent_exception_propagates(pool):
+    """Test that an exception raised in a pool process fails the task's future."""
+    task = TaskSpec(id="t", name="t", description="", agent_name="ExplodingAgent")
+    with pytest.raises(RuntimeError, match="boom"):
+        pool.submit(task).result(timeout=60)
+
+def test_orchestrator_runs_process_agents_in_pool(pool):
+    """Test that only agents whose spec selects the process executor leave the orchestrator's process."""
+    tasks = [
+        TaskSpec(id="cpu", name="cpu", description="", agent_name="PidAgent"),
+        TaskSpec(id="io", name="io", description="", agent_name="ThreadPidAgent"),
+    ]
+    submitted = {}
+    submit = pool.submit
+    def record(task):
+        submitted[task.id] = submit(task)
+        return submitted[task.id]
+    pool.submit = record
+    outcomes = Orchestrator(AgentFactory(), max_parallel=2).run_workflow(tasks)
+    assert {o.status for o in outcomes.values()} == {"completed"}
+    assert list(submitted) == ["cpu"]
+    assert submitted["cpu"].result().output["pid"] != os.getpid()
+
+def test_pool_restarts_when_registry_changes(pool):
+    """Test that workers started before an agent was registered are replaced by ones that know it."""
+    pool.warm()
+    agent_registry.register_agent_spec(AgentSpec(name="LateAgent", role="CPU", description="", executor="process"))
+    agent_registry.register_agent_class(LateAgent)
+    task = TaskSpec(id="t", name="t", description="", agent_name="LateAgent")
+    assert pool.submit(task).result(timeout=60).output == {"late": True}
+
+def test_registry_is_snapshotted_only_after_it_changes(pool, monkeypatch):
+    """Test that submits reuse the pool without re-reading the registry until an agent is registered."""
+    calls = []
+    snapshot = ProcessPoolTaskExecutor._registry_snapshot
+    monkeypatch.setattr(ProcessPoolTaskExecutor, "_registry_snapshot", staticmethod(lambda: calls.append(1) or snapshot()))
+    task = TaskSpec(id="t", name="t", description="", agent_name="PidAgent")
+    for _ in range(3):
+        pool.submit(task).result(timeout=60)
+    workers = pool._pool
+    assert len(calls) == 1
+    agent_registry.register_agent_spec(AgentSpec(name="PidAgent", role="CPU", description="", executor="process"))
+    pool.submit(task).result(timeout=60)
+    assert len(calls) == 2
+    assert pool._pool is workers # Same registry content: the workers are kept
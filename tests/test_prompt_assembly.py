@@ -0,0 +1,71 @@
+# tests/test_prompt_assembly.py
+import pytest
+from src.llms.provider import LLMProvider
+from src.prompt_assembly import PromptAssembler, estimate_tokens, split_template, truncate_to_tokens
+from src.prompt_manager import PromptManager
+
+SYSTEM = "You are a classifier for {{ project }}. " + "Follow the labelling guide carefully. " * 300
+
+@pytest.fixture
+def manager(tmp_path):
+    """A PromptManager over an empty temporary prompts directory."""
+    manager = PromptManager(prompt_dir=str(tmp_path / "prompts"))
+    manager.update_prompt("classify", SYSTEM + "{# suffix #}Ticket {{ ticket_id }}: {{ text }}")
+    manager.update_prompt("greet", "Be brief. Hello {{ name }}!")
+    return manager
+
+def test_split_template():
+    """Test that the prefix ends at the suffix marker, or else at the first Jinja tag."""
+    assert split_template("Static {{ a }} then{# suffix #} {{ b }}") == ("Static {{ a }} then", " {{ b }}")
+    assert split_template("Be brief. Hello {{ name }}!") == ("Be brief. Hello ", "{{ name }}!")
+    assert split_template("No tags at all.") == ("No tags at all.", "")
+
+def test_prefix_is_rendered_once_and_shared(manager):
+    """Test that tasks with the same shared variables reuse the rendered prefix and get their own suffix."""
+    assembler = PromptAssembler(manager)
+    first = assembler.assemble("classify", {"ticket_id": 1, "text": "Printer on fire"}, shared={"project": "Acme"})
+    second = assembler.assemble("classify", {"ticket_id": 2, "text": "Password reset"}, shared={"project": "Acme"})
+    assert first.prefix is second.prefix
+    assert second.suffix == "Ticket 2: Password reset"
+    assert first.text.startswith("You are a classifier for Acme.")
+    assert (assembler.prefix_misses, assembler.prefix_hits) == (1, 1)
+    assert first.cacheable and first.prefix_tokens > 1024
+    assembler.assemble("classify", {"ticket_id": 3, "text": ""}, shared={"project": "Other"})
+    assert assembler.prefix_misses == 2
+
+def test_changed_prompt_is_re_rendered(manager):
+    """Test that a new version of a prompt does not reuse the old prefix."""
+    assembler = PromptAssembler(manager)
+    assembler.assemble("greet", {"name": "Ada"})
+    manager.update_prompt("greet", "Be verbose. Hello {{ name }}!")
+    prompt = assembler.assemble("greet", {"name": "Ada"})
+    assert prompt.text == "Be verbose. Hello Ada!"
+    assert not prompt.cacheable
+
+def test_prefix_may_only_use_shared_variables(manager):
+    """Test that a prefix depending on task variables is rejected, since it could not be shared."""
+    with pytest.raises(ValueError, match="shared variables"):
+        PromptAssembler(manager).assemble("classify", {"ticket_id": 1, "text": "x", "project": "Acme"})
+
+def test_token_budget(manager):
+    """Test that a prompt over its token budget is rejected, and that truncation brings a variable within it."""
+    assembler = PromptAssembler(manager)
+    with pytest.raises(ValueError, match="over the budget of 10"):
+        assembler.assemble("greet", {"name": "word " * 20}, max_tokens=10)
+    prompt = assembler.assemble("greet", {"name": truncate_to_tokens("word " * 20, 5)}, max_tokens=10)
+    assert prompt.tokens <= 10
+
+def test_estimate_tokens():
+    """Test the local token estimate on plain English and on long words."""
+    assert estimate_tokens("The quick brown fox jumps over the lazy dog.") == 10
+    assert estimate_tokens("internationalization") == 4
+    assert estimate_tokens("") == 0
+    assert truncate_to_tokens("one two three", 2) == "one two"
+
+def test_provider_generates_from_assembled_prompt(manager):
+    """Test that providers without prompt caching receive the whole prompt text."""
+    class EchoProvider(LLMProvider):
+        def generate(self, prompt: str) -> str:
+            return prompt
+    prompt = PromptAssembler(manager).assemble("greet", {"name": "Ada"})
+    assert EchoProvider().generate_prompt(prompt) == "Be brief. Hello Ada!"
@@ -1,7 +1,9 @@
 # tests/test_response_parser.py
 import pytest
 import json
-from src.response_parser import parse_response
+from src.models import AgentResponse
+from src.llms.provider import LLMProvider
+from src.response_parser import StreamingJSONParser, parse_many, parse_partial, parse_response, stream_members
 
 def test_parse_response_valid_json():
     """Test parsing a valid JSON string."""
@@ -32,3 +34,102 @@ def test_parse_response_malformed_json_fallback_to_text():
     malformed_json = '{status: "success"}' # Missing quotes around 'status'
     expected_output = {"output": malformed_json, "status": "success", "artifacts": []}
     assert parse_response(malformed_json) == expected_output
+
+@pytest.mark.parametrize("text, expected", [
+    ('Here you go:\n```json\n{"label": "urgent"}\n```\nAnything else?', {"label": "urgent"}),
+    ('```\n[1, 2]\n```', {"output": [1, 2], "status": "success", "artifacts": []}),
+    ('The label is {"label": "low", "score": 0.2}, as requested.', {"label": "low", "score": 0.2}),
+    ('[INFO] result: {"a": 1}', {"a": 1}),
+])
+def test_parse_response_fenced_and_embedded_json(text, expected):
+    """Test that JSON in a code fence or embedded in prose is extracted."""
+    assert parse_response(text) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"label": "urg', {"label": "urg"}),
+    ('{"a": 1, "b": tr', {"a": 1}),
+    ('{"a": [1, 2], "b": ', {"a": [1, 2]}),
+    ('```json\n{"a": {"b": "x\\', {"a": {"b": "x"}}),
+    ('[1, 2, {"a"', [1, 2, {}]),
+])
+def test_parse_partial_completes_cut_off_json(text, expected):
+    """Test that JSON cut off mid-stream is completed up to its last complete member."""
+    assert parse_partial(text) == expected
+    assert parse_response(text) == (expected if isinstance(expected, dict) else {"output": expected, "status": "success", "artifacts": []})
+
+def test_parse_partial_ignores_prose():
+    """Test that text that does not start with JSON is not treated as partial JSON."""
+    assert parse_partial("I think {maybe") is None
+    assert parse_response("I think {maybe")["output"] == "I think {maybe"
+
+@pytest.mark.parametrize("text, expected", [
+    ("[1] See the docs for details", "[1] See the docs for details"),
+    ("[2, 3] and [4] discuss this", "[2, 3] and [4] discuss this"),
+    ("42", 42),
+    ('Found: [{"a": 1}, {"a": 2}] in total', [{"a": 1}, {"a": 2}]),
+])
+def test_parse_response_keeps_prose_that_starts_with_brackets(text, expected):
+    """Test that citations and other non-object values are returned whole as the output, not truncated."""
+    assert parse_partial(text) is None
+    assert parse_response(text) == {"output": expected, "status": "success", "artifacts": []}
+
+def test_parse_response_warns_about_text_after_leading_json(caplog):
+    """Test that JSON followed by more text is taken from the embedded search, with a warning."""
+    assert parse_partial('{"a": 1} {"b": 2}') is None
+    assert parse_response('{"a": 1} {"b": 2}') == {"a": 1}
+    assert "Ignoring text after the JSON" in caplog.text
+
+def test_parse_many_validates_in_bulk():
+    """Test that a batch is parsed into AgentResponses and an invalid one fails on its own."""
+    texts = [
+        '{"status": "completed", "output": {"label": "a"}}',
+        '```json\n{"label": "b"}\n```',
+        "just text",
+        '{"status": "completed", "output": "not a dict"}',
+    ] * 500
+    responses = parse_many(texts)
+    assert len(responses) == 2000 and all(isinstance(r, AgentResponse) for r in responses)
+    assert [r.output for r in responses[:3]] == [{"label": "a"}, {"label": "b"}, {"text": "just text"}]
+    assert responses[3].status == "failed" and "output" in responses[3].output["error_message"]
+    assert responses[4].output == {"label": "a"}
+
+def test_parse_response_without_orjson(monkeypatch):
+    """Test that the standard library backend gives the same results."""
+    monkeypatch.setattr('src.response_parser._loads', json.loads)
+    assert parse_response('Result: ```json\n{"a": [1, 2]}\n```') == {"a": [1, 2]}
+    assert parse_response('{"a": 1, "b": tr') == {"a": 1}
+
+def test_streaming_parser_emits_members_as_they_close():
+    """Test that object members are emitted by the chunk that completes them, character by character."""
+    text = 'Sure:\n```json\n{"label": "a, b}", "items": [1, {"x": "\\"q"}], "n": 3.5}\n```\nDone.'
+    parser = StreamingJSONParser()
+    emitted = []
+    for position, char in enumerate(text):
+        for member in parser.feed(char):
+            emitted.append((member, text[position]))
+    assert emitted == [(("label", "a, b}"), ","), (("items", [1, {"x": '"q'}]), ","), (("n", 3.5), "}")]
+    assert parser.done
+    assert parser.close() == {"label": "a, b}", "items": [1, {"x": '"q'}], "n": 3.5}
+
+def test_streaming_parser_array_elements():
+    """Test that array elements are emitted with their index, including nested containers split across chunks."""
+    assert list(stream_members(['[1, 2', ', [3, ', '4], "x"', ']'])) == [(0, 1), (1, 2), (2, [3, 4]), (3, "x")]
+
+def test_streaming_parser_close_completes_cut_off_stream():
+    """Test that closing a stream that was cut off keeps the completed members and the partial last one."""
+    parser = StreamingJSONParser()
+    assert parser.feed('{"a": 1, "b": {"c": 2, "d') == [("a", 1)]
+    assert parser.close() == {"a": 1, "b": {"c": 2}}
+    assert StreamingJSONParser().close() is None
+
+def test_streaming_parser_rejects_invalid_member():
+    """Test that a member that is not valid JSON raises ValueError."""
+    with pytest.raises(ValueError, match="Invalid JSON"):
+        StreamingJSONParser().feed('{"a": nope, "b": 1}')
+
+def test_provider_stream_defaults_to_one_chunk():
+    """Test that providers without a streaming API stream their whole response as one chunk."""
+    class EchoProvider(LLMProvider):
+        def generate(self, prompt: str) -> str:
+            return '{"echo": "%s"}' % prompt
+    assert list(stream_members(EchoProvider().stream("hi"))) == [("echo", "hi")]
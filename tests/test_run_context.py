@@ -0,0 +1,102 @@
+# tests/test_run_context.py
+import threading
+import pytest
+from src.agents.base import Agent
+from src.models import AgentResponse, TaskSpec
+from src.orchestrator import Orchestrator
+from src.run_context import RunContext
+from src.runtime import RuntimeShutdownError, SystemRuntime
+from src.session_manager import session_manager
+from src.task_manager import task_queue
+from src.workflow.state import workflow_state_machine, WorkflowState
+
+pytestmark = pytest.mark.usefixtures("isolated_run")
+
+class BarrierAgent(Agent):
+    """Completes only once every concurrent run has reached the barrier."""
+    barrier: threading.Barrier = None # type: ignore
+
+    def run(self, task: TaskSpec) -> AgentResponse:
+        self.barrier.wait(timeout=5)
+        return AgentResponse(status="completed", output={"task_id": task.id})
+
+def make_tasks(prefix):
+    return [
+        TaskSpec(id=f"{prefix}-a", name="a", description="", agent_name="Barrier"),
+        TaskSpec(id=f"{prefix}-b", name="b", description="", agent_name="Barrier", dependencies=[f"{prefix}-a"]),
+    ]
+
+def test_default_context_wraps_singletons():
+    """Test that the default run context is backed by the module-level singletons."""
+    run = RunContext.default()
+    assert run.session_manager is session_manager
+    assert run.task_queue is task_queue
+    assert run.state_machine is workflow_state_machine
+
+def test_run_contexts_are_independent():
+    """Test that each run context has its own session, queue and state machine."""
+    first, second = RunContext(), RunContext()
+    first_session = first.start_session()
+    second_session = second.start_session()
+    assert first_session.id != second_session.id
+    assert first.context.get_context().session_id == first_session.id
+    assert first.task_queue is not second.task_queue
+    first.session_manager.end_session(status=WorkflowState.FAILED)
+    assert first.state_machine.get_state() == WorkflowState.FAILED
+    assert second.state_machine.get_state() == WorkflowState.INIT
+    assert second.session_manager.get_current_session() is second_session
+
+def test_runtime_runs_workflows_concurrently(agent_factory):
+    """Test that two workflows submitted to the runtime run at the same time and both complete."""
+    BarrierAgent.barrier = threading.Barrier(2)
+    runtime = SystemRuntime(max_runs=2)
+    runtime.agent_factory = agent_factory(BarrierAgent)
+    runs = [runtime.new_run(), runtime.new_run()]
+    futures = [runtime.submit_workflow(make_tasks(str(i)), run_context=run) for i, run in enumerate(runs)]
+    outcomes = [future.result(timeout=10) for future in futures]
+    runtime.shutdown()
+
+    for i, run in enumerate(runs):
+        assert {o.status for o in outcomes[i].values()} == {"completed"}
+        assert set(outcomes[i]) == {f"{i}-a", f"{i}-b"}
+        assert run.state_machine.get_state() == WorkflowState.COMPLETED
+    assert runtime.active_runs() == []
+
+def test_runtime_rejects_workflows_after_shutdown(agent_factory):
+    """Test that submitting to a shut-down runtime raises RuntimeShutdownError and registers no run."""
+    runtime = SystemRuntime(max_runs=1)
+    runtime.agent_factory = agent_factory(BarrierAgent)
+    runtime.shutdown()
+    with pytest.raises(RuntimeShutdownError):
+        runtime.submit_workflow(make_tasks("late"))
+    assert runtime.active_runs() == []
+
+def test_submissions_racing_shutdown_are_run_or_rejected(agent_factory):
+    """Test that a submission concurrent with shutdown either runs to completion or is rejected cleanly."""
+    BarrierAgent.barrier = threading.Barrier(1)
+    for _ in range(20):
+        runtime = SystemRuntime(max_runs=1)
+        runtime.agent_factory = agent_factory(BarrierAgent)
+        results = []
+        def submit():
+            try:
+                results.append(runtime.submit_workflow(make_tasks("r")))
+            except RuntimeShutdownError as e:
+                results.append(e)
+        thread = threading.Thread(target=submit)
+        thread.start()
+        runtime.shutdown()
+        thread.join(timeout=10)
+        result, = results
+        if not isinstance(result, RuntimeShutdownError):
+            assert {o.status for o in result.result(timeout=10).values()} == {"completed"}
+
+def test_orchestrator_uses_given_context(agent_factory):
+    """Test that a run on its own context leaves the global state machine untouched."""
+    BarrierAgent.barrier = threading.Barrier(1)
+    workflow_state_machine._state = WorkflowState.INIT
+    run = RunContext()
+    run.start_session()
+    Orchestrator(agent_factory(BarrierAgent), run_context=run).run_workflow(make_tasks("x"))
+    assert run.state_machine.get_state() == WorkflowState.COMPLETED
+    assert workflow_state_machine.get_state() == WorkflowState.INIT
@@ -0,0 +1,129 @@
+# tests/test_semantic_cache.py
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from src.config import settings
+from src.llms.client import LLMClient
+from src.llms.provider import LLMProvider
+from src.llms.semantic_cache import CachingLLMProvider, HashingEmbedder, SemanticCache, VectorIndex
+from src.models import AssembledPrompt
+
+TICKET = "Classify this support ticket: my printer is on fire and smoking"
+PARAPHRASE = "Please classify the support ticket: My printer is on fire, and smoking!"
+OTHER = "Classify this support ticket: I forgot my password"
+
+@pytest.fixture
+def cache():
+    """Provides an in-memory semantic cache with the default embedder."""
+    return SemanticCache(threshold=0.9, max_entries=100)
+
+def test_embedder_scores_paraphrases_above_other_prompts():
+    """Test that a paraphrase is more similar to a prompt than a different prompt is."""
+    vectors = HashingEmbedder(dim=1024).embed([TICKET, PARAPHRASE, OTHER])
+    assert vectors.shape == (3, 1024)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert vectors[0] @ vectors[1] > 0.9
+    assert vectors[0] @ vectors[2] < 0.7
+
+def test_exact_similar_and_missed_lookups(cache):
+    """Test exact hits, near-duplicate hits and misses below the threshold, and the stats they produce."""
+    cache.store("gemini", TICKET, "urgent")
+    assert cache.lookup("gemini", TICKET) == "urgent"
+    assert cache.lookup("gemini", PARAPHRASE) == "urgent"
+    assert cache.lookup("gemini", OTHER) is None
+    stats = cache.stats()
+    assert (stats["lookups"], stats["exact_hits"], stats["similar_hits"], stats["misses"]) == (3, 1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+    assert "2 hits (66.7%" in cache.report()
+
+def test_responses_are_not_shared_across_namespaces(cache):
+    """Test that a response cached for one provider is not returned for another."""
+    cache.store("gemini", TICKET, "urgent")
+    assert cache.lookup("ollama", TICKET) is None
+    assert cache.lookup("ollama", PARAPHRASE) is None
+
+def test_near_duplicates_in_other_namespaces_do_not_hide_a_hit(cache):
+    """Test that more than a handful of closer matches in another namespace do not crowd out a same-namespace hit."""
+    cache.store("gemini", TICKET + " again", "urgent")
+    for i in range(10):
+        cache.store("ollama", PARAPHRASE + "!" * (i + 1), "other provider") # Same words, so closer to the query
+    assert cache.lookup("gemini", PARAPHRASE) == "urgent"
+    assert cache.lookup("mistral", PARAPHRASE) is None
+
+def test_least_recently_used_entries_are_evicted():
+    """Test that a full cache evicts the entry that was used least recently."""
+    cache = SemanticCache(max_entries=2)
+    cache.store("p", "first prompt", "1")
+    cache.store("p", "second prompt", "2")
+    cache.lookup("p", "first prompt")
+    cache.store("p", "third prompt", "3")
+    assert len(cache) == 2
+    assert cache.lookup("p", "second prompt") is None
+    assert cache.lookup("p", "first prompt") == "1"
+    assert cache.stats()["evictions"] == 1
+
+def test_save_and_load_round_trip(tmp_path):
+    """Test that entries, recency and stats survive a save and load, and a different embedder re-embeds them."""
+    path = str(tmp_path / "cache" / "semantic.npz")
+    cache = SemanticCache(path=path)
+    cache.store("p", TICKET, "urgent")
+    cache.store("p", OTHER, "routine")
+    cache.lookup("p", TICKET)
+    cache.save()
+    loaded = SemanticCache(path=path)
+    assert len(loaded) == 2
+    assert loaded.stats()["exact_hits"] == 1
+    assert loaded.lookup("p", PARAPHRASE) == "urgent"
+    resized = SemanticCache(embedder=HashingEmbedder(dim=256), path=path)
+    assert resized.lookup("p", PARAPHRASE) == "urgent"
+
+def test_hashed_search_finds_near_duplicates():
+    """Test that the LSH tables narrow a search down to the nearest stored vectors."""
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((500, 64)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = VectorIndex(64, 500, exact_below=0)
+    for slot, vector in enumerate(vectors):
+        index.add(slot, vector)
+    query = vectors[42] + 0.05 * rng.standard_normal(64).astype(np.float32)
+    slot, score = index.search(query / np.linalg.norm(query), k=1)[0]
+    assert slot == 42 and score > 0.9
+    index.remove(42)
+    assert all(slot != 42 for slot, _ in index.search(vectors[42], k=5))
+
+def test_caching_provider_skips_the_wrapped_provider_on_hits(cache):
+    """Test that the wrapper answers repeated and streamed prompts from the cache."""
+    inner = MagicMock(spec=LLMProvider)
+    inner.generate.return_value = "urgent"
+    inner.stream.return_value = iter(["rout", "ine"])
+    provider = CachingLLMProvider("mock", inner, cache)
+    assert provider.generate(TICKET) == "urgent"
+    assert provider.generate(PARAPHRASE) == "urgent"
+    inner.generate.assert_called_once_with(TICKET)
+    assert "".join(provider.stream(OTHER)) == "routine"
+    assert list(provider.stream(OTHER)) == ["routine"]
+    inner.stream.assert_called_once_with(OTHER)
+
+def test_assembled_prompts_are_matched_on_their_suffix(cache):
+    """Test that a long shared prefix does not make prompts for different tasks match."""
+    prefix = " ".join(f"Guideline {i}: keep summaries short, factual and free of speculation." for i in range(40))
+    def prompt(suffix, shared=prefix):
+        return AssembledPrompt(prefix=shared, suffix=suffix, prefix_tokens=0, suffix_tokens=0, cacheable=True)
+    inner = MagicMock(spec=LLMProvider)
+    inner.generate_prompt.side_effect = lambda p: f"summary of {p.suffix}"
+    provider = CachingLLMProvider("mock", inner, cache)
+    assert provider.generate_prompt(prompt("Summarize the file src/auth.py")) == "summary of Summarize the file src/auth.py"
+    assert provider.generate_prompt(prompt("Summarize the file src/billing.py")) == "summary of Summarize the file src/billing.py"
+    assert provider.generate_prompt(prompt("Please summarize the file src/auth.py")) == "summary of Summarize the file src/auth.py"
+    assert provider.generate_prompt(prompt("Summarize the file src/auth.py", shared="Be brief.")) == "summary of Summarize the file src/auth.py"
+    assert inner.generate_prompt.call_count == 3
+
+def test_llm_client_wraps_providers_when_enabled(monkeypatch):
+    """Test that enabling the semantic cache wraps every initialized provider."""
+    monkeypatch.setattr(settings, "ACTIVE_LLM_PROVIDERS", "ollama")
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_PATH", None)
+    client = LLMClient()
+    provider = client.get_provider("ollama")
+    assert isinstance(provider, CachingLLMProvider)
+    assert provider.cache is client.semantic_cache
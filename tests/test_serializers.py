@@ -0,0 +1,76 @@
+# tests/test_serializers.py
+import pytest
+from src.serializers import (
+    get_serializer, register_serializer, serialize, deserialize, ArtifactSerializer,
+    TextSerializer, BytesSerializer, JsonSerializer, MsgpackSerializer, NpySerializer,
+)
+
+@pytest.mark.parametrize("artifact_type, expected", [
+    ("text", TextSerializer),
+    ("text/plain", TextSerializer),
+    ("text/markdown", TextSerializer),
+    ("bytes", BytesSerializer),
+    ("image/png", BytesSerializer),
+    ("application/json", JsonSerializer),
+    ("JSON", JsonSerializer),
+    ("msgpack", MsgpackSerializer),
+    ("application/x-npy", NpySerializer),
+])
+def test_get_serializer_by_type(artifact_type, expected):
+    """Test that serializers are chosen by artifact type."""
+    assert isinstance(get_serializer(artifact_type), expected)
+
+def test_text_round_trip():
+    """Test text serialization, including non-string data."""
+    serializer = get_serializer("text")
+    assert serializer.deserialize(serializer.serialize("héllo")) == "héllo"
+    assert serializer.serialize(42) == b"42"
+
+def test_bytes_deserialize_is_zero_copy():
+    """Test that bytes deserialization returns the given buffer unchanged."""
+    view = memoryview(b"\x00\x01\x02")
+    assert get_serializer("bytes").deserialize(view) is view
+
+def test_json_round_trip_from_memoryview():
+    """Test that JSON can be decoded from a memoryview."""
+    serializer = get_serializer("json")
+    data = {"a": [1, 2, {"b": None}]}
+    assert serializer.deserialize(memoryview(serializer.serialize(data))) == data
+
+def test_msgpack_round_trip():
+    """Test msgpack serialization when msgpack is installed."""
+    pytest.importorskip("msgpack")
+    serializer = get_serializer("msgpack")
+    data = {"ids": [1, 2, 3], "blob": b"\x00\xff"}
+    assert serializer.deserialize(serializer.serialize(data)) == data
+
+def test_npy_round_trip_shares_buffer():
+    """Test that .npy arrays are decoded as views over the input buffer."""
+    np = pytest.importorskip("numpy")
+    serializer = get_serializer("npy")
+    array = np.asfortranarray(np.arange(24, dtype=np.int64).reshape(4, 6))
+    buffer = bytearray(serializer.serialize(array))
+    decoded = serializer.deserialize(buffer)
+    assert np.array_equal(decoded, array)
+    assert not decoded.flags.owndata
+
+def test_unregistered_types_serialize_by_data():
+    """Test that unregistered types store str data as text and bytes data as bytes, reporting the serializer to read with."""
+    assert serialize("x-custom", "héllo") == ("héllo".encode("utf-8"), "text")
+    assert deserialize("x-custom", "héllo".encode("utf-8"), "text") == "héllo"
+    assert serialize("x-custom", b"\x00") == (b"\x00", None)
+    assert deserialize("x-custom", b"\x00") == b"\x00"
+    assert serialize("json", {"a": 1}) == (b'{"a":1}', None)
+
+def test_register_custom_serializer():
+    """Test registering a serializer for a new artifact type."""
+    class UpperSerializer(ArtifactSerializer):
+        name = "upper"
+        types = ["x-upper"]
+        def serialize(self, data):
+            return str(data).upper().encode()
+        def deserialize(self, buffer):
+            return bytes(buffer).decode()
+
+    register_serializer(UpperSerializer())
+    assert get_serializer("x-upper").serialize("abc") == b"ABC"
@@ -0,0 +1,126 @@
+# tests/test_server.py
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+from src.agents.base import Agent
+from src.models import AgentResponse, JobOptions, TaskSpec
+from src.runtime import SystemRuntime
+from src.server import JobManager, create_server
+from src.workflow.state import FailurePolicy
+
+pytestmark = pytest.mark.usefixtures("isolated_run")
+
+class EchoAgent(Agent):
+    """Completes every task, failing those with `input_data["fail"]`."""
+    def run(self, task: TaskSpec) -> AgentResponse:
+        if task.input_data.get("fail"):
+            return AgentResponse(status="failed", output={"error_message": "asked to fail"})
+        return AgentResponse(status="completed", output={"task_id": task.id})
+
+@pytest.fixture
+def job_manager(agent_factory):
+    """Provides a JobManager on a private runtime whose agents echo their task."""
+    runtime = SystemRuntime(max_runs=2)
+    runtime.agent_factory = agent_factory(EchoAgent)
+    manager = JobManager(runtime)
+    yield manager
+    manager.shutdown()
+
+@pytest.fixture
+def base_url(job_manager):
+    """Serves the job API on an ephemeral localhost port."""
+    server = create_server(job_manager, host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+def request(url, body=None):
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def wait_for_job(base_url, job_id):
+    for _ in range(200):
+        status, job = request(f"{base_url}/jobs/{job_id}")
+        if job["finished_at"]:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def tasks(fail=False):
+    return [
+        {"id": "a", "name": "a", "description": "", "agent_name": "Echo"},
+        {"id": "b", "name": "b", "description": "", "agent_name": "Echo", "dependencies": ["a"], "input_data": {"fail": fail}},
+    ]
+
+def test_submit_and_poll_job(base_url):
+    """Test that a submitted workflow is accepted, runs and reports its outcomes."""
+    status, job = request(f"{base_url}/jobs", {"tasks": tasks()})
+    assert status == 202
+    assert job["status"] in ("queued", "running")
+
+    finished = wait_for_job(base_url, job["id"])
+    assert finished["status"] == "completed"
+    assert finished["session_id"]
+    assert {o["status"] for o in finished["outcomes"].values()} == {"completed"}
+
+    status, listing = request(f"{base_url}/jobs")
+    assert [j["id"] for j in listing["jobs"]] == [job["id"]]
+
+def test_failed_workflow_is_reported(base_url):
+    """Test that a workflow with a failing task finishes as a failed job."""
+    _, job = request(f"{base_url}/jobs", {"tasks": tasks(fail=True), "options": {"failure_policy": "continue_independent"}})
+    finished = wait_for_job(base_url, job["id"])
+    assert finished["status"] == "failed"
+    assert finished["outcomes"]["b"]["status"] == "failed"
+
+def test_invalid_submissions_are_rejected(base_url):
+    """Test that malformed submissions get a 400 and unknown routes or jobs a 404."""
+    assert request(f"{base_url}/jobs", {"nothing": True})[0] == 400
+    assert request(f"{base_url}/jobs", {"tasks": [{"id": "a"}]})[0] == 400
+    assert request(f"{base_url}/jobs", {"tasks": tasks(), "options": {"bogus": 1}})[0] == 400
+    assert request(f"{base_url}/jobs", {"tasks": tasks(), "options": {"failure_policy": "never"}})[0] == 400
+    assert request(f"{base_url}/jobs", {"tasks": tasks(), "options": {"max_parallel": 0}})[0] == 400
+    assert request(f"{base_url}/jobs", {"tasks": tasks(), "options": {"timeout": "soon"}})[0] == 400
+    assert request(f"{base_url}/jobs", {"tasks": tasks(), "options": ["max_parallel"]})[0] == 400
+    assert request(f"{base_url}/jobs/unknown")[0] == 404
+    assert request(f"{base_url}/health") == (200, {"status": "ok", "active_runs": 0})
+
+def test_finished_jobs_are_bounded(job_manager, monkeypatch):
+    """Test that only the most recent SERVE_MAX_FINISHED_JOBS finished jobs are kept."""
+    monkeypatch.setattr('src.config.settings.SERVE_MAX_FINISHED_JOBS', 2)
+    jobs = []
+    for _ in range(3):
+        jobs.append(job_manager.submit({"tasks": tasks()}))
+        while (job_manager.get_job(jobs[-1].id) or jobs[-1]).finished_at is None:
+            time.sleep(0.01)
+    assert job_manager.get_job(jobs[0].id) is None
+    assert [j.id for j in job_manager.list_jobs()] == [j.id for j in jobs[1:]]
+
+def test_job_options_accept_every_failure_policy():
+    """Test that JobOptions accepts exactly the FailurePolicy values."""
+    for policy in FailurePolicy:
+        assert JobOptions(failure_policy=policy.value).failure_policy == policy.value
+
+def test_workflow_paths_are_confined_to_the_workflows_dir(job_manager, tmp_path, monkeypatch):
+    """Test that workflow files are resolved under SERVE_WORKFLOWS_DIR and paths outside it are rejected."""
+    workflows_dir = tmp_path / "workflows"
+    workflows_dir.mkdir()
+    (workflows_dir / "ok.json").write_text(json.dumps({"tasks": tasks()}))
+    (tmp_path / "secret.json").write_text(json.dumps({"tasks": tasks()}))
+    (workflows_dir / "link.json").symlink_to(tmp_path / "secret.json")
+    monkeypatch.setattr('src.config.settings.SERVE_WORKFLOWS_DIR', str(workflows_dir))
+
+    assert job_manager.submit({"workflow": "ok.json"}).status == "queued"
+    for workflow in (str(tmp_path / "secret.json"), "../secret.json", "sub/../../secret.json", "link.json"):
+        with pytest.raises(ValueError, match="workflows directory"):
+            job_manager.submit({"workflow": workflow})
@@ -2,17 +2,19 @@
 import pytest
 import uuid
 import datetime
+from concurrent.futures import Future
 from unittest.mock import patch, MagicMock
 from src.session_manager import SessionManager
+from src.session_store import SessionStore
 from src.models import Session, Artifact
 from src.workflow.state import WorkflowState
 from src.artifacts import artifact_manager
 from src.workflow.state import workflow_state_machine
 
 @pytest.fixture
-def clean_session_manager():
+def clean_session_manager(tmp_path):
     """Provides a fresh SessionManager instance for each test."""
-    manager = SessionManager()
+    manager = SessionManager(store=SessionStore(db_path=str(tmp_path / "sessions.db")))
     # Reset workflow_state_machine and artifact_manager for clean state
     workflow_state_machine._state = WorkflowState.INIT
     workflow_state_machine._session = None
@@ -54,17 +56,24 @@ def test_add_log_entry(clean_session_manager):
     session = clean_session_manager.start_session()
     clean_session_manager.add_log_entry("Log entry 1")
     clean_session_manager.add_log_entry("Log entry 2")
-    assert session.logs == ["Log entry 1", "Log entry 2"]
+    assert list(session.logs) == ["Log entry 1", "Log entry 2"]
 
-@patch('src.artifacts.artifact_manager.store_artifact')
+@patch('src.artifacts.artifact_manager.store_artifact_async')
 def test_add_artifact(mock_store_artifact, clean_session_manager):
     """Test adding an artifact to a session and ensuring it's stored."""
+    stored = Future()
+    stored.set_result("/artifacts/test.txt")
+    mock_store_artifact.return_value = stored
     session = clean_session_manager.start_session()
     artifact = Artifact(name="test.txt", type="text", data="hello")
     clean_session_manager.add_artifact(artifact)
+    clean_session_manager.flush() # Waits for the background write
     
     assert len(session.artifacts) == 1
-    assert session.artifacts[0] == artifact
+    assert session.artifacts[0].name == artifact.name
+    assert session.artifacts[0].type == artifact.type
+    assert session.artifacts[0].data_path == "/artifacts/test.txt"
+    assert not hasattr(session.artifacts[0], "data") # Payloads are not kept in memory
     mock_store_artifact.assert_called_once_with(artifact, session.id)
 
 def test_get_current_session(clean_session_manager):
@@ -72,3 +81,15 @@ def test_get_current_session(clean_session_manager):
     assert clean_session_manager.get_current_session() is None
     session = clean_session_manager.start_session()
     assert clean_session_manager.get_current_session() == session
+
+def test_log_buffer_is_bounded(clean_session_manager, monkeypatch):
+    """Test that only the most recent log entries stay in memory while the full history is persisted."""
+    monkeypatch.setattr('src.config.settings.SESSION_LOG_BUFFER_SIZE', 3)
+    monkeypatch.setattr('src.config.settings.SESSION_LOG_FLUSH_BATCH', 2)
+    session = clean_session_manager.start_session()
+    for i in range(5):
+        clean_session_manager.add_log_entry(f"entry {i}")
+
+    assert list(session.logs) == ["entry 2", "entry 3", "entry 4"]
+    assert session.logs.maxlen == 3 # Trimmed by the deque itself, without copying
+    assert clean_session_manager.get_logs() == [f"entry {i}" for i in range(5)]
@@ -0,0 +1,235 @@
+# tests/test_session_store.py
+import pytest
+import datetime
+import uuid
+from src.session_store import SessionStore
+from src.session_manager import SessionManager
+from unittest.mock import MagicMock
+from src.models import Session, Artifact, ArtifactRef, AgentResponse, TaskCheckpoint, TaskSpec
+from src.agents.base import Agent
+from src.orchestrator import Orchestrator
+from src.workflow.state import WorkflowState, workflow_state_machine
+
+@pytest.fixture
+def store(tmp_path):
+    """Provides a SessionStore backed by a temporary database."""
+    store = SessionStore(db_path=str(tmp_path / "sessions.db"))
+    yield store
+    store.close()
+
+def make_session(status: str = "INIT", start_time: str = None) -> Session:
+    return Session(id=str(uuid.uuid4()), start_time=start_time or datetime.datetime.now().isoformat(), status=status)
+
+def test_store_uses_wal_mode(store):
+    """Test that the store enables write-ahead logging."""
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_schema_creates_indexes(store):
+    """Test that indexes on status, start_time and session_id are created."""
+    names = {row[0] for row in store._conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_sessions_status", "idx_sessions_start_time", "idx_artifacts_session_id", "idx_session_logs_session_id"} <= names
+
+def test_upsert_session_inserts_then_updates(store):
+    """Test that upserting a session twice updates status and end time."""
+    session = make_session()
+    store.upsert_session(session)
+    session.status = "COMPLETED"
+    session.end_time = datetime.datetime.now().isoformat()
+    store.upsert_session(session)
+
+    row = store.get_session(session.id)
+    assert row["status"] == "COMPLETED"
+    assert row["end_time"] == session.end_time
+    assert store.get_session("missing") is None
+
+def test_append_logs_and_artifacts(store):
+    """Test that batched log entries and artifact metadata are stored in order."""
+    session = make_session()
+    store.upsert_session(session)
+    store.append_logs(session.id, [("t1", "first"), ("t2", "second")])
+    store.add_artifacts(session.id, [("out.txt", "text/plain", "/tmp/out.txt")])
+
+    assert store.get_logs(session.id) == ["first", "second"]
+    artifacts = store.list_artifacts(session.id)
+    assert [(a["name"], a["type"], a["data_path"]) for a in artifacts] == [("out.txt", "text/plain", "/tmp/out.txt")]
+
+def test_list_sessions_filters(store):
+    """Test listing sessions by status and start time, newest first."""
+    old = make_session("FAILED", "2024-01-01T00:00:00")
+    new = make_session("COMPLETED", "2025-01-01T00:00:00")
+    newer_failed = make_session("FAILED", "2025-06-01T00:00:00")
+    for session in (old, new, newer_failed):
+        store.upsert_session(session)
+
+    assert [s["id"] for s in store.list_sessions()] == [newer_failed.id, new.id, old.id]
+    assert [s["id"] for s in store.list_sessions(status="FAILED")] == [newer_failed.id, old.id]
+    assert [s["id"] for s in store.list_sessions(since="2025-01-01T00:00:00")] == [newer_failed.id, new.id]
+    assert len(store.list_sessions(limit=1)) == 1
+
+def test_session_manager_persists_session_logs_and_artifacts(store, tmp_path, monkeypatch):
+    """Test that SessionManager writes its session, buffered logs and artifact metadata on end_session."""
+    monkeypatch.setattr('src.artifacts.artifact_manager.artifact_dir', str(tmp_path / "artifacts"))
+    workflow_state_machine._session = None
+    manager = SessionManager(store=store)
+    session = manager.start_session()
+    assert store.get_session(session.id) is None # Not saved until something is written to it
+
+    manager.add_log_entry("Log entry 1")
+    manager.add_artifact(Artifact(name="report.txt", type="text/plain", data="hello"))
+    assert store.get_logs(session.id) == [] # Still buffered
+
+    manager.end_session(status=WorkflowState.FAILED)
+    assert store.get_session(session.id)["status"] == WorkflowState.FAILED.value
+    assert store.get_logs(session.id) == ["Log entry 1"]
+    assert store.list_artifacts(session.id)[0]["data_path"].endswith("report.txt")
+
+def test_sessions_without_a_workflow_are_not_saved(store):
+    """Test that starting sessions no workflow runs on (e.g. for CLI commands) leaves no rows behind."""
+    workflow_state_machine._session = None
+    manager = SessionManager(store=store)
+    manager.start_session()
+    manager.start_session()
+    assert store.list_sessions() == []
+    manager.add_log_entry("Running")
+    manager.flush()
+    assert len(store.list_sessions()) == 1
+
+def test_checkpoints_round_trip_and_replace(store):
+    """Test that the latest checkpoint per task is stored with its artifact refs."""
+    session = make_session()
+    store.upsert_session(session)
+    store.save_checkpoint(session.id, TaskCheckpoint(task_id="t1", status="failed"))
+    store.save_checkpoint(session.id, TaskCheckpoint(
+        task_id="t1", status="completed", output_hash="abc",
+        artifacts=[ArtifactRef(name="out.txt", type="text", data_path="/tmp/out.txt")],
+    ))
+    store.save_checkpoint(session.id, TaskCheckpoint(
+        task_id="t0", status="completed", new_tasks=[TaskSpec(id="x", name="x", description="", agent_name="A", dependencies=["t0"])],
+    ))
+    checkpoints = store.get_checkpoints(session.id)
+    assert list(checkpoints) == ["t1", "t0"] # In the order they were last written
+    assert checkpoints["t1"].status == "completed"
+    assert checkpoints["t1"].artifacts[0].data_path == "/tmp/out.txt"
+    assert checkpoints["t0"].new_tasks[0].dependencies == ["t0"]
+
+def test_resume_skips_completed_tasks(store, tmp_path, monkeypatch):
+    """Test that a resumed session re-runs only incomplete tasks and hands stored artifacts to them."""
+    monkeypatch.setattr('src.artifacts.artifact_manager.artifact_dir', str(tmp_path / "artifacts"))
+    monkeypatch.setattr('src.session_manager.session_manager._store', store)
+    from src.session_manager import session_manager
+    runs = []
+    received = {}
+
+    class Producer(Agent):
+        def run(self, task: TaskSpec) -> AgentResponse:
+            runs.append(task.id)
+            return AgentResponse(status="completed", output={"n": 1}, artifacts=[Artifact(name="data.json", type="json", data={"n": 1})])
+
+    class Flaky(Agent):
+        fail = True
+        def run(self, task: TaskSpec) -> AgentResponse:
+            runs.append(task.id)
+            received.update(task.input_data)
+            if Flaky.fail:
+                raise RuntimeError("crashed")
+            return AgentResponse(status="completed")
+
+    agents = {"Producer": Producer("Producer"), "Flaky": Flaky("Flaky")}
+    factory = MagicMock()
+    factory.create_agent.side_effect = lambda name: agents[name]
+    tasks = [
+        TaskSpec(id="p", name="p", description="", agent_name="Producer"),
+        TaskSpec(id="c", name="c", description="", agent_name="Flaky", dependencies=["p"]),
+    ]
+
+    workflow_state_machine._state = WorkflowState.INIT
+    session = session_manager.start_session()
+    Orchestrator(factory).run_workflow(tasks)
+    assert workflow_state_machine.get_state() == WorkflowState.FAILED
+    assert {task_id: c.status for task_id, c in store.get_checkpoints(session.id).items()} == {"p": "completed", "c": "failed"}
+
+    runs.clear()
+    received.clear()
+    Flaky.fail = False
+    session_manager.resume_session(session.id)
+    Orchestrator(factory).run_workflow(tasks)
+    assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+    assert runs == ["c"]
+    assert received["upstream_artifacts"]["p"]["data.json"].data == {"n": 1}
+    assert store.get_session(session.id)["status"] == WorkflowState.COMPLETED.value
+
+def test_resume_restores_injected_tasks(store, tmp_path, monkeypatch):
+    """Test that tasks injected before an interruption run on resume, ahead of the dependents they were spliced before."""
+    monkeypatch.setattr('src.artifacts.artifact_manager.artifact_dir', str(tmp_path / "artifacts"))
+    monkeypatch.setattr('src.session_manager.session_manager._store', store)
+    from src.session_manager import session_manager
+    runs = []
+
+    class Planner(Agent):
+        def run(self, task: TaskSpec) -> AgentResponse:
+            runs.append(task.id)
+            return AgentResponse(status="completed", new_tasks=[TaskSpec(id="x", name="x", description="", agent_name="Flaky", dependencies=["p"])])
+
+    class Flaky(Agent):
+        fail = True
+        def run(self, task: TaskSpec) -> AgentResponse:
+            runs.append(task.id)
+            if Flaky.fail and task.id == "x":
+                raise RuntimeError("crashed")
+            return AgentResponse(status="completed")
+
+    agents = {"Planner": Planner("Planner"), "Flaky": Flaky("Flaky")}
+    factory = MagicMock()
+    factory.create_agent.side_effect = lambda name: agents[name]
+    tasks = [
+        TaskSpec(id="p", name="p", description="", agent_name="Planner"),
+        TaskSpec(id="c", name="c", description="", agent_name="Flaky", dependencies=["p"]),
+    ]
+
+    workflow_state_machine._state = WorkflowState.INIT
+    session = session_manager.start_session()
+    Orchestrator(factory).run_workflow(tasks)
+    assert runs == ["p", "x"]
+    assert store.get_checkpoints(session.id)["p"].new_tasks[0].id == "x"
+
+    runs.clear()
+    Flaky.fail = False
+    session_manager.resume_session(session.id)
+    outcomes = Orchestrator(factory).run_workflow(tasks)
+    assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+    assert runs == ["x", "c"]
+    assert {task_id: outcome.status for task_id, outcome in outcomes.items()} == {"p": "resumed", "x": "completed", "c": "completed"}
+
+def test_stores_created_before_injected_tasks_were_checkpointed_are_upgraded(tmp_path):
+    """Test that opening a database without the new_tasks column adds it."""
+    import sqlite3
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE task_checkpoints (session_id UUID NOT NULL, task_id TEXT NOT NULL, status TEXT NOT NULL, "
+                 "output_hash TEXT, artifacts TEXT NOT NULL DEFAULT '[]', updated_at TIMESTAMP NOT NULL, PRIMARY KEY (session_id, task_id))")
+    conn.execute("INSERT INTO task_checkpoints VALUES ('s', 't', 'completed', NULL, '[]', '2025-01-01')")
+    conn.commit()
+    conn.close()
+    store = SessionStore(db_path=path)
+    assert store.get_checkpoints("s")["t"].new_tasks == []
+    store.close()
+
+def test_migration_script_matches_schema():
+    """Test that database/migration.sql creates the same tables and columns as database/schema.sql."""
+    import os
+    import sqlite3
+    from src.paths import get_root_dir
+    def columns(script):
+        conn = sqlite3.connect(":memory:")
+        with open(os.path.join(get_root_dir(), "database", script)) as f:
+            conn.executescript(f.read())
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+        result = {table: [row[1:] for row in conn.execute(f"PRAGMA table_info({table})")] for table in tables}
+        conn.close()
+        return result
+    assert columns("migration.sql") == columns("schema.sql")
+
+def test_resume_unknown_session_raises(store):
+    """Test that resuming a session that was never persisted is rejected."""
+    with pytest.raises(ValueError):
+        SessionManager(store=store).resume_session("missing")
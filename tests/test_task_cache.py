@@ -0,0 +1,81 @@
+# tests/test_task_cache.py
+import pytest
+from unittest.mock import MagicMock
+from src.task_cache import TaskResultCache
+from src.session_store import SessionStore
+from src.agents.base import Agent
+from src.models import AgentResponse, Artifact, TaskSpec
+from src.orchestrator import Orchestrator
+from src.session_manager import session_manager
+from src.workflow.state import workflow_state_machine, WorkflowState
+
+@pytest.fixture
+def store(tmp_path):
+    """Provides a SessionStore backed by a temporary database."""
+    store = SessionStore(db_path=str(tmp_path / "sessions.db"))
+    yield store
+    store.close()
+
+@pytest.fixture
+def cache(store, monkeypatch):
+    """Points the global task result cache and session manager at the temporary store."""
+    monkeypatch.setattr('src.task_cache.task_result_cache._store', store)
+    monkeypatch.setattr('src.session_manager.session_manager._store', store)
+    return TaskResultCache(store=store)
+
+def make_tasks(a_input: str = "a", b_input: str = "b"):
+    return [
+        TaskSpec(id="a", name="a", description="", agent_name="Counting", input_data={"x": a_input}),
+        TaskSpec(id="b", name="b", description="", agent_name="Counting", input_data={"x": b_input}, dependencies=["a"]),
+        TaskSpec(id="c", name="c", description="", agent_name="Counting", input_data={"x": "c"}),
+    ]
+
+def test_fingerprint_change_propagates_downstream(cache):
+    """Test that changing a task's input changes its fingerprint and its dependents' only."""
+    base = cache.fingerprints(make_tasks())
+    changed = cache.fingerprints(make_tasks(a_input="changed"))
+    assert base["a"] != changed["a"]
+    assert base["b"] != changed["b"]
+    assert base["c"] == changed["c"]
+    assert cache.fingerprints(make_tasks()) == base
+
+def test_record_and_lookup_round_trip(cache, tmp_path, monkeypatch):
+    """Test that a recorded result is returned with its artifacts read back from the store."""
+    from src.artifacts import artifact_manager
+    monkeypatch.setattr(artifact_manager, "artifact_dir", str(tmp_path / "artifacts"))
+    artifact = Artifact(name="out.json", type="json", data={"v": 1})
+    artifact_manager.store_artifact(artifact, "s1")
+    response = AgentResponse(status="completed", output={"k": "v"}, artifacts=[artifact])
+    cache.record("fp", "s1", response)
+
+    cached = cache.lookup("fp")
+    assert cached.output == {"k": "v"}
+    assert cached.artifacts[0].data == {"v": 1}
+    assert cache.lookup("unknown") is None
+
+def test_orchestrator_reruns_only_invalidated_cone(cache, tmp_path, monkeypatch):
+    """Test that an incremental run dispatches only tasks whose fingerprint changed."""
+    monkeypatch.setattr('src.artifacts.artifact_manager.artifact_dir', str(tmp_path / "artifacts"))
+    runs = []
+
+    class Counting(Agent):
+        def run(self, task: TaskSpec) -> AgentResponse:
+            runs.append(task.id)
+            return AgentResponse(status="completed", output={"x": task.input_data["x"]},
+                                 artifacts=[Artifact(name=f"{task.id}.txt", type="text", data=task.input_data["x"])])
+
+    factory = MagicMock()
+    factory.create_agent.side_effect = lambda name: Counting(name)
+
+    def run(tasks):
+        runs.clear()
+        workflow_state_machine._state = WorkflowState.INIT
+        session_manager.start_session()
+        Orchestrator(factory, use_cache=True).run_workflow(tasks)
+        assert workflow_state_machine.get_state() == WorkflowState.COMPLETED
+        return sorted(runs)
+
+    assert run(make_tasks()) == ["a", "b", "c"]
+    assert run(make_tasks()) == []
+    assert run(make_tasks(b_input="changed")) == ["b"]
+    assert run(make_tasks(a_input="changed")) == ["a", "b"]
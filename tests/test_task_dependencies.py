@@ -1,6 +1,6 @@
 # tests/test_task_dependencies.py
 import pytest
-from src.task_dependencies import topological_sort, detect_cycles
+from src.task_dependencies import topological_sort, detect_cycles, creates_cycle
 from src.models import TaskSpec
 import uuid
 
@@ -122,3 +122,10 @@ def test_topological_sort_with_missing_dependency():
     assert len(sorted_tasks) == 2
     assert sorted_tasks[0].id == "A"
     assert sorted_tasks[1].id == "B"
+
+def test_creates_cycle_checks_only_downstream():
+    """Test that an edge closing a loop is detected, and an edge into an unrelated branch is not."""
+    dependents = {"A": ["B"], "B": ["C"], "C": [], "D": []}
+    assert creates_cycle(dependents, "C", "A") # A would depend on its own descendant
+    assert not creates_cycle(dependents, "D", "A")
+    assert not creates_cycle(dependents, "A", "D")